@@ -0,0 +1,108 @@
+import time
+import Sansam.Run as runner
+import Sansam.Lexer.SymbolPool as symbol_pool
+import Sansam.Values.Value as val
+import Sansam.Interpreter.RunTimeResult as rtr
+import Sansam.Interpreter.Interpreter as interpreter
+import Sansam.Interpreter.SignalInterpreter as signal_interpreter
+import Sansam.Compiler.ClosureCompiler as closure_compiler
+import Sansam.Compiler.VirtualMachine as virtual_machine
+import Sansam.Compiler.PythonTranspiler as python_transpiler
+
+SAMPLE = '''इ = 0
+स = 0
+यावद् इ < COUNT {
+स = स + इ * 2 - 1
+इ = इ + 1
+}
+'''
+
+
+class NameDispatchInterpreter(interpreter.Interpreter):
+    # The lookup visit did before the dispatch table, kept for comparison
+    def visit(self, node, context):
+        method_name = f'visit_{type(node).__name__}'
+        method = getattr(self, method_name, self.no_visit_method)
+        return method(node, context)
+
+
+def visit_with(engine):
+    def execute(node, context):
+        result = engine().visit(node, context)
+        return result.value, result.error
+    return execute
+
+
+def measure(execute, node, pool, repeat):
+    best = None
+    for _ in range(repeat):
+        context = runner.new_context(pool)
+        start = time.perf_counter()
+        value, error = execute(node, context)
+        elapsed = time.perf_counter() - start
+        if error:
+            raise Exception(error.as_string())
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def count_allocations(execute, node, pool):
+    # Values and RunTimeResults one run makes, counted by wrapping their constructors
+    counts = {val.Value: 0, rtr.RunTimeResult: 0}
+    originals = {cls: cls.__init__ for cls in counts}
+
+    def counting(cls):
+        original = originals[cls]
+
+        def __init__(self, *args):
+            counts[cls] += 1
+            original(self, *args)
+        return __init__
+
+    for cls in counts:
+        cls.__init__ = counting(cls)
+    try:
+        measure(execute, node, pool, 1)
+    finally:
+        for cls, original in originals.items():
+            cls.__init__ = original
+    return counts[val.Value], counts[rtr.RunTimeResult]
+
+
+def run(count=100_000, repeat=3, allocation_count=1000):
+    pool = symbol_pool.SymbolPool()
+    node, error = runner.parse('<bench>', SAMPLE.replace('COUNT', str(count)), pool)
+    if error:
+        raise Exception(error.as_string())
+    node = runner.optimize(node)
+
+    results = {}
+    engines = (
+        ('getattr', visit_with(NameDispatchInterpreter)),
+        ('dispatch', visit_with(interpreter.Interpreter)),
+        ('signals', signal_interpreter.execute),
+        ('closure', closure_compiler.execute),
+        ('vm', virtual_machine.execute),
+        ('python', python_transpiler.execute),
+    )
+    for name, execute in engines:
+        elapsed = measure(execute, node, pool, repeat)
+        results[name] = elapsed
+        print(f'{name:10} {count / elapsed / 1e3:8.1f} K iterations/s {elapsed * 1e3:10.1f} ms')
+
+    for name in ('dispatch', 'signals', 'closure', 'vm', 'python'):
+        print(f'{name:10} {results["getattr"] / results[name]:8.2f}x speedup')
+
+    node, error = runner.parse('<bench>', SAMPLE.replace('COUNT', str(allocation_count)), pool)
+    node = runner.optimize(node)
+    for name, execute in engines:
+        values, results_made = count_allocations(execute, node, pool)
+        print(
+            f'{name:10} {values / allocation_count:8.1f} values {results_made / allocation_count:8.1f} '
+            f'RunTimeResults per iteration'
+        )
+    return results
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,72 @@
+import time
+import tracemalloc
+import Sansam.Lexer.Lexer as lexer
+import Sansam.Lexer.TableLexer as table_lexer
+
+SAMPLE = '''# अङ्कगणितम्
+कार्य योग(क, ख) {
+क + ख * 2 - (क / 3) ^ 2
+}
+संख्या = [1, 2.5, 3, "नमः"]
+प्रति (इ = 0; 100; 1) {
+यदि इ >= 50 च इ != 60 {
+मुद्रणः(योग(इ, 7) % 5)
+} चेत् {
+अनुवर्तते
+}
+}
+'''
+
+
+def generate_source(size):
+    return SAMPLE * (size // len(SAMPLE) + 1)
+
+
+def measure(make_tokens, repeat):
+    best = None
+    tokens = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tokens, error = make_tokens()
+        elapsed = time.perf_counter() - start
+        if error:
+            raise Exception(error.as_string())
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(tokens)
+
+
+def measure_memory(make_tokens):
+    tracemalloc.start()
+    tokens, error = make_tokens()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size / len(tokens)
+
+
+def engines(text):
+    return (
+        ('Lexer', lambda: lexer.Lexer('<bench>', text).make_tokens()),
+        ('TableLexer', lambda: table_lexer.TableLexer('<bench>', text).make_tokens()),
+        ('TokenStore', lambda: table_lexer.TableLexer('<bench>', text).make_token_store()),
+    )
+
+
+def run(size=2_000_000, repeat=3):
+    text = generate_source(size)
+    sample = generate_source(size // 20)
+    results = {}
+
+    for (name, make_tokens), (_, make_sample) in zip(engines(text), engines(sample)):
+        elapsed, count = measure(make_tokens, repeat)
+        results[name] = elapsed
+        per_token = measure_memory(make_sample)
+        print(f'{name:12} {len(text) / elapsed / 1e6:8.2f} Mchar/s {count / elapsed / 1e3:10.1f} Ktok/s '
+              f'{per_token:8.1f} bytes/token')
+
+    for name in ('TableLexer', 'TokenStore'):
+        print(f'{name:12} {results["Lexer"] / results[name]:8.2f}x speedup')
+    return results
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,350 @@
+import time
+import Sansam.Lexer.TableLexer as table_lexer
+import Sansam.Lexer.Token as token
+import Sansam.Parser.ParseResult as pr
+import Sansam.Parser.Parser as parser
+import Sansam.Parser.Nodes as nodes
+import Sansam.Error.Errors as error
+
+SAMPLE = '''क = (1 + 2) * 3 - 4 / 5 % 6 ^ 2 ^ 1
+ख = क * क + 3 * (क - 1) / (2 + क) - -क
+ग = क < ख च ख >= 10 वा न क == 3 & ख | 1 << 2
+घ = (क + ख) * (ग - 1) ^ 2 + क % 7 - ख / 3 * 2 + 1
+'''
+
+
+class LadderParser(parser.Parser):
+    # The baseline, expressions parsed the way they were before precedence climbing: the ladder
+    # from expr down to atom, one method and one ParseResult for each grammar level, with the
+    # lookahead of expr and access advancing and reversing
+    def reverse(self, amount=1):
+        self.tok_index -= amount
+        self.update_current_tok()
+        return self.current_tok
+
+    def atom(self):
+        res = pr.ParseResult()
+        tok = self.current_tok
+
+        if tok.type in (token.T_INT, token.T_FLOAT):
+            res.register_advancement()
+            self.advance()
+            return res.success(nodes.NumberNode(tok))
+        elif tok.type == token.T_STRING:
+            res.register_advancement()
+            self.advance()
+            return res.success(nodes.StringNode(tok))
+        elif tok.type == token.T_IDENTIFIER:
+            res.register_advancement()
+            self.advance()
+            return res.success(nodes.VarAccessNode(tok))
+
+        elif tok.type == token.T_STRING:
+            res.register_advancement()
+            self.advance()
+            return res.success(nodes.StringNode(tok))
+
+        elif tok.matches(token.T_KEYWORD, 'असत्यम्') or tok.matches(token.T_KEYWORD, 'सत्यम्'):
+            res.register_advancement()
+            self.advance()
+            return res.success(nodes.BooleanNode(tok))
+
+        elif tok.type == token.T_LPAREN:
+            res.register_advancement()
+            self.advance()
+            expr = res.register(self.expr())
+            if res.error:
+                return res
+            if self.current_tok.type == token.T_RPAREN:
+                res.register_advancement()
+                self.advance()
+                return res.success(expr)
+            else:
+                return res.failure(error.InvalidSyntaxError(
+                    self.current_tok.pos_start, self.current_tok.pos_end,
+                    "अपेक्षित ')'"
+                ))
+
+        elif tok.matches(token.T_KEYWORD, "प्रति"):
+            for_expr = res.register(self.for_expr())
+            if res.error: return res
+            return res.success(for_expr)
+
+        elif tok.matches(token.T_KEYWORD, 'यावद्'):
+            while_expr = res.register(self.while_expr())
+            if res.error:
+                return res
+            return res.success(while_expr)
+
+        elif tok.matches(token.T_KEYWORD, 'कार्य'):
+            func_def = res.register(self.func_def())
+            if res.error:
+                return res
+            return res.success(func_def)
+
+        elif tok.type == token.T_LSQUARE:
+            list_expr = res.register(self.list_expr())
+            if res.error:
+                return res
+            return res.success(list_expr)
+
+        elif tok.type == token.T_LCURL:
+            dict_expr = res.register(self.dict_expr())
+            if res.error:
+                return res
+            return res.success(dict_expr)
+
+        elif tok.matches(token.T_KEYWORD, 'यदि'):
+            if_expr = res.register(self.if_expr())
+            # print(self.current_tok)
+            if res.error: return res
+            return res.success(if_expr)
+
+        return res.failure(error.InvalidSyntaxError(
+            tok.pos_start, tok.pos_end,
+            "अपेक्षित अंकम्, चरः, '+', '-','[', वा  '('"
+        ))
+
+    def access(self):
+        res = pr.ParseResult()
+        pos_start = self.current_tok.pos_start.copy()
+
+        if self.current_tok.type == token.T_IDENTIFIER:
+            var_name = self.current_tok
+            res.register_advancement()
+            self.advance()
+
+            if self.current_tok.type == token.T_LSQUARE:
+                res.register_advancement()
+                self.advance()
+
+                expr = res.register(self.expr())
+                if res.error:
+                    return res
+
+                if self.current_tok.type == token.T_RSQUARE:
+                    res.register_advancement()
+                    self.advance()
+
+                    return res.success(nodes.DataAccessNode(var_name, expr, pos_start, self.current_tok.pos_end.copy()))
+
+                else:
+                    return res.failure(error.InvalidSyntaxError(
+                        self.current_tok.pos_start, self.current_tok.pos_end,
+                        "अपेक्षित ']'"
+                    ))
+            else:
+                self.reverse()
+        return self.atom()
+
+    def call(self):
+        res = pr.ParseResult()
+        access = res.register(self.access())
+        if res.error:
+            return res
+
+        if self.current_tok.type == token.T_LPAREN:
+            res.register_advancement()
+            self.advance()
+            arg_nodes = []
+
+            if self.current_tok.type == token.T_RPAREN:
+                res.register_advancement()
+                self.advance()
+            else:
+                arg_nodes.append(res.register(self.expr()))
+                if res.error:
+                    return res.failure(error.InvalidSyntaxError(
+                        self.current_tok.pos_start, self.current_tok.pos_end,
+                        "अपेक्षित ')', 'VAR', 'IF', 'FOR', 'WHILE', 'FUN', int, float, identifier, '+', '-', '(', "
+                        "'[' or 'NOT' "
+                    ))
+
+                while self.current_tok.type == token.T_COMMA:
+                    res.register_advancement()
+                    self.advance()
+
+                    arg_nodes.append(res.register(self.expr()))
+                    if res.error: return res
+
+                if self.current_tok.type != token.T_RPAREN:
+                    return res.failure(error.InvalidSyntaxError(
+                        self.current_tok.pos_start, self.current_tok.pos_end,
+                        f"अपेक्षित ',' or ')'"
+                    ))
+
+                res.register_advancement()
+                self.advance()
+            return res.success(nodes.CallNode(access, arg_nodes))
+        return res.success(access)
+
+    def factorial(self):
+        res = pr.ParseResult()
+        tok = self.current_tok
+
+        if tok.type in (token.T_INT, token.T_IDENTIFIER):
+            node = res.register(self.call())
+            if res.error:
+                return res
+            if self.current_tok.type == token.T_FACT:
+                tok = self.current_tok
+                res.register_advancement()
+                self.advance()
+                return res.success(nodes.FactorialNode(node, tok))
+            return res.success(node)
+
+        return self.call()
+
+    def power(self):
+        return self.bin_op(self.factorial, (token.T_POW,), self.factor)
+
+    def factor(self):
+        res = pr.ParseResult()
+        tok = self.current_tok
+
+        if tok.type in (token.T_PLUS, token.T_MINUS):
+            res.register_advancement()
+            self.advance()
+            factor = res.register(self.factor())
+            if res.error:
+                return res
+            return res.success(nodes.UnaryOpNode(tok, factor))
+
+        return self.power()
+
+    def term(self):
+        return self.bin_op(self.factor, (token.T_MUL, token.T_DIV, token.T_MOD))
+
+    def arith_expr(self):
+        return self.bin_op(self.term, (token.T_PLUS, token.T_MINUS))
+
+    def comp_expr(self):
+        res = pr.ParseResult()
+
+        if self.current_tok.matches(token.T_KEYWORD, 'न') or self.current_tok.type == token.T_NOT:
+            op_tok = self.current_tok
+            res.register_advancement()
+            self.advance()
+
+            node = res.register(self.comp_expr())
+            if res.error:
+                return res
+
+            return res.success(nodes.UnaryOpNode(op_tok, node))
+        elif self.current_tok.type == token.T_BIT_NOT:
+
+            op_tok = self.current_tok
+            res.register_advancement()
+            self.advance()
+
+            node = res.register(self.comp_expr())
+            if res.error: return res
+
+            return res.success(nodes.UnaryOpNode(op_tok, node))
+
+        node = res.register(
+            self.bin_op(self.arith_expr, (token.T_ISG, token.T_ISEQ, token.T_ISNEQ, token.T_ISL, token.T_BIT_AND,
+                                          token.T_ISLEQ, token.T_BIT_OR, token.T_ISGEQ, token.T_RSHIFT, token.T_LSHIFT,
+                                          token.T_XOR)))
+
+        if res.error:
+            return res.failure(error.InvalidSyntaxError(
+                self.current_tok.pos_start, self.current_tok.pos_end,
+                "अपेक्षित अंकम्, चरः, '+', '-','!','न','[' वा  '('"
+            ))
+
+        return res.success(node)
+
+    def expr(self):
+        res = pr.ParseResult()
+
+        if self.current_tok.type == token.T_IDENTIFIER:
+            var_name = self.current_tok
+            res.register_advancement()
+            self.advance()
+
+            if self.current_tok.type == token.T_EQU:
+                res.register_advancement()
+                self.advance()
+
+                expr = res.register(self.expr())
+                if res.error:
+                    return res
+
+                return res.success(nodes.VarAssignNode(var_name, expr))
+
+            else:
+                self.reverse()
+
+        node = res.register(self.bin_op(self.comp_expr, ((token.T_KEYWORD, 'च'), (token.T_KEYWORD, 'वा'))))
+
+        if res.error:
+            res.failure(error.InvalidSyntaxError(
+                self.current_tok.pos_start, self.current_tok.pos_end,
+                "अपेक्षित अंकम्, चरः, नामन्, '+', '-' '[' वा '('"
+            ))
+
+        return res.success(node)
+
+    def bin_op(self, func_1, ops, func_2=None):
+        if func_2 is None:
+            func_2 = func_1
+
+        res = pr.ParseResult()
+        left = res.register(func_1())
+        if res.error:
+            return res
+
+        while self.current_tok.type in ops or (self.current_tok.type, self.current_tok.value) in ops:
+            op_tok = self.current_tok
+            res.register_advancement()
+            self.advance()
+            right = res.register(func_2())
+            if res.error:
+                return res
+            left = nodes.BinOpNode(left, op_tok, right)
+
+        return res.success(left)
+
+
+def generate_source(size):
+    return SAMPLE * (size // len(SAMPLE) + 1)
+
+
+def measure(parser_class, store, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ast = parser_class(store).parse()
+        elapsed = time.perf_counter() - start
+        if ast.error:
+            raise Exception(ast.error.as_string())
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def engines():
+    return (
+        ('Ladder', LadderParser),
+        ('Parser', parser.Parser),
+    )
+
+
+def run(size=500_000, repeat=3):
+    text = generate_source(size)
+    store, error = table_lexer.TableLexer('<bench>', text).make_token_store()
+    if error:
+        raise Exception(error.as_string())
+
+    results = {}
+    for name, parser_class in engines():
+        elapsed = measure(parser_class, store, repeat)
+        results[name] = elapsed
+        print(f'{name:8} {len(store) / elapsed / 1e3:10.1f} Ktok/s {elapsed * 1e3:10.1f} ms for {len(store)} tokens')
+
+    print(f'{"Parser":8} {results["Ladder"] / results["Parser"]:8.2f}x speedup')
+    return results
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,15 @@
+import contextlib
+import gc
+
+
+@contextlib.contextmanager
+def paused():
+    # For code that allocates many objects without making cycles, the collector's passes over
+    # them find nothing and only slow it down
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
@@ -0,0 +1,226 @@
+import array
+import marshal
+import sys
+import zlib
+import Sansam.Compiler.Bytecode as bc
+import Sansam.Lexer.SymbolPool as symbol_pool
+import Sansam.Position as position
+import Sansam.Values.Number as num
+import Sansam.Values.String as string
+import Sansam.Values.Boolean as boolean
+import Sansam.Storage as storage
+import Sansam.Collector as collector
+
+# Bump whenever the layout of the file changes
+VERSION = 3
+
+MAGIC = b'SNSMBC'
+
+# Tags of the constant pool entries
+NUMBER, STRING, BOOLEAN, CODE = range(4)
+
+# A compiled program is written as MAGIC, VERSION, bc.VERSION and the crc32 of the rest as 4 byte
+# little endian integers, marshal.version as 1 byte and then the marshalled tuple
+#   (fn, source, names, positions, codes)
+#
+# names holds every variable, argument and layout name, they are interned again on load.
+# positions is an array of 32 bit (index, line, col) triples, source is only kept to show
+# the line of an error and may be empty. codes lists the program's Code first and then
+# those of its functions, a function constant being the index of its Code. Each code is
+#   (name, arg names, should auto return, layout, instructions, constants, variables, spans,
+#    operand spans)
+# with the instructions an array of 32 bit (opcode, argument, span) triples and the spans
+# one of the position indexes of both ends, -1 standing for a missing position. Operand
+# spans is an array of (instruction index, span, span) triples, -1 filling a missing span.
+
+HEADER_SIZE = len(MAGIC) + 13
+
+
+class ArtifactError(Exception):
+    pass
+
+
+def dumps(code, fn, source='', pool=None):
+    pool = pool if pool is not None else symbol_pool.default_pool
+    names = []
+    name_indexes = {}
+    codes = [code]
+    code_indexes = {id(code): 0}
+    positions = array.array('i')
+    position_indexes = {}
+
+    def name(value):
+        index = name_indexes.get(value)
+        if index is None:
+            index = name_indexes[value] = len(names)
+            names.append(value)
+        return index
+
+    def position_index(pos):
+        if pos is None:
+            return -1
+        key = (pos.index, pos.line, pos.col)
+        index = position_indexes.get(key)
+        if index is None:
+            index = position_indexes[key] = len(position_indexes)
+            positions.extend(key)
+        return index
+
+    def constant(value):
+        if isinstance(value, bc.Code):
+            if id(value) not in code_indexes:
+                code_indexes[id(value)] = len(codes)
+                codes.append(value)
+            return CODE, code_indexes[id(value)]
+        if isinstance(value, num.Number):
+            return NUMBER, value.value
+        if isinstance(value, string.String):
+            return STRING, value.value
+        if isinstance(value, boolean.Boolean):
+            return BOOLEAN, value.boolean
+        raise ArtifactError(f'Cannot store the constant {value!r}')
+
+    encoded = []
+    # codes grows while the constants of the codes before are encoded
+    for current in codes:
+        instructions = array.array('i')
+        for instruction in current.instructions:
+            instructions.extend(instruction)
+
+        spans = array.array('i')
+        for pos_start, pos_end in current.spans:
+            spans.append(position_index(pos_start))
+            spans.append(position_index(pos_end))
+
+        operand_spans = array.array('i')
+        for index, operands in current.operand_spans.items():
+            operand_spans.extend((index,) + operands + (-1,) * (2 - len(operands)))
+
+        if sys.byteorder != 'little':
+            instructions.byteswap()
+            spans.byteswap()
+            operand_spans.byteswap()
+
+        layout = None
+        if current.layout is not None:
+            layout = tuple((name(pool.name(symbol)), slot) for symbol, slot in current.layout.items())
+
+        encoded.append((
+            current.name,
+            tuple(name(arg_name) for arg_name in current.arg_names),
+            current.should_auto_return,
+            layout,
+            instructions.tobytes(),
+            tuple(constant(value) for value in current.constants),
+            tuple((name(var_name), depth, slot) for var_name, symbol, depth, slot in current.variables),
+            spans.tobytes(),
+            operand_spans.tobytes(),
+        ))
+
+    if sys.byteorder != 'little':
+        positions.byteswap()
+
+    payload = marshal.dumps((fn, source, tuple(names), positions.tobytes(), tuple(encoded)))
+    header = (
+        MAGIC + VERSION.to_bytes(4, 'little') + bc.VERSION.to_bytes(4, 'little')
+        + zlib.crc32(payload).to_bytes(4, 'little') + bytes((marshal.version,))
+    )
+    return header + payload
+
+
+def loads(data, pool=None):
+    # Returns the program's Code and the file name its positions refer to. Loading creates no cycles.
+    with collector.paused():
+        return decode(data, pool if pool is not None else symbol_pool.default_pool)
+
+
+def decode(data, pool):
+    if data[:len(MAGIC)] != MAGIC:
+        raise ArtifactError('Not a compiled Sansam program')
+    if len(data) < HEADER_SIZE:
+        raise ArtifactError('The compiled program is truncated or corrupt')
+    version = int.from_bytes(data[len(MAGIC):len(MAGIC) + 4], 'little')
+    bytecode_version = int.from_bytes(data[len(MAGIC) + 4:len(MAGIC) + 8], 'little')
+    if version != VERSION or bytecode_version != bc.VERSION or data[HEADER_SIZE - 1] != marshal.version:
+        raise ArtifactError(
+            f'Compiled for format {version}, bytecode {bytecode_version}, this interpreter reads '
+            f'format {VERSION}, bytecode {bc.VERSION}, compile the program again'
+        )
+
+    payload = memoryview(data)[HEADER_SIZE:]
+    # Damaged data can unmarshal into a program that runs wrong instead of failing, so it is not unmarshalled
+    if zlib.crc32(payload) != int.from_bytes(data[len(MAGIC) + 8:len(MAGIC) + 12], 'little'):
+        raise ArtifactError('The compiled program is truncated or corrupt')
+    try:
+        return decode_payload(payload, pool)
+    except Exception as exception:
+        # A file that passes the checksum yet does not decode was not written by dumps
+        raise ArtifactError('The compiled program is truncated or corrupt') from exception
+
+
+def decode_payload(payload, pool):
+    fn, source, names, positions, encoded = marshal.loads(payload)
+    symbols = [pool.intern(name) for name in names]
+
+    words = array.array('i')
+    words.frombytes(positions)
+    if sys.byteorder != 'little':
+        words.byteswap()
+    # Spans share their ends, the tree did the same
+    positions = [
+        position.Position(words[i], words[i + 1], words[i + 2], fn, source) for i in range(0, len(words), 3)
+    ]
+
+    codes = [
+        bc.Code(name, [names[index] for index in arg_names], should_auto_return)
+        for name, arg_names, should_auto_return, *_ in encoded
+    ]
+    for code, (_, _, _, layout, instructions, constants, variables, spans, operand_spans) in zip(codes, encoded):
+        if layout is not None:
+            code.layout = {symbols[index]: slot for index, slot in layout}
+
+        words = array.array('i')
+        words.frombytes(instructions)
+        if sys.byteorder != 'little':
+            words.byteswap()
+        code.instructions = list(zip(words[0::3], words[1::3], words[2::3]))
+
+        code.constants = [load_constant(tag, value, codes) for tag, value in constants]
+        code.variables = [(names[index], symbols[index], depth, slot) for index, depth, slot in variables]
+
+        words = array.array('i')
+        words.frombytes(spans)
+        if sys.byteorder != 'little':
+            words.byteswap()
+        ends = [positions[index] if index >= 0 else None for index in words]
+        code.spans = list(zip(ends[0::2], ends[1::2]))
+
+        words = array.array('i')
+        words.frombytes(operand_spans)
+        if sys.byteorder != 'little':
+            words.byteswap()
+        code.operand_spans = {
+            words[i]: tuple(span for span in words[i + 1:i + 3] if span >= 0) for i in range(0, len(words), 3)
+        }
+
+    return codes[0], fn
+
+
+def load_constant(tag, value, codes):
+    if tag == NUMBER:
+        return num.make(value)
+    if tag == STRING:
+        return string.String(value)
+    if tag == BOOLEAN:
+        return boolean.make(value)
+    return codes[value]
+
+
+def write(path, code, fn, source='', pool=None):
+    # Written atomically so a worker never reads half a file
+    storage.write_atomically(path, dumps(code, fn, source, pool))
+
+
+def read(path, pool=None):
+    with open(path, 'rb') as file:
+        return loads(file.read(), pool)
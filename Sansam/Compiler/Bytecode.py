@@ -0,0 +1,88 @@
+# Bump whenever an opcode, its argument or the operation tables change, compiled artifacts check it
+VERSION = 3
+
+# Opcodes of the stack machine. Every instruction is an (opcode, argument, span) triple,
+# span indexing the code's table of (pos_start, pos_end) pairs or NO_SPAN.
+LOAD_CONST = 1          # push constants[arg], literals are shared
+LOAD_NULL = 2           # push the shared null, as यच्छ without a value does
+LOAD_NONE = 3           # push None, the value of an if without a matching case
+LOAD_LOCAL = 4          # variables[arg] from a slot of the current frame
+LOAD_GLOBAL = 5         # variables[arg] from the root table
+LOAD_NAME = 6           # variables[arg] through the parent chain
+LOAD_SUBSCRIPTABLE = 7  # variables[arg], it must be a list, string or dictionary
+STORE_LOCAL = 8         # the top of the stack, left there, into a slot
+STORE_GLOBAL = 9
+STORE_NAME = 10
+BINARY_OP = 11          # OPERATIONS[arg] of the two values on top
+UNARY_OP = 12           # UNARY_OPERATIONS[arg]
+FACTORIAL = 13
+INDEX = 14              # subscriptable[index]
+BUILD_LIST = 15         # list of the arg values on top
+BUILD_DICT = 16         # dictionary of the arg key, value pairs on top
+POP = 17
+JUMP = 18
+POP_JUMP_IF_FALSE = 19
+JUMP_IF_NONE = 20       # jumps when the top is None, leaving it
+NEW_ELEMENTS = 21       # push the Python list a loop collects its values in
+LIST_APPEND = 22        # pop a value into the elements arg entries below it
+MAKE_LOOP_LIST = 23     # turn the elements on top into the loop's List
+FOR_PREPARE = 24        # start, end and, with arg 1, step values into a counter
+FOR_NEXT = 25           # push the counter's next Number or jump to arg
+GET_EACH = 26           # iterator over the list or string variables[arg], None for other values
+EACH_NEXT = 27          # push the iterator's next value or jump to arg
+SETUP_LOOP = 28         # a block break and continue leave, arg is where break jumps
+SETUP_EACH = 29         # a block that drops errors and signals of the body, arg is the next iteration
+POP_BLOCK = 30
+BREAK = 31
+CONTINUE = 32
+MAKE_FUNCTION = 33      # function of the code constants[arg]
+CALL = 34               # call with the arg values on top
+RETURN = 35             # यच्छ
+RETURN_VALUE = 36       # end of the code, its value is the top of the stack
+TAIL_CALL = 37          # यच्छ of a call with the arg values on top, made in place of the frame
+LOAD_GLOBAL_CACHED = 38 # variables[arg] from the root table through the inline cache of the variable
+
+NO_SPAN = -1
+
+OPCODE_NAMES = {
+    value: name for name, value in list(globals().items()) if name.isupper() and name != 'VERSION' and value != NO_SPAN
+}
+
+# Value methods BINARY_OP calls, the argument indexes this tuple
+OPERATIONS = (
+    'addition', 'subtraction', 'multiplication', 'division', 'modulus', 'exponential',
+    'get_comparison_eq', 'get_comparison_ne', 'get_comparison_lt', 'get_comparison_gt',
+    'get_comparison_lte', 'get_comparison_gte', 'get_comparison_bitand', 'get_comparison_bitor',
+    'get_shift_right', 'get_shift_left', 'get_xor', 'anded_by', 'ored_by',
+)
+
+UNARY_MINUS, UNARY_NOT, UNARY_BIT_NOT, UNARY_PLUS = range(4)
+UNARY_OPERATIONS = ('minus', 'not', 'bit_not', 'plus')
+
+# Kinds of blocks SETUP_LOOP and SETUP_EACH push
+LOOP_BLOCK = 0
+EACH_BLOCK = 1
+
+
+class Code:
+    def __init__(self, name, arg_names=None, should_auto_return=False, layout=None):
+        self.name = name
+        self.instructions = []
+        self.constants = []
+        # (name, symbol, slot) of each variable the code reads or writes
+        self.variables = []
+        self.spans = []
+        # Instruction index to the spans of the operands of a BINARY_OP, UNARY_OP or INDEX, an
+        # error of the operation shows these positions
+        self.operand_spans = {}
+        # A GlobalCache for each variable, made by the VM on the code's first run as they are not
+        # compiled or written
+        self.caches = None
+
+        # Only set for the code of a function
+        self.arg_names = arg_names or []
+        self.should_auto_return = should_auto_return
+        self.layout = layout
+
+    def __repr__(self):
+        return f'<code {self.name}>'
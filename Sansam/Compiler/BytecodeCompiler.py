@@ -0,0 +1,282 @@
+import Sansam.Compiler.Bytecode as bc
+import Sansam.Interpreter.SymbolTable as st
+import Sansam.Lexer.Token as token
+import Sansam.Values.Number as num
+import Sansam.Values.Boolean as boolean
+import Sansam.Values.String as string
+import Sansam.Values.Operators as operators
+
+LOADS = {st.LOCAL: bc.LOAD_LOCAL, st.GLOBAL: bc.LOAD_GLOBAL, None: bc.LOAD_NAME}
+STORES = {st.LOCAL: bc.STORE_LOCAL, st.GLOBAL: bc.STORE_GLOBAL, None: bc.STORE_NAME}
+
+
+class BytecodeCompiler:
+    # Compiles the tree of a program into Code for the VirtualMachine, every function
+    # definition into its own Code kept in the constants of the enclosing one. Each node
+    # leaves exactly one value on the stack.
+    def __init__(self):
+        self.code = None
+        self.in_function = False
+        self.variable_indexes = {}
+        self.span_indexes = {}
+
+    def compile(self, node):
+        code = bc.Code('<program>')
+        self.compile_code(code, node, False)
+        return code
+
+    def compile_code(self, code, node, in_function):
+        saved = self.code, self.in_function, self.variable_indexes, self.span_indexes
+        self.code, self.in_function, self.variable_indexes, self.span_indexes = code, in_function, {}, {}
+
+        self.visit(node)
+        self.emit(bc.RETURN_VALUE)
+
+        self.code, self.in_function, self.variable_indexes, self.span_indexes = saved
+        return code
+
+    def visit(self, node):
+        method = getattr(self, f'compile_{type(node).__name__}', None)
+        if method is None:
+            raise Exception(f"No visit_{type(node).__name__} method defined")
+        method(node)
+
+    ###################################
+
+    def emit(self, op, arg=0, node=None):
+        self.code.instructions.append((op, arg, self.span(node) if node else bc.NO_SPAN))
+        return len(self.code.instructions) - 1
+
+    def patch(self, index, target=None):
+        # Points the jump at index to target, by default the next instruction emitted
+        op, _, span = self.code.instructions[index]
+        if target is None:
+            target = len(self.code.instructions)
+        self.code.instructions[index] = (op, target, span)
+
+    def span(self, node):
+        key = (node.pos_start, node.pos_end)
+        index = self.span_indexes.get(key)
+        if index is None:
+            index = self.span_indexes[key] = len(self.code.spans)
+            self.code.spans.append(key)
+        return index
+
+    def constant(self, value):
+        self.code.constants.append(value)
+        return len(self.code.constants) - 1
+
+    def variable(self, tok, depth=None, slot=None):
+        key = (tok.symbol, depth, slot)
+        index = self.variable_indexes.get(key)
+        if index is None:
+            index = self.variable_indexes[key] = len(self.code.variables)
+            self.code.variables.append((tok.value, tok.symbol, depth, slot))
+        return index
+
+    def operands(self, index, *operand_nodes):
+        self.code.operand_spans[index] = tuple(self.span(operand_node) for operand_node in operand_nodes)
+
+    def store(self, node, tok):
+        self.emit(STORES[node.depth], self.variable(tok, node.depth, node.slot), node)
+
+    ###################################
+
+    def compile_NumberNode(self, node):
+        self.emit(bc.LOAD_CONST, self.constant(num.make(node.tok.value)), node)
+
+    def compile_StringNode(self, node):
+        self.emit(bc.LOAD_CONST, self.constant(string.String(node.tok.value)), node)
+
+    def compile_BooleanNode(self, node):
+        self.emit(bc.LOAD_CONST, self.constant(boolean.make(node.tok.value)), node)
+
+    def compile_ConstantNode(self, node):
+        self.emit(bc.LOAD_CONST, self.constant(node.value), node)
+
+    def compile_ListNode(self, node):
+        for element_node in node.element_nodes:
+            self.visit(element_node)
+        self.emit(bc.BUILD_LIST, len(node.element_nodes), node)
+
+    def compile_DictionaryNode(self, node):
+        for key_node, value_node in node.element_nodes.items():
+            self.visit(key_node)
+            self.visit(value_node)
+        self.emit(bc.BUILD_DICT, len(node.element_nodes), node)
+
+    def compile_ForNode(self, node):
+        # Stack in the loop: elements, counter. A loop whose value is unused keeps no elements
+        if node.collects:
+            self.emit(bc.NEW_ELEMENTS)
+        if node.start_value_node:
+            self.visit(node.start_value_node)
+        else:
+            self.emit(bc.LOAD_CONST, self.constant(num.make(0)), node)
+        self.visit(node.end_value_node)
+        if node.step_value_node:
+            self.visit(node.step_value_node)
+        self.emit(bc.FOR_PREPARE, 1 if node.step_value_node else 0)
+
+        setup = self.emit(bc.SETUP_LOOP)
+        next_ = self.emit(bc.FOR_NEXT)
+        self.store(node, node.var_name_tok)
+        self.emit(bc.POP)
+        self.visit(node.body_node)
+        self.collect(node, 2)
+        self.emit(bc.JUMP, next_)
+
+        self.patch(next_)
+        self.emit(bc.POP_BLOCK)
+        self.patch(setup)
+        self.emit(bc.POP)
+        self.make_loop_list(node)
+
+    def compile_ForEachNode(self, node):
+        self.emit(bc.GET_EACH, self.variable(node.list_name), node)
+        skip = self.emit(bc.JUMP_IF_NONE)
+
+        self.emit(bc.SETUP_EACH)
+        next_ = self.emit(bc.EACH_NEXT)
+        self.store(node, node.var_name)
+        self.emit(bc.POP)
+        self.visit(node.body_node)
+        self.emit(bc.POP)
+        self.emit(bc.JUMP, next_)
+
+        self.patch(next_)
+        self.emit(bc.POP_BLOCK)
+        self.emit(bc.POP)
+        self.emit(bc.NEW_ELEMENTS)
+        self.emit(bc.MAKE_LOOP_LIST, 0, node)
+        self.patch(skip)
+
+    def compile_VarAccessNode(self, node):
+        op = bc.LOAD_GLOBAL_CACHED if node.cache else LOADS[node.depth]
+        self.emit(op, self.variable(node.var_name_tok, node.depth, node.slot), node)
+
+    def compile_DataAccessNode(self, node):
+        self.emit(bc.LOAD_SUBSCRIPTABLE, self.variable(node.var_name_tok, node.depth, node.slot), node)
+        self.visit(node.index_tok)
+        self.operands(self.emit(bc.INDEX, 0, node), node.index_tok)
+
+    def compile_VarAssignNode(self, node):
+        self.visit(node.value_node)
+        self.store(node, node.var_name_tok)
+
+    def compile_BinOpNode(self, node):
+        self.visit(node.left_node)
+        self.visit(node.right_node)
+        if node.op_tok.type == token.T_KEYWORD:
+            operation = operators.LOGICAL_OPERATIONS[node.op_tok.value]
+        else:
+            operation = operators.BINARY_OPERATIONS[node.op_tok.type]
+        index = self.emit(bc.BINARY_OP, bc.OPERATIONS.index(operation), node)
+        self.operands(index, node.left_node, node.right_node)
+
+    def compile_UnaryOpNode(self, node):
+        self.visit(node.node)
+        if node.op_tok.type == token.T_MINUS:
+            operation = bc.UNARY_MINUS
+        elif node.op_tok.matches(token.T_KEYWORD, 'न') or node.op_tok.type == token.T_NOT:
+            operation = bc.UNARY_NOT
+        elif node.op_tok.type == token.T_BIT_NOT:
+            operation = bc.UNARY_BIT_NOT
+        else:
+            operation = bc.UNARY_PLUS
+        self.operands(self.emit(bc.UNARY_OP, operation, node), node.node)
+
+    def compile_FactorialNode(self, node):
+        self.visit(node.node)
+        self.emit(bc.FACTORIAL, 0, node)
+
+    def compile_WhileNode(self, node):
+        # Stack in the loop: elements
+        if node.collects:
+            self.emit(bc.NEW_ELEMENTS)
+        setup = self.emit(bc.SETUP_LOOP)
+        condition = len(self.code.instructions)
+        self.visit(node.condition_node)
+        exit_ = self.emit(bc.POP_JUMP_IF_FALSE)
+        self.visit(node.body_node)
+        self.collect(node, 1)
+        self.emit(bc.JUMP, condition)
+
+        self.patch(exit_)
+        self.emit(bc.POP_BLOCK)
+        self.patch(setup)
+        self.make_loop_list(node)
+
+    def collect(self, node, depth):
+        # The body's value goes into the elements depth entries down, or is dropped
+        if node.collects:
+            self.emit(bc.LIST_APPEND, depth)
+        else:
+            self.emit(bc.POP)
+
+    def make_loop_list(self, node):
+        if node.collects:
+            self.emit(bc.MAKE_LOOP_LIST, 0, node)
+        else:
+            self.emit(bc.LOAD_NULL)
+
+    def compile_FuncDefNode(self, node):
+        code = bc.Code(
+            node.var_name_tok.value if node.var_name_tok else '<anonymous>',
+            [arg_name.value for arg_name in node.arg_name_tokens],
+            node.should_auto_return,
+            node.layout,
+        )
+        self.compile_code(code, node.body_node, True)
+
+        self.emit(bc.MAKE_FUNCTION, self.constant(code), node)
+        if node.var_name_tok:
+            self.store(node, node.var_name_tok)
+
+    def compile_CallNode(self, node):
+        self.visit(node.node_to_call)
+        for arg_node in node.arg_nodes:
+            self.visit(arg_node)
+        self.emit(bc.CALL, len(node.arg_nodes), node)
+
+    def compile_IfNode(self, node):
+        ends = []
+        for condition, expr in node.cases:
+            self.visit(condition)
+            next_case = self.emit(bc.POP_JUMP_IF_FALSE)
+            self.visit(expr)
+            ends.append(self.emit(bc.JUMP))
+            self.patch(next_case)
+
+        if node.else_case:
+            self.visit(node.else_case)
+        else:
+            self.emit(bc.LOAD_NONE)
+        for end in ends:
+            self.patch(end)
+
+    def compile_ReturnNode(self, node):
+        if node.tail_call:
+            call = node.node_to_return
+            self.visit(call.node_to_call)
+            for arg_node in call.arg_nodes:
+                self.visit(arg_node)
+            self.emit(bc.TAIL_CALL, len(call.arg_nodes), call)
+            return
+
+        if node.node_to_return:
+            self.visit(node.node_to_return)
+        else:
+            self.emit(bc.LOAD_NULL)
+
+        if not self.in_function:
+            # The program ends without a value when यच्छ is used outside a function
+            self.emit(bc.POP)
+            self.emit(bc.LOAD_NONE)
+        self.emit(bc.RETURN)
+
+    def compile_ContinueNode(self, node):
+        self.emit(bc.CONTINUE)
+
+    def compile_BreakNode(self, node):
+        self.emit(bc.BREAK)
@@ -0,0 +1,473 @@
+import Sansam.Interpreter.RunTimeResult as rtr
+import Sansam.Interpreter.SymbolTable as st
+import Sansam.Interpreter.Signals as signals
+import Sansam.Error.Errors as errors
+import Sansam.Lexer.Token as token
+import Sansam.Values.Number as num
+import Sansam.Values.Boolean as boolean
+import Sansam.Values.String as string
+import Sansam.Values.List as list
+import Sansam.Values.Function as func
+import Sansam.Values.Dictionary as dict
+import Sansam.Values.Operators as operators
+
+
+class CompiledFunction(func.Function):
+    def __init__(self, name, body_node, arg_names, should_auto_return, layout, body):
+        super().__init__(name, body_node, arg_names, should_auto_return, layout)
+        self.body = body
+
+    def call(self, args):
+        function, exec_ctx = self, self.enter(args)
+        while True:
+            try:
+                value = function.body(exec_ctx)
+            except signals.ReturnSignal as signal:
+                value = signal.value
+            except (signals.BreakSignal, signals.ContinueSignal):
+                value = None
+            except signals.TailCallSignal as signal:
+                callee, args = signal.function, signal.args
+                if function.reenters(callee, args):
+                    function.bind_args(exec_ctx.symbol_table, args)
+                elif isinstance(callee, CompiledFunction):
+                    # Run by this loop, a chain of tail calls does not grow the Python stack. The
+                    # frame left is the callee's parent, so it is not released.
+                    function, exec_ctx = callee, callee.enter(args)
+                else:
+                    return call(callee, args)
+                continue
+            except RecursionError:
+                raise signals.ErrorSignal(function.stack_error())
+            st.release(exec_ctx.symbol_table)
+            return value
+
+    def enter(self, args):
+        exec_ctx, error = self.new_frame(args)
+        if error:
+            raise signals.ErrorSignal(error)
+        return exec_ctx
+
+    def reenters(self, function, args):
+        # Functions of the transpiler have no body node, the compiled body tells them apart
+        return function.__class__ is CompiledFunction and function.body is self.body and len(args) == self.arity
+
+    def execute(self, args):
+        res = rtr.RunTimeResult()
+        try:
+            return res.success(self.call(args))
+        except signals.ErrorSignal as signal:
+            return res.failure(signal.error)
+
+
+def call(function, args):
+    if isinstance(function, CompiledFunction):
+        return function.call(args)
+    res = function.execute(args)
+    if res.error:
+        raise signals.ErrorSignal(res.error)
+    return res.value
+
+
+def apply(function, args, context, pos_start, pos_end):
+    # Calls a built-in at the given call
+    value, error = function.apply(args, context, pos_start, pos_end)
+    if error:
+        raise signals.ErrorSignal(error)
+    return value
+
+
+def execute(node, context):
+    program = ClosureCompiler().compile(node)
+    try:
+        return program(context), None
+    except signals.ErrorSignal as signal:
+        return None, signal.error
+    except (signals.ReturnSignal, signals.BreakSignal, signals.ContinueSignal):
+        return None, None
+
+
+class ClosureCompiler:
+    # Turns the tree into nested closures taking the context and returning the node's value.
+    # Each closure does what the matching Interpreter.visit_* does, with errors and
+    # return/break/continue raised as signals instead of carried in a RunTimeResult.
+
+    def compile(self, node):
+        method = getattr(self, f'compile_{type(node).__name__}', None)
+        if method is None:
+            raise Exception(f"No visit_{type(node).__name__} method defined")
+        return method(node)
+
+    ###################################
+
+    # Literals are made once and shared by every run of the node, values never change
+
+    def compile_NumberNode(self, node):
+        value = num.make(node.tok.value)
+
+        def number(context):
+            return value
+        return number
+
+    def compile_StringNode(self, node):
+        value = string.String(node.tok.value)
+
+        def string_(context):
+            return value
+        return string_
+
+    def compile_BooleanNode(self, node):
+        value = boolean.make(node.tok.value)
+
+        def boolean_(context):
+            return value
+        return boolean_
+
+    def compile_ConstantNode(self, node):
+        value = node.value
+
+        def constant(context):
+            return value
+        return constant
+
+    def compile_ListNode(self, node):
+        element_nodes = [self.compile(element_node) for element_node in node.element_nodes]
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def list_(context):
+            elements = [element_node(context) for element_node in element_nodes]
+            return list.List(elements).set_context(context).set_pos(pos_start, pos_end)
+        return list_
+
+    def compile_DictionaryNode(self, node):
+        element_nodes = [
+            (self.compile(key_node), self.compile(value_node)) for key_node, value_node in node.element_nodes.items()
+        ]
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def dictionary(context):
+            elements = {}
+            for key_node, value_node in element_nodes:
+                key = key_node(context)
+                elements[key.copy()] = value_node(context)
+            return dict.Dictionary(elements).set_context(context).set_pos(pos_start, pos_end)
+        return dictionary
+
+    def compile_ForNode(self, node):
+        start_value_node = self.compile(node.start_value_node) if node.start_value_node else None
+        end_value_node = self.compile(node.end_value_node)
+        step_value_node = self.compile(node.step_value_node) if node.step_value_node else None
+        body_node = self.compile(node.body_node)
+        depth, slot, symbol = node.depth, node.slot, node.var_name_tok.symbol
+        pos_start, pos_end = node.pos_start, node.pos_end
+        collects = node.collects
+
+        def for_(context):
+            elements = []
+            start_value = start_value_node(context) if start_value_node else num.make(0)
+            end_value = end_value_node(context)
+            if step_value_node:
+                step_value = step_value_node(context)
+            elif start_value.value < end_value.value:
+                step_value = num.make(1)
+            else:
+                step_value = num.make(-1)
+
+            assign = context.symbol_table.setter(depth, slot, symbol)
+            for i in num.count(start_value.value, end_value.value, step_value.value):
+                assign(num.make(i))
+
+                try:
+                    value = body_node(context)
+                except signals.ContinueSignal:
+                    continue
+                except signals.BreakSignal:
+                    break
+                if collects:
+                    elements.append(value)
+
+            if not collects:
+                return num.null
+            return list.List(elements).set_context(context).set_pos(pos_start, pos_end)
+        return for_
+
+    def compile_ForEachNode(self, node):
+        body_node = self.compile(node.body_node)
+        list_symbol = node.list_name.symbol
+        assign = self.assigner(node, node.var_name.symbol)
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def for_each(context):
+            list_name = context.symbol_table.get_symbol(list_symbol)
+
+            if isinstance(list_name, list.List):
+                print(list_name.iter(), "li")
+            elif isinstance(list_name, string.String):
+                print(list_name)
+            else:
+                return None
+
+            for var_name in list_name.iter():
+                assign(context, var_name)
+                # The body's errors and signals end the iteration and are then dropped, as in the interpreter
+                try:
+                    body_node(context)
+                except (signals.ErrorSignal, signals.ReturnSignal, signals.BreakSignal, signals.ContinueSignal):
+                    pass
+            return list.List([]).set_context(context).set_pos(pos_start, pos_end)
+        return for_each
+
+    def compile_VarAccessNode(self, node):
+        lookup = self.lookup(node, node.var_name_tok.symbol, node.cache)
+        var_name, pos_start, pos_end = node.var_name_tok.value, node.pos_start, node.pos_end
+
+        def var_access(context):
+            value = lookup(context)
+            if not value:
+                raise signals.ErrorSignal(errors.RunTimeError(
+                    pos_start, pos_end, f"'{var_name}' is not defined", context
+                ))
+            return value
+        return var_access
+
+    def compile_DataAccessNode(self, node):
+        lookup = self.lookup(node, node.var_name_tok.symbol)
+        index_node = self.compile(node.index_tok)
+        var_name, pos_start, pos_end = node.var_name_tok.value, node.pos_start, node.pos_end
+        index_start, index_end = node.index_tok.pos_start, node.index_tok.pos_end
+
+        def data_access(context):
+            value = lookup(context)
+            if not value:
+                raise signals.ErrorSignal(errors.RunTimeError(
+                    pos_start, pos_end, f"'{var_name}' is not defined", context
+                ))
+
+            if isinstance(value, (list.List, string.String, dict.Dictionary)):
+                index = index_node(context)
+                result, error = value.division(index)
+                if error:
+                    index = index.at(index_start, index_end, context)
+                    raise signals.ErrorSignal(value.division(index)[1])
+                return result
+
+            raise signals.ErrorSignal(errors.RunTimeError(
+                pos_start, pos_end, "Dictionary, list and string should be present"
+            ))
+        return data_access
+
+    def compile_VarAssignNode(self, node):
+        value_node = self.compile(node.value_node)
+        assign = self.assigner(node, node.var_name_tok.symbol)
+
+        def var_assign(context):
+            value = value_node(context)
+            assign(context, value)
+            return value
+        return var_assign
+
+    def compile_BinOpNode(self, node):
+        left_node = self.compile(node.left_node)
+        right_node = self.compile(node.right_node)
+        if node.op_tok.type == token.T_KEYWORD:
+            operation = operators.LOGICAL_OPERATIONS[node.op_tok.value]
+        else:
+            operation = operators.BINARY_OPERATIONS[node.op_tok.type]
+        left_start, left_end = node.left_node.pos_start, node.left_node.pos_end
+        right_start, right_end = node.right_node.pos_start, node.right_node.pos_end
+        number = num.Number
+        number_operation = operators.NUMBER[operation]
+        binary = operators.binary
+
+        def bin_op(context):
+            left = left_node(context)
+            right = right_node(context)
+            if left.__class__ is number is right.__class__:
+                result, error = number_operation(left, right)
+            else:
+                result, error = binary(left, operation, right)
+            if error:
+                left = left.at(left_start, left_end, context)
+                right = right.at(right_start, right_end, context)
+                raise signals.ErrorSignal(binary(left, operation, right)[1])
+            return result
+        return bin_op
+
+    def compile_UnaryOpNode(self, node):
+        operand_node = self.compile(node.node)
+        op_tok = node.op_tok
+        operand_start, operand_end = node.node.pos_start, node.node.pos_end
+
+        if op_tok.type == token.T_MINUS:
+            def operation(number):
+                return num.Number(0).subtraction(number)
+        elif op_tok.matches(token.T_KEYWORD, 'न') or op_tok.type == token.T_NOT:
+            def operation(number):
+                return number.notted()
+        elif op_tok.type == token.T_BIT_NOT:
+            def operation(number):
+                return number.bitnotted()
+        else:
+            def operation(number):
+                return number, None
+
+        def unary_op(context):
+            number = operand_node(context)
+            result, error = operation(number)
+            if error:
+                raise signals.ErrorSignal(operation(number.at(operand_start, operand_end, context))[1])
+            return result
+        return unary_op
+
+    def compile_FactorialNode(self, node):
+        operand_node = self.compile(node.node)
+
+        def factorial(context):
+            number, error = operand_node(context).factorial()
+            if error:
+                raise signals.ErrorSignal(error)
+            return number
+        return factorial
+
+    def compile_WhileNode(self, node):
+        condition_node = self.compile(node.condition_node)
+        body_node = self.compile(node.body_node)
+        pos_start, pos_end = node.pos_start, node.pos_end
+        collects = node.collects
+
+        def while_(context):
+            elements = []
+            while condition_node(context).is_true():
+                try:
+                    value = body_node(context)
+                except signals.ContinueSignal:
+                    continue
+                except signals.BreakSignal:
+                    break
+                if collects:
+                    elements.append(value)
+            if not collects:
+                return num.null
+            return list.List(elements).set_context(context).set_pos(pos_start, pos_end)
+        return while_
+
+    def compile_FuncDefNode(self, node):
+        func_name = node.var_name_tok.value if node.var_name_tok else None
+        body_node = node.body_node
+        body = self.compile(body_node)
+        arg_names = [arg_name.value for arg_name in node.arg_name_tokens]
+        should_auto_return = node.should_auto_return
+        layout = node.layout
+        assign = self.assigner(node, node.var_name_tok.symbol) if node.var_name_tok else None
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def func_def(context):
+            func_value = CompiledFunction(
+                func_name, body_node, arg_names, should_auto_return, layout, body
+            ).set_context(context).set_pos(pos_start, pos_end)
+
+            if layout:
+                context.symbol_table.root.shadow(layout)
+            if assign:
+                assign(context, func_value)
+            return func_value
+        return func_def
+
+    def compile_CallNode(self, node):
+        return self.compile_call(node, False)
+
+    def compile_call(self, node, tail_call):
+        # A tail call is made by CompiledFunction.call once the caller's frame has ended
+        node_to_call = self.compile(node.node_to_call)
+        arg_nodes = [self.compile(arg_node) for arg_node in node.arg_nodes]
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def call_(context):
+            value_to_call = node_to_call(context)
+            if value_to_call.__class__ is func.BuiltInFunction:
+                # Makes no frame, so it is called as it is and right away in a tail call too
+                args = [arg_node(context) for arg_node in arg_nodes]
+                value = apply(value_to_call, args, context, pos_start, pos_end)
+                if tail_call:
+                    raise signals.ReturnSignal(value)
+                return value
+            # Copied as the new frame takes its parent and entry position from the callee
+            value_to_call = value_to_call.copy().set_pos(pos_start, pos_end).set_context(context)
+            args = [arg_node(context) for arg_node in arg_nodes]
+            if tail_call:
+                raise signals.TailCallSignal(value_to_call, args)
+            return call(value_to_call, args)
+        return call_
+
+    def compile_IfNode(self, node):
+        cases = [(self.compile(condition), self.compile(expr)) for condition, expr in node.cases]
+        else_case = self.compile(node.else_case) if node.else_case else None
+
+        def if_(context):
+            for condition, expr in cases:
+                if condition(context).is_true():
+                    return expr(context)
+            if else_case:
+                return else_case(context)
+            return None
+        return if_
+
+    def compile_ReturnNode(self, node):
+        if node.tail_call:
+            return self.compile_call(node.node_to_return, True)
+        node_to_return = self.compile(node.node_to_return) if node.node_to_return else None
+
+        def return_(context):
+            raise signals.ReturnSignal(node_to_return(context) if node_to_return else num.null)
+        return return_
+
+    def compile_ContinueNode(self, node):
+        def continue_(context):
+            raise signals.ContinueSignal()
+        return continue_
+
+    def compile_BreakNode(self, node):
+        def break_(context):
+            raise signals.BreakSignal()
+        return break_
+
+    ###################################
+
+    def lookup(self, node, symbol, cache=None):
+        depth, slot = node.depth, node.slot
+
+        if depth == st.LOCAL:
+            def local(context):
+                table = context.symbol_table
+                value = table.slots[slot]
+                if value is None and table.parent:
+                    return table.parent.get_symbol(symbol)
+                return value
+            return local
+
+        if cache:
+            def cached(context):
+                if cache.version == context.symbol_table.root.version:
+                    cache.hits += 1
+                    return cache.value
+                return cache.fill(context.symbol_table)
+            return cached
+
+        if depth == st.GLOBAL:
+            def global_(context):
+                root = context.symbol_table.root
+                if symbol in root.shadowed:
+                    return context.symbol_table.get_symbol(symbol)
+                return root.symbols.get(symbol, None)
+            return global_
+
+        def dynamic(context):
+            return context.symbol_table.get_symbol(symbol)
+        return dynamic
+
+    def assigner(self, node, symbol):
+        depth, slot = node.depth, node.slot
+
+        def assign(context, value):
+            context.symbol_table.assign(depth, slot, symbol, value)
+        return assign
@@ -0,0 +1,69 @@
+import sys
+import Sansam.Compiler.Bytecode as bc
+import Sansam.Compiler.BytecodeCompiler as bytecode_compiler
+
+JUMPS = frozenset((
+    bc.JUMP, bc.POP_JUMP_IF_FALSE, bc.JUMP_IF_NONE, bc.FOR_NEXT, bc.EACH_NEXT, bc.SETUP_LOOP,
+))
+VARIABLE_OPS = frozenset((
+    bc.LOAD_LOCAL, bc.LOAD_GLOBAL, bc.LOAD_GLOBAL_CACHED, bc.LOAD_NAME, bc.LOAD_SUBSCRIPTABLE,
+    bc.STORE_LOCAL, bc.STORE_GLOBAL, bc.STORE_NAME, bc.GET_EACH,
+))
+
+
+def disassemble(code):
+    # The listing of code followed by those of the functions defined in it
+    lines = [f'{code.name}' + (f' ({", ".join(code.arg_names)})' if code.arg_names else '') + ':']
+    targets = {arg for op, arg, span in code.instructions if op in JUMPS}
+    nested = []
+
+    for index, (op, arg, span) in enumerate(code.instructions):
+        marker = '>>' if index in targets else '  '
+        line = f'{marker} {index:5} {bc.OPCODE_NAMES[op]:20} {arg:5}'
+
+        note = describe(code, op, arg, nested)
+        if note:
+            line += f'  ({note})'
+        if span != bc.NO_SPAN and code.spans[span][0]:
+            line = f'{line:60} line {code.spans[span][0].line + 1}'
+        lines.append(line.rstrip())
+
+    for function_code in nested:
+        lines.append('')
+        lines.append(disassemble(function_code))
+    return '\n'.join(lines)
+
+
+def describe(code, op, arg, nested):
+    if op in VARIABLE_OPS:
+        var_name, symbol, depth, slot = code.variables[arg]
+        return var_name if slot is None else f'{var_name}, slot {slot}'
+    if op == bc.LOAD_CONST:
+        return repr(code.constants[arg])
+    if op == bc.MAKE_FUNCTION:
+        nested.append(code.constants[arg])
+        return repr(code.constants[arg])
+    if op == bc.BINARY_OP:
+        return bc.OPERATIONS[arg]
+    if op == bc.UNARY_OP:
+        return bc.UNARY_OPERATIONS[arg]
+    if op in JUMPS:
+        return f'to {arg}'
+    return ''
+
+
+def main(path):
+    import Sansam.Run as runner
+    import Sansam.Lexer.SymbolPool as symbol_pool
+
+    with open(path, encoding='utf-8') as file:
+        text = file.read()
+    node, error = runner.parse(path, text, symbol_pool.SymbolPool())
+    if error:
+        print(error.as_string())
+        return
+    print(disassemble(bytecode_compiler.BytecodeCompiler().compile(runner.optimize(node))))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1])
@@ -0,0 +1,579 @@
+import itertools
+import linecache
+import re
+import Sansam.Compiler.ClosureCompiler as closure_compiler
+import Sansam.Interpreter.SymbolTable as st
+import Sansam.Interpreter.Signals as signals
+import Sansam.Error.Errors as errors
+import Sansam.Error.Error_String_With_Arrows as error_str
+import Sansam.Lexer.Token as token
+import Sansam.Parser.Nodes as nodes
+import Sansam.Values.Function as func
+import Sansam.Values.Number as num
+import Sansam.Values.Boolean as boolean
+import Sansam.Values.String as string
+import Sansam.Values.List as list
+import Sansam.Values.Dictionary as dict
+import Sansam.Values.Operators as operators
+
+# Operations on two Numbers written as the Python operator, the rest go through the operator table.
+# The result is a Number or a Boolean.
+NUMBER_OPERATIONS = {
+    'addition': ('+', True),
+    'subtraction': ('-', True),
+    'multiplication': ('*', True),
+    'get_comparison_eq': ('==', False),
+    'get_comparison_ne': ('!=', False),
+    'get_comparison_lt': ('<', False),
+    'get_comparison_gt': ('>', False),
+    'get_comparison_lte': ('<=', False),
+    'get_comparison_gte': ('>=', False),
+}
+
+TEMP = re.compile(r'_t\d+')
+
+# Names of generated modules, each gets its own so linecache can show its lines while it runs
+module_numbers = itertools.count()
+
+
+def check(result):
+    value, error = result
+    if error:
+        raise signals.ErrorSignal(error)
+    return value
+
+
+def check_operation(result, left, operation, right, context, left_start, left_end, right_start, right_end):
+    # The error is made again with copies placed where the operands were used, for its positions
+    value, error = result
+    if error:
+        left = left.at(left_start, left_end, context)
+        right = right.at(right_start, right_end, context)
+        raise signals.ErrorSignal(operators.binary(left, operation, right)[1])
+    return value
+
+
+def check_index(result, value, index, context, pos_start, pos_end):
+    value_at_index, error = result
+    if error:
+        raise signals.ErrorSignal(value.division(index.at(pos_start, pos_end, context))[1])
+    return value_at_index
+
+
+def check_unary(result, number, operation, context, pos_start, pos_end):
+    value, error = result
+    if error:
+        number = number.at(pos_start, pos_end, context)
+        if operation == 'subtraction':
+            raise signals.ErrorSignal(num.Number(0).subtraction(number)[1])
+        raise signals.ErrorSignal(getattr(number, operation)()[1])
+    return value
+
+
+def not_defined(var_name, pos_start, pos_end, context):
+    return signals.ErrorSignal(errors.RunTimeError(pos_start, pos_end, f"'{var_name}' is not defined", context))
+
+
+def make_function(name, arg_names, should_auto_return, layout, body, context, pos_start, pos_end):
+    func_value = closure_compiler.CompiledFunction(
+        name, None, arg_names, should_auto_return, layout, body
+    ).set_context(context).set_pos(pos_start, pos_end)
+
+    if layout:
+        context.symbol_table.root.shadow(layout)
+    return func_value
+
+
+def call(value_to_call, args, context, pos_start, pos_end):
+    if value_to_call.__class__ is func.BuiltInFunction:
+        return closure_compiler.apply(value_to_call, args, context, pos_start, pos_end)
+    value_to_call = value_to_call.copy().set_pos(pos_start, pos_end).set_context(context)
+    return closure_compiler.call(value_to_call, args)
+
+
+def tail_call(value_to_call, args, context, pos_start, pos_end):
+    if value_to_call.__class__ is func.BuiltInFunction:
+        # A built-in leaves no frame behind, it is called right away
+        raise signals.ReturnSignal(closure_compiler.apply(value_to_call, args, context, pos_start, pos_end))
+    value_to_call = value_to_call.copy().set_pos(pos_start, pos_end).set_context(context)
+    raise signals.TailCallSignal(value_to_call, args)
+
+
+RUNTIME = {
+    'Number': num.Number,
+    'number': num.make,
+    'count': num.count,
+    'true': boolean.true,
+    'false': boolean.false,
+    'String': string.String,
+    'List': list.List,
+    'Dictionary': dict.Dictionary,
+    'SUBSCRIPTABLE': (list.List, string.String, dict.Dictionary),
+    'null': num.null,
+    'ErrorSignal': signals.ErrorSignal,
+    'RunTimeError': errors.RunTimeError,
+    'check': check,
+    'binary': operators.binary,
+    'check_operation': check_operation,
+    'check_index': check_index,
+    'check_unary': check_unary,
+    'not_defined': not_defined,
+    'make_function': make_function,
+    'call': call,
+    'tail_call': tail_call,
+}
+
+
+def execute(node, context):
+    transpiler = PythonTranspiler()
+    try:
+        program = transpiler.build(node)
+    except SyntaxError:
+        # Python allows only 20 nested loops and try blocks in a function, deeper programs run as closures
+        return closure_compiler.execute(node, context)
+
+    try:
+        result = program(context), None
+    except signals.ErrorSignal as signal:
+        result = None, signal.error
+    except Exception as exception:
+        # The generated lines stay in linecache for the traceback of the exception
+        add_source_note(exception)
+        raise
+    transpiler.forget()
+    return result
+
+
+def add_source_note(exception):
+    # Points a Python exception raised in generated code at the Sansam source it came from
+    pos_start = pos_end = None
+    tb = exception.__traceback__
+    while tb:
+        source_map = tb.tb_frame.f_globals.get('__source_map__')
+        if source_map and 0 < tb.tb_lineno <= len(source_map) and source_map[tb.tb_lineno - 1][0]:
+            pos_start, pos_end = source_map[tb.tb_lineno - 1]
+        tb = tb.tb_next
+
+    if pos_start:
+        exception.add_note(
+            f'सञ्चिका {pos_start.fn}, पङ्क्ति {pos_start.line + 1}\n\n'
+            + error_str.Error_String_With_Arrows(pos_start.ftext, pos_start, pos_end)
+        )
+
+
+class PythonTranspiler:
+    # Writes the tree as the source of a Python module with one function per Sansam
+    # function and one for the program, each taking the context it runs in. Values stay
+    # Sansam values, but statements, loops, यच्छ, विघ्नः and अनुवर्तते become Python ones.
+    # Every line generated is mapped to the span of the node it came from.
+    def __init__(self):
+        self.namespace = RUNTIME.copy()
+        self.constants = {}
+        self.spans = {}
+        self.functions = []
+        self.temps = itertools.count()
+        self.function_count = itertools.count()
+
+        self.lines = []
+        self.indent = 0
+        # What विघ्नः, अनुवर्तते and यच्छ leave: 'program', 'function', 'loop' or 'each'
+        self.scopes = []
+        self.node = None
+        self.filename = None
+
+    def build(self, node):
+        # Returns the program's Python function
+        source, source_map = self.transpile(node)
+        self.filename = f'<sansam {next(module_numbers)}>'
+        self.namespace['__source_map__'] = source_map
+
+        code = compile(source, self.filename, 'exec')
+        linecache.cache[self.filename] = (len(source), None, source.splitlines(True), self.filename)
+        exec(code, self.namespace)
+        return self.namespace['program']
+
+    def forget(self):
+        # Drops the module's lines from linecache once the program has run, every run adds a module
+        linecache.cache.pop(self.filename, None)
+
+    def transpile(self, node):
+        # Returns the module source and the span of each of its lines
+        self.function('program', node, 'program')
+
+        lines = [line for function in self.functions for line in function]
+        source = '\n'.join(text for text, span in lines) + '\n'
+        return source, [span for text, span in lines]
+
+    def function(self, name, body_node, scope):
+        saved = self.lines, self.indent, self.scopes, self.node
+        self.lines, self.indent, self.scopes, self.node = [], 0, [scope], body_node
+
+        self.emit(f'def {name}(context):')
+        self.indent += 1
+        self.emit('table = context.symbol_table')
+        self.emit('slots = table.slots')
+        self.emit('root = table.root')
+        self.emit('shadowed = root.shadowed')
+        self.emit('root_symbols = root.symbols')
+        value = self.expr(body_node)
+        self.emit(f'return {value}')
+        self.emit('')
+
+        self.functions.append(self.lines)
+        self.lines, self.indent, self.scopes, self.node = saved
+
+    def expr(self, node):
+        # Emits the statements node needs and returns the Python expression of its value
+        method = getattr(self, f'transpile_{type(node).__name__}', None)
+        if method is None:
+            raise Exception(f"No visit_{type(node).__name__} method defined")
+        saved = self.node
+        self.node = node
+        value = method(node)
+        self.node = saved
+        return value
+
+    ###################################
+
+    def emit(self, text):
+        span = (self.node.pos_start, self.node.pos_end) if self.node else (None, None)
+        self.lines.append(('    ' * self.indent + text, span))
+
+    def temp(self):
+        return f'_t{next(self.temps)}'
+
+    def hoist(self, value):
+        # A temporary holding value, for expressions used twice or that must run before later statements
+        if TEMP.fullmatch(value):
+            return value
+        name = self.temp()
+        self.emit(f'{name} = {value}')
+        return name
+
+    def operands(self, operand_nodes):
+        # Expressions of the nodes evaluated left to right. When a later node needs statements,
+        # the expressions before it are stored in temporaries ahead of those statements.
+        values = []
+        ends = []
+        for node in operand_nodes:
+            values.append(self.expr(node))
+            ends.append(len(self.lines))
+
+        end = len(self.lines)
+        for index in range(len(values) - 2, -1, -1):
+            if ends[index] < end and not TEMP.fullmatch(values[index]):
+                name = self.temp()
+                text, span = self.lines[ends[index] - 1] if ends[index] else ('', (None, None))
+                self.lines.insert(ends[index], ('    ' * self.indent + f'{name} = {values[index]}', span))
+                values[index] = name
+        return values
+
+    def constant(self, value):
+        name = f'k{len(self.constants)}'
+        self.constants[name] = value
+        self.namespace[name] = value
+        return name
+
+    def span(self, node):
+        key = (node.pos_start, node.pos_end)
+        name = self.spans.get(key)
+        if name is None:
+            index = len(self.spans)
+            name = self.spans[key] = f'ps{index}, pe{index}'
+            self.namespace[f'ps{index}'], self.namespace[f'pe{index}'] = key
+        return name
+
+    def lookup(self, node, symbol, name, cache=None):
+        depth, slot = node.depth, node.slot
+        if cache:
+            cache = self.constant(cache)
+            self.block(f'if {cache}.version == root.version:')
+            self.emit(f'{name} = {cache}.value')
+            self.emit(f'{cache}.hits += 1')
+            self.end_block()
+            self.block('else:')
+            self.emit(f'{name} = {cache}.fill(table)')
+            self.end_block()
+        elif depth == st.LOCAL:
+            self.emit(f'{name} = slots[{slot}]')
+            self.emit(f'if {name} is None and table.parent:')
+            self.emit(f'    {name} = table.parent.get_symbol({symbol})')
+        elif depth == st.GLOBAL:
+            self.emit(
+                f'{name} = table.get_symbol({symbol}) if {symbol} in shadowed else root_symbols.get({symbol})'
+            )
+        else:
+            self.emit(f'{name} = table.get_symbol({symbol})')
+
+    def store(self, node, symbol, value):
+        depth, slot = node.depth, node.slot
+        if depth == st.LOCAL:
+            self.emit(f'slots[{slot}] = {value}')
+        elif depth == st.GLOBAL:
+            self.emit(f'root.store({symbol}, {value})')
+        else:
+            self.emit(f'table.set_symbol({symbol}, {value})')
+
+    def block(self, header):
+        self.emit(header)
+        self.indent += 1
+
+    def end_block(self):
+        self.indent -= 1
+
+    ###################################
+
+    def transpile_NumberNode(self, node):
+        return self.constant(num.make(node.tok.value))
+
+    def transpile_StringNode(self, node):
+        return self.constant(string.String(node.tok.value))
+
+    def transpile_BooleanNode(self, node):
+        return self.constant(boolean.make(node.tok.value))
+
+    def transpile_ConstantNode(self, node):
+        return self.constant(node.value)
+
+    def transpile_ListNode(self, node):
+        elements = self.operands(node.element_nodes)
+        return f'List([{", ".join(elements)}]).set_context(context).set_pos({self.span(node)})'
+
+    def transpile_DictionaryNode(self, node):
+        items = self.operands([item for pair in node.element_nodes.items() for item in pair])
+        pairs = [f'{items[index]}.copy(): {items[index + 1]}' for index in range(0, len(items), 2)]
+        return f'Dictionary({{{", ".join(pairs)}}}).set_context(context).set_pos({self.span(node)})'
+
+    def transpile_ForNode(self, node):
+        elements = self.elements(node)
+        value_nodes = [node.end_value_node]
+        if node.start_value_node:
+            value_nodes.insert(0, node.start_value_node)
+        if node.step_value_node:
+            value_nodes.append(node.step_value_node)
+        values = self.operands(value_nodes)
+
+        start, end, step = self.temp(), self.temp(), self.temp()
+        self.emit(f'{start} = {values[0]}.value' if node.start_value_node else f'{start} = 0')
+        self.emit(f'{end} = {values[1 if node.start_value_node else 0]}.value')
+        if node.step_value_node:
+            self.emit(f'{step} = {values[-1]}.value')
+        else:
+            self.emit(f'{step} = 1 if {start} < {end} else -1')
+
+        i = self.temp()
+        self.block(f'for {i} in count({start}, {end}, {step}):')
+        self.scopes.append('loop')
+
+        self.store(node, node.var_name_tok.symbol, f'number({i})')
+        self.collect(elements, self.expr(node.body_node))
+
+        self.scopes.pop()
+        self.end_block()
+        return self.loop_list(node, elements)
+
+    def transpile_ForEachNode(self, node):
+        list_name = self.temp()
+        result = self.temp()
+        self.emit(f'{list_name} = table.get_symbol({node.list_name.symbol})')
+
+        self.block(f'if isinstance({list_name}, List) or isinstance({list_name}, String):')
+        self.emit(f'print({list_name}.iter(), "li") if isinstance({list_name}, List) else print({list_name})')
+        var_name = self.temp()
+        self.block(f'for {var_name} in {list_name}.iter():')
+        self.store(node, node.var_name.symbol, var_name)
+        self.scopes.append('each')
+
+        # The body's errors and signals end the iteration and are then dropped, as in the interpreter
+        self.block('try:')
+        value = self.expr(node.body_node)
+        self.emit(value)
+        self.end_block()
+        self.block('except ErrorSignal:')
+        self.emit('pass')
+        self.end_block()
+
+        self.scopes.pop()
+        self.end_block()
+        self.emit(f'{result} = List([]).set_context(context).set_pos({self.span(node)})')
+        self.end_block()
+        self.block('else:')
+        self.emit(f'{result} = None')
+        self.end_block()
+        return result
+
+    def transpile_VarAccessNode(self, node):
+        value = self.temp()
+        span = self.span(node)
+        self.lookup(node, node.var_name_tok.symbol, value, node.cache)
+        self.block(f'if not {value}:')
+        self.emit(f'raise not_defined({node.var_name_tok.value!r}, {span}, context)')
+        self.end_block()
+        return value
+
+    def transpile_DataAccessNode(self, node):
+        value = self.temp()
+        span = self.span(node)
+        self.lookup(node, node.var_name_tok.symbol, value)
+        self.block(f'if not {value}:')
+        self.emit(f'raise not_defined({node.var_name_tok.value!r}, {span}, context)')
+        self.end_block()
+        self.block(f'if not isinstance({value}, SUBSCRIPTABLE):')
+        self.emit(f'raise ErrorSignal(RunTimeError({span}, "Dictionary, list and string should be present"))')
+        self.end_block()
+
+        index = self.hoist(self.expr(node.index_tok))
+        return f'check_index({value}.division({index}), {value}, {index}, context, {self.span(node.index_tok)})'
+
+    def transpile_VarAssignNode(self, node):
+        value = self.hoist(self.expr(node.value_node))
+        self.store(node, node.var_name_tok.symbol, value)
+        return value
+
+    def transpile_BinOpNode(self, node):
+        left, right = self.operands([node.left_node, node.right_node])
+        if node.op_tok.type == token.T_KEYWORD:
+            operation = operators.LOGICAL_OPERATIONS[node.op_tok.value]
+        else:
+            operation = operators.BINARY_OPERATIONS[node.op_tok.type]
+
+        left, right = self.hoist(left), self.hoist(right)
+        checked = (
+            f'check_operation(binary({left}, {operation!r}, {right}), {left}, {operation!r}, {right}, context, '
+            f'{self.span(node.left_node)}, {self.span(node.right_node)})'
+        )
+        if operation not in NUMBER_OPERATIONS:
+            return checked
+
+        # Two Numbers are combined in Python directly, as their methods would
+        operator, is_number = NUMBER_OPERATIONS[operation]
+        result = f'{left}.value {operator} {right}.value'
+        result = f'number({result})' if is_number else f'(true if {result} else false)'
+        return f'({result} if {left}.__class__ is Number is {right}.__class__ else {checked})'
+
+    def transpile_UnaryOpNode(self, node):
+        number = self.expr(node.node)
+        operand_span = self.span(node.node)
+        if node.op_tok.type == token.T_MINUS:
+            number = self.hoist(number)
+            result = f'Number(0).subtraction({number})'
+            return f'check_unary({result}, {number}, "subtraction", context, {operand_span})'
+        elif node.op_tok.matches(token.T_KEYWORD, 'न') or node.op_tok.type == token.T_NOT:
+            number = self.hoist(number)
+            return f'check_unary({number}.notted(), {number}, "notted", context, {operand_span})'
+        elif node.op_tok.type == token.T_BIT_NOT:
+            number = self.hoist(number)
+            return f'check_unary({number}.bitnotted(), {number}, "bitnotted", context, {operand_span})'
+        return number
+
+    def transpile_FactorialNode(self, node):
+        return f'check({self.expr(node.node)}.factorial())'
+
+    def transpile_WhileNode(self, node):
+        elements = self.elements(node)
+
+        self.block('while True:')
+        header = len(self.lines) - 1
+        self.scopes.append('loop')
+        condition = self.expr(node.condition_node)
+        if len(self.lines) == header + 1:
+            # The condition needs no statements of its own, it can be the loop's
+            text, span = self.lines[header]
+            self.lines[header] = (text.replace('while True:', f'while {condition}.is_true():'), span)
+        else:
+            self.block(f'if not {condition}.is_true():')
+            self.emit('break')
+            self.end_block()
+
+        self.collect(elements, self.expr(node.body_node))
+        self.scopes.pop()
+        self.end_block()
+        return self.loop_list(node, elements)
+
+    def elements(self, node):
+        # The list a loop collects its body's values in, None when nothing uses the loop's value
+        if not node.collects:
+            return None
+        elements = self.temp()
+        self.emit(f'{elements} = []')
+        return elements
+
+    def collect(self, elements, value):
+        self.emit(f'{elements}.append({value})' if elements else value)
+
+    def loop_list(self, node, elements):
+        if not elements:
+            return 'null'
+        return f'List({elements}).set_context(context).set_pos({self.span(node)})'
+
+    def transpile_FuncDefNode(self, node):
+        body = f'f{next(self.function_count)}'
+        self.function(body, node.body_node, 'function')
+
+        func_value = self.temp()
+        func_name = node.var_name_tok.value if node.var_name_tok else None
+        arg_names = self.constant([arg_name.value for arg_name in node.arg_name_tokens])
+        layout = self.constant(node.layout)
+        self.emit(
+            f'{func_value} = make_function({func_name!r}, {arg_names}, {node.should_auto_return!r}, '
+            f'{layout}, {body}, context, {self.span(node)})'
+        )
+        if node.var_name_tok:
+            self.store(node, node.var_name_tok.symbol, func_value)
+        return func_value
+
+    def transpile_CallNode(self, node):
+        values = self.operands([node.node_to_call] + node.arg_nodes)
+        return f'call({values[0]}, [{", ".join(values[1:])}], context, {self.span(node)})'
+
+    def transpile_IfNode(self, node):
+        result = self.temp()
+        opened = 0
+        for index, (condition, expr) in enumerate(node.cases):
+            mark = len(self.lines)
+            value = self.expr(condition)
+            if index and len(self.lines) == mark:
+                # No statements to run before the condition, the else above becomes an elif
+                self.lines.pop()
+                self.indent -= 1
+                opened -= 1
+                self.block(f'elif {value}.is_true():')
+            else:
+                self.block(f'if {value}.is_true():')
+            self.emit(f'{result} = {self.expr(expr)}')
+            self.end_block()
+            self.block('else:')
+            opened += 1
+
+        self.emit(f'{result} = {self.expr(node.else_case) if node.else_case else "None"}')
+        self.indent -= opened
+        return result
+
+    def transpile_ReturnNode(self, node):
+        if node.tail_call:
+            # CompiledFunction.call makes the call once the function has ended
+            values = self.operands([node.node_to_return.node_to_call] + node.node_to_return.arg_nodes)
+            self.emit(f'tail_call({values[0]}, [{", ".join(values[1:])}], context, {self.span(node.node_to_return)})')
+            return 'None'
+
+        value = self.expr(node.node_to_return) if node.node_to_return else 'null'
+        scope = next(scope for scope in reversed(self.scopes) if scope != 'loop')
+        if scope == 'function':
+            self.emit(f'return {value}')
+        else:
+            # Outside a function the program ends without a value, in a for-each body the iteration ends
+            self.emit(value)
+            self.emit('continue' if scope == 'each' else 'return None')
+        return 'None'
+
+    def transpile_ContinueNode(self, node):
+        self.emit('continue' if self.scopes[-1] in ('loop', 'each') else 'return None')
+        return 'None'
+
+    def transpile_BreakNode(self, node):
+        scope = self.scopes[-1]
+        if scope == 'loop':
+            self.emit('break')
+        else:
+            self.emit('continue' if scope == 'each' else 'return None')
+        return 'None'
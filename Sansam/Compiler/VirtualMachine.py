@@ -0,0 +1,453 @@
+import Sansam.Compiler.Bytecode as bc
+import Sansam.Compiler.BytecodeCompiler as bytecode_compiler
+import Sansam.Interpreter.RunTimeResult as rtr
+import Sansam.Interpreter.SymbolTable as st
+import Sansam.Interpreter.Signals as signals
+import Sansam.Error.Errors as errors
+import Sansam.Values.Number as num
+import Sansam.Values.String as string
+import Sansam.Values.List as list
+import Sansam.Values.Function as func
+import Sansam.Values.Dictionary as dict
+import Sansam.Values.Operators as operators
+
+# BINARY_OP's function for two Numbers, by argument
+NUMBER_OPERATIONS = [operators.NUMBER[operation] for operation in bc.OPERATIONS]
+
+# What EACH_NEXT and FOR_NEXT get from an exhausted iterator, list elements may be None
+DONE = object()
+
+
+class BytecodeFunction(func.Function):
+    def __init__(self, name, body_node, arg_names, should_auto_return, layout, code):
+        super().__init__(name, body_node, arg_names, should_auto_return, layout)
+        self.code = code
+
+    def execute(self, args):
+        # Only used when another engine or a built-in calls the function, the VM pushes a frame itself
+        return VirtualMachine().call(self, args)
+
+
+class Frame:
+    __slots__ = ('code', 'context', 'stack', 'blocks', 'pc')
+
+    def __init__(self, code, context):
+        self.code = code
+        self.context = context
+        self.stack = []
+        # (kind, stack level, break target, continue target) of the loops the frame is in
+        self.blocks = []
+        self.pc = 0
+
+
+def make_caches(code):
+    code.caches = [
+        st.GlobalCache(var_name, symbol) if depth == st.GLOBAL else None
+        for var_name, symbol, depth, slot in code.variables
+    ]
+    return code.caches
+
+
+def execute(node, context):
+    return execute_code(bytecode_compiler.BytecodeCompiler().compile(node), context)
+
+
+def execute_code(code, context):
+    return VirtualMachine().run(Frame(code, context))
+
+
+class VirtualMachine:
+    # Runs Code on a stack of frames instead of the Python stack, so a call of a Sansam
+    # function does not recurse into the VM. Errors unwind the frames to the nearest
+    # for-each body, which drops them as the interpreter does, or end the run.
+
+    def run(self, frame):
+        frames = [frame]
+        while True:
+            try:
+                return self.loop(frames), None
+            except signals.ErrorSignal as signal:
+                if not self.unwind(frames):
+                    return None, signal.error
+
+    def call(self, function, args):
+        res = rtr.RunTimeResult()
+        exec_ctx, error = function.new_frame(args)
+        if error: return res.failure(error)
+
+        value, error = self.run(Frame(function.code, exec_ctx))
+        if error: return res.failure(error)
+        st.release(exec_ctx.symbol_table)
+        return res.success(value)
+
+    def unwind(self, frames):
+        while True:
+            frame = frames[-1]
+            for index in range(len(frame.blocks) - 1, -1, -1):
+                if frame.blocks[index][0] == bc.EACH_BLOCK:
+                    self.resume(frame, index)
+                    return True
+            if len(frames) == 1:
+                return False
+            frames.pop()
+
+    def resume(self, frame, index):
+        # Goes on with the next iteration of the for-each whose block is at index
+        kind, level, break_target, continue_target = frame.blocks[index]
+        del frame.blocks[index + 1:]
+        del frame.stack[level:]
+        frame.pc = continue_target
+
+    ###################################
+
+    def loop(self, frames):
+        # The outer loop loads the top frame, the inner one runs it until a call or return changes frames
+        while True:
+            frame = frames[-1]
+            code = frame.code
+            instructions = code.instructions
+            constants = code.constants
+            variables = code.variables
+            caches = code.caches if code.caches is not None else make_caches(code)
+            spans = code.spans
+            context = frame.context
+            stack = frame.stack
+            blocks = frame.blocks
+            pc = frame.pc
+            number = num.Number
+
+            while True:
+                op, arg, span = instructions[pc]
+                pc += 1
+
+                if op == bc.LOAD_LOCAL:
+                    var_name, symbol, depth, slot = variables[arg]
+                    table = context.symbol_table
+                    value = table.slots[slot]
+                    if value is None and table.parent:
+                        value = table.parent.get_symbol(symbol)
+                    if not value:
+                        raise signals.ErrorSignal(self.not_defined(var_name, spans[span], context))
+                    stack.append(value)
+
+                elif op == bc.LOAD_CONST:
+                    stack.append(constants[arg])
+
+                elif op == bc.BINARY_OP:
+                    right = stack.pop()
+                    left = stack.pop()
+                    if left.__class__ is number is right.__class__:
+                        result, error = NUMBER_OPERATIONS[arg](left, right)
+                    else:
+                        result, error = operators.binary(left, bc.OPERATIONS[arg], right)
+                    if error:
+                        left, right = self.placed(code, pc - 1, (left, right), context)
+                        raise signals.ErrorSignal(operators.binary(left, bc.OPERATIONS[arg], right)[1])
+                    stack.append(result)
+
+                elif op == bc.LOAD_GLOBAL:
+                    var_name, symbol, depth, slot = variables[arg]
+                    root = context.symbol_table.root
+                    if symbol in root.shadowed:
+                        value = context.symbol_table.get_symbol(symbol)
+                    else:
+                        value = root.symbols.get(symbol, None)
+                    if not value:
+                        raise signals.ErrorSignal(self.not_defined(var_name, spans[span], context))
+                    stack.append(value)
+
+                elif op == bc.LOAD_GLOBAL_CACHED:
+                    cache = caches[arg]
+                    if cache.version == context.symbol_table.root.version:
+                        cache.hits += 1
+                        value = cache.value
+                    else:
+                        value = cache.fill(context.symbol_table)
+                    if not value:
+                        raise signals.ErrorSignal(self.not_defined(variables[arg][0], spans[span], context))
+                    stack.append(value)
+
+                elif op == bc.STORE_LOCAL:
+                    context.symbol_table.slots[variables[arg][3]] = stack[-1]
+
+                elif op == bc.STORE_GLOBAL:
+                    context.symbol_table.root.store(variables[arg][1], stack[-1])
+
+                elif op == bc.POP:
+                    stack.pop()
+
+                elif op == bc.POP_JUMP_IF_FALSE:
+                    if not stack.pop().is_true():
+                        pc = arg
+
+                elif op == bc.BUILD_LIST:
+                    elements = stack[len(stack) - arg:]
+                    del stack[len(stack) - arg:]
+                    pos_start, pos_end = spans[span]
+                    stack.append(list.List(elements).set_context(context).set_pos(pos_start, pos_end))
+
+                elif op == bc.JUMP:
+                    pc = arg
+
+                elif op == bc.LIST_APPEND:
+                    value = stack.pop()
+                    stack[-arg].append(value)
+
+                elif op == bc.FOR_NEXT:
+                    i = next(stack[-1], DONE)
+                    if i is DONE:
+                        pc = arg
+                    else:
+                        stack.append(num.make(i))
+
+                elif op == bc.CALL:
+                    args = stack[len(stack) - arg:]
+                    del stack[len(stack) - arg:]
+                    pos_start, pos_end = spans[span]
+                    value_to_call = stack.pop()
+
+                    if value_to_call.__class__ is func.BuiltInFunction:
+                        # Makes no frame, so it is called as it is
+                        value, error = value_to_call.apply(args, context, pos_start, pos_end)
+                        if error:
+                            raise signals.ErrorSignal(error)
+                        stack.append(value)
+                        continue
+
+                    value_to_call = value_to_call.copy().set_pos(pos_start, pos_end).set_context(context)
+                    if isinstance(value_to_call, BytecodeFunction):
+                        exec_ctx, error = value_to_call.new_frame(args)
+                        if error:
+                            raise signals.ErrorSignal(error)
+
+                        frame.pc = pc
+                        frames.append(Frame(value_to_call.code, exec_ctx))
+                        break
+
+                    res = value_to_call.execute(args)
+                    if res.error:
+                        raise signals.ErrorSignal(res.error)
+                    stack.append(res.value)
+
+                elif op == bc.RETURN_VALUE:
+                    value = stack.pop()
+                    if self.leave(frames, value):
+                        return value
+                    break
+
+                elif op == bc.LOAD_NAME:
+                    var_name, symbol, depth, slot = variables[arg]
+                    value = context.symbol_table.get_symbol(symbol)
+                    if not value:
+                        raise signals.ErrorSignal(self.not_defined(var_name, spans[span], context))
+                    stack.append(value)
+
+                elif op == bc.STORE_NAME:
+                    context.symbol_table.set_symbol(variables[arg][1], stack[-1])
+
+                elif op == bc.LOAD_SUBSCRIPTABLE:
+                    var_name, symbol, depth, slot = variables[arg]
+                    value = context.symbol_table.lookup(depth, slot, symbol)
+                    if not value:
+                        raise signals.ErrorSignal(self.not_defined(var_name, spans[span], context))
+                    if not isinstance(value, (list.List, string.String, dict.Dictionary)):
+                        pos_start, pos_end = spans[span]
+                        raise signals.ErrorSignal(errors.RunTimeError(
+                            pos_start, pos_end, "Dictionary, list and string should be present"
+                        ))
+                    stack.append(value)
+
+                elif op == bc.INDEX:
+                    index = stack.pop()
+                    value = stack.pop()
+                    result, error = value.division(index)
+                    if error:
+                        index, = self.placed(code, pc - 1, (index,), context)
+                        raise signals.ErrorSignal(value.division(index)[1])
+                    stack.append(result)
+
+                elif op == bc.UNARY_OP:
+                    number = stack.pop()
+                    result, error = self.unary_operation(arg, number)
+                    if error:
+                        number, = self.placed(code, pc - 1, (number,), context)
+                        raise signals.ErrorSignal(self.unary_operation(arg, number)[1])
+                    stack.append(result)
+
+                elif op == bc.FACTORIAL:
+                    number, error = stack.pop().factorial()
+                    if error:
+                        raise signals.ErrorSignal(error)
+                    stack.append(number)
+
+                elif op == bc.BUILD_DICT:
+                    items = stack[len(stack) - 2 * arg:]
+                    del stack[len(stack) - 2 * arg:]
+                    elements = {}
+                    for index in range(0, len(items), 2):
+                        elements[items[index].copy()] = items[index + 1]
+                    pos_start, pos_end = spans[span]
+                    stack.append(dict.Dictionary(elements).set_context(context).set_pos(pos_start, pos_end))
+
+                elif op == bc.LOAD_NONE:
+                    stack.append(None)
+
+                elif op == bc.LOAD_NULL:
+                    stack.append(num.null)
+
+                elif op == bc.JUMP_IF_NONE:
+                    if stack[-1] is None:
+                        pc = arg
+
+                elif op == bc.NEW_ELEMENTS:
+                    stack.append([])
+
+                elif op == bc.MAKE_LOOP_LIST:
+                    pos_start, pos_end = spans[span]
+                    stack.append(list.List(stack.pop()).set_context(context).set_pos(pos_start, pos_end))
+
+                elif op == bc.FOR_PREPARE:
+                    step_value = stack.pop() if arg else None
+                    end_value = stack.pop()
+                    start_value = stack.pop()
+                    if step_value is not None:
+                        step = step_value.value
+                    elif start_value.value < end_value.value:
+                        step = 1
+                    else:
+                        step = -1
+                    stack.append(iter(num.count(start_value.value, end_value.value, step)))
+
+                elif op == bc.GET_EACH:
+                    list_name = context.symbol_table.get_symbol(variables[arg][1])
+                    if isinstance(list_name, list.List):
+                        print(list_name.iter(), "li")
+                    elif isinstance(list_name, string.String):
+                        print(list_name)
+                    else:
+                        stack.append(None)
+                        continue
+                    stack.append(iter(list_name.iter()))
+
+                elif op == bc.EACH_NEXT:
+                    value = next(stack[-1], DONE)
+                    if value is DONE:
+                        pc = arg
+                    else:
+                        stack.append(value)
+
+                elif op == bc.SETUP_LOOP:
+                    blocks.append((bc.LOOP_BLOCK, len(stack), arg, pc))
+
+                elif op == bc.SETUP_EACH:
+                    blocks.append((bc.EACH_BLOCK, len(stack), arg, pc))
+
+                elif op == bc.POP_BLOCK:
+                    blocks.pop()
+
+                elif op == bc.BREAK or op == bc.CONTINUE:
+                    if not blocks:
+                        # Outside a loop the function (or program) ends without a value
+                        if self.leave(frames, None):
+                            return None
+                        break
+                    kind, level, break_target, continue_target = blocks[-1]
+                    del stack[level:]
+                    if kind == bc.LOOP_BLOCK and op == bc.BREAK:
+                        blocks.pop()
+                        pc = break_target
+                    else:
+                        pc = continue_target
+
+                elif op == bc.RETURN:
+                    value = stack.pop()
+                    for index in range(len(blocks) - 1, -1, -1):
+                        if blocks[index][0] == bc.EACH_BLOCK:
+                            # A for-each body drops the return like any other signal
+                            self.resume(frame, index)
+                            pc = frame.pc
+                            break
+                    else:
+                        if self.leave(frames, value):
+                            return value
+                        break
+
+                elif op == bc.TAIL_CALL:
+                    args = stack[len(stack) - arg:]
+                    del stack[len(stack) - arg:]
+                    pos_start, pos_end = spans[span]
+                    value_to_call = stack.pop()
+
+                    if value_to_call.__class__ is func.BuiltInFunction:
+                        value, error = value_to_call.apply(args, context, pos_start, pos_end)
+                        if error:
+                            raise signals.ErrorSignal(error)
+                        if self.leave(frames, value):
+                            return value
+                        break
+
+                    value_to_call = value_to_call.copy().set_pos(pos_start, pos_end).set_context(context)
+                    if isinstance(value_to_call, BytecodeFunction):
+                        if value_to_call.code is code and len(args) == value_to_call.arity:
+                            # The function calls itself, its frame starts over with the new arguments, see
+                            # Function.reenters
+                            value_to_call.bind_args(context.symbol_table, args)
+                            del stack[:]
+                            del blocks[:]
+                            pc = 0
+                            continue
+
+                        exec_ctx, error = value_to_call.new_frame(args)
+                        if error:
+                            raise signals.ErrorSignal(error)
+                        # The callee's frame takes the place of this one and returns to its caller. This
+                        # one's table stays, being the callee's parent.
+                        frames[-1] = Frame(value_to_call.code, exec_ctx)
+                        break
+
+                    res = value_to_call.execute(args)
+                    if res.error:
+                        raise signals.ErrorSignal(res.error)
+                    if self.leave(frames, res.value):
+                        return res.value
+                    break
+
+                elif op == bc.MAKE_FUNCTION:
+                    function_code = constants[arg]
+                    pos_start, pos_end = spans[span]
+                    stack.append(BytecodeFunction(
+                        function_code.name, None, function_code.arg_names, function_code.should_auto_return,
+                        function_code.layout, function_code
+                    ).set_context(context).set_pos(pos_start, pos_end))
+                    if function_code.layout:
+                        context.symbol_table.root.shadow(function_code.layout)
+
+                else:
+                    raise Exception(f'Unknown opcode {op}')
+
+    def leave(self, frames, value):
+        # Returns True when the frame left is the one the run started with, else hands value to the caller
+        if len(frames) == 1:
+            return True
+        st.release(frames.pop().context.symbol_table)
+        frames[-1].stack.append(value)
+        return False
+
+    def unary_operation(self, operation, number):
+        if operation == bc.UNARY_MINUS:
+            return num.Number(0).subtraction(number)
+        if operation == bc.UNARY_NOT:
+            return number.notted()
+        if operation == bc.UNARY_BIT_NOT:
+            return number.bitnotted()
+        return number, None
+
+    def placed(self, code, index, values, context):
+        # The operands of instructions[index] copied to where they were used, to make its error again
+        return [
+            value.at(*code.spans[span], context) for value, span in zip(values, code.operand_spans[index])
+        ]
+
+    def not_defined(self, var_name, span, context):
+        pos_start, pos_end = span
+        return errors.RunTimeError(pos_start, pos_end, f"'{var_name}' is not defined", context)
@@ -4,3 +4,5 @@ class Context:
         self.parent = parent
         self.parent_entry_pos = parent_entry_pos
         self.symbol_table = None
+        # Calls between this context and the program's, scoping being dynamic each call's context is its caller's child
+        self.depth = parent.depth + 1 if parent else 0
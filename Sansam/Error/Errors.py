@@ -1,5 +1,8 @@
+import itertools
 import Sansam.Error.Error_String_With_Arrows as error_str
 
+TRACEBACK_REPEATS = 3
+
 
 class Error:
     def __init__(self, pos_start, pos_end, error_name, details):
@@ -39,14 +42,24 @@ class RunTimeError(Error):
         return result
 
     def generate_traceback(self):
-        result = ''
+        lines = []
         pos = self.pos_start
         ctx = self.context
 
         while ctx:
-            result = f' सञ्चिका {pos.fn}, पङ्क्ति {str(pos.line + 1)}, in {ctx.display_name}\n' + result
+            lines.append(f' सञ्चिका {pos.fn}, पङ्क्ति {str(pos.line + 1)}, in {ctx.display_name}\n')
             pos = ctx.parent_entry_pos
             ctx = ctx.parent
+        lines.reverse()
+
+        # Recursion repeats a line, it is shown TRACEBACK_REPEATS times and the rest counted
+        result = []
+        for line, group in itertools.groupby(lines):
+            count = sum(1 for _ in group)
+            result.append(line * min(count, TRACEBACK_REPEATS))
+            if count > TRACEBACK_REPEATS:
+                # [Previous line repeated n more times]
+                result.append(f'  [पूर्व पङ्क्ति {count - TRACEBACK_REPEATS} वारम् अधिकम् आवृत्ता]\n')
 
-        return 'Traceback (अधिकतम अपूर्व आहू गत):\n' + result
+        return 'Traceback (अधिकतम अपूर्व आहू गत):\n' + ''.join(result)
         # (most recent call last)
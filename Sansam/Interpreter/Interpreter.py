@@ -1,4 +1,5 @@
 import Sansam.Interpreter.RunTimeResult as rtr
+import Sansam.Interpreter.Signals as signals
 import Sansam.Error.Errors as errors
 import Sansam.Values.Number as num
 import Sansam.Lexer.Token as token
@@ -8,15 +9,24 @@ import Sansam.Values.List as list
 import Sansam.Values.Function as func
 import Sansam.Values.Dictionary as dict
 import Sansam.Parser.Nodes as nodes
+import Sansam.Values.Operators as operators
 
 
 class Interpreter:
+    # Node class to visit function, filled in the first time a class is visited
+    dispatch = {}
 
     def visit(self, node, context):
+        try:
+            method = self.dispatch[type(node)]
+        except KeyError:
+            method = self.dispatch_method(type(node))
+        return method(self, node, context)
 
-        method_name = f'visit_{type(node).__name__}'
-        method = getattr(self, method_name, self.no_visit_method)
-        return method(node, context)
+    def dispatch_method(self, node_type):
+        method = getattr(Interpreter, f'visit_{node_type.__name__}', Interpreter.no_visit_method)
+        self.dispatch[node_type] = method
+        return method
 
     def no_visit_method(self, node, context):
         raise Exception(f"No visit_{type(node).__name__} method defined")
@@ -24,15 +34,16 @@ class Interpreter:
     ###################################
 
     def visit_NumberNode(self, node, context):
-        return rtr.RunTimeResult().success(
-            num.Number(node.tok.value).set_context(context).set_pos(node.pos_start, node.pos_end)
-        )
+        return rtr.RunTimeResult().success(num.make(node.tok.value))
 
     def visit_StringNode(self, node, context):
         return rtr.RunTimeResult().success(
             string.String(node.tok.value).set_context(context).set_pos(node.pos_start, node.pos_end)
         )
 
+    def visit_ConstantNode(self, node, context):
+        return rtr.RunTimeResult().success(node.value)
+
     def visit_ListNode(self, node, context):
         res = rtr.RunTimeResult()
         elements = []
@@ -56,7 +67,8 @@ class Interpreter:
             value = res.register(self.visit(node.element_nodes[key_node], context))
             if res.should_return(): return res
 
-            elements[key] = value
+            # Entries are told apart by the key object, each gets one of its own
+            elements[key.copy()] = value
 
         return res.success(
             dict.Dictionary(elements).set_context(context).set_pos(node.pos_start, node.pos_end)
@@ -72,7 +84,7 @@ class Interpreter:
             if res.should_return():
                 return res
         else:
-            start_value = num.Number(0)
+            start_value = num.make(0)
 
         end_value = res.register(self.visit(node.end_value_node, context))
         if res.should_return():
@@ -84,17 +96,12 @@ class Interpreter:
         else:
             if start_value.value < end_value.value:
 
-                step_value = num.Number(1)
+                step_value = num.make(1)
             else:
-                step_value = num.Number(-1)
-        i = start_value.value
-        if step_value.value >= 0:
-            condition = lambda: i < end_value.value
-        else:
-            condition = lambda: i > end_value.value
-        while condition():
-            context.symbol_table.set(node.var_name_tok.value, num.Number(i))
-            i += step_value.value
+                step_value = num.make(-1)
+        assign = context.symbol_table.setter(node.depth, node.slot, node.var_name_tok.symbol)
+        for i in num.count(start_value.value, end_value.value, step_value.value):
+            assign(num.make(i))
 
             value = res.register(self.visit(node.body_node, context))
             if res.should_return() and res.loop_should_continue is False and res.loop_should_break is False:
@@ -106,8 +113,12 @@ class Interpreter:
             if res.loop_should_break:
                 break
 
-            elements.append(value)
+            if node.collects:
+                elements.append(value)
 
+        if not node.collects:
+            # Nothing uses the value of the loop
+            return res.success(num.null)
         return res.success(
             list.List(elements).set_context(context).set_pos(node.pos_start, node.pos_end)
         )
@@ -118,7 +129,7 @@ class Interpreter:
         elements=[]
 
         var_name=node.var_name.value
-        list_name=context.symbol_table.get(node.list_name.value)
+        list_name=context.symbol_table.get_symbol(node.list_name.symbol)
         #print(list_name)
 
 
@@ -127,7 +138,7 @@ class Interpreter:
             li=list_name.iter()
             print(li,"li")
             for var_name in li:
-                context.symbol_table.set(node.var_name.value,var_name)
+                context.symbol_table.assign(node.depth, node.slot, node.var_name.symbol, var_name)
                 value=res.register(self.visit(node.body_node,context))
                 #elements.append(value)
                 #print(elements)
@@ -139,7 +150,7 @@ class Interpreter:
             li=list_name.iter()
 
             for var_name in li:
-                context.symbol_table.set(node.var_name.value, var_name)
+                context.symbol_table.assign(node.depth, node.slot, node.var_name.symbol, var_name)
                 value = res.register(self.visit(node.body_node, context))
                 # elements.append(value)
                 # print(elements)
@@ -150,16 +161,17 @@ class Interpreter:
 
 
     def visit_BooleanNode(self, node, context):
-        return rtr.RunTimeResult().success(
-            boolean.Boolean(node.tok.value).set_context(context).set_pos(node.pos_start, node.pos_end)
-        )
+        return rtr.RunTimeResult().success(boolean.make(node.tok.value))
 
 
 
     def visit_VarAccessNode(self, node, context):
         res = rtr.RunTimeResult()
         var_name = node.var_name_tok.value
-        value = context.symbol_table.get(var_name)
+        if node.cache:
+            value = node.cache.lookup(context.symbol_table)
+        else:
+            value = context.symbol_table.lookup(node.depth, node.slot, node.var_name_tok.symbol)
 
         if not value:
             return res.failure(errors.RunTimeError(
@@ -167,14 +179,13 @@ class Interpreter:
                 f"'{var_name}' is not defined",
                 context
             ))
-        # print(value)
-        value = value.copy().set_pos(node.pos_start, node.pos_end).set_context(context)
+        # The stored value itself, an error made with it takes the position from this node
         return res.success(value)
 
     def visit_DataAccessNode(self, node, context):
         res = rtr.RunTimeResult()
         var_name = node.var_name_tok.value
-        value = context.symbol_table.get(var_name)
+        value = context.symbol_table.lookup(node.depth, node.slot, node.var_name_tok.symbol)
 
         if not value:
             return res.failure(errors.RunTimeError(
@@ -191,6 +202,8 @@ class Interpreter:
             result, error = value.division(index)
 
             if error:
+                index = index.at(node.index_tok.pos_start, node.index_tok.pos_end, context)
+                result, error = value.division(index)
                 return res.failure(error)
             else:
                 return res.success(result)
@@ -202,12 +215,11 @@ class Interpreter:
 
     def visit_VarAssignNode(self, node, context):
         res = rtr.RunTimeResult()
-        var_name = node.var_name_tok.value
         value = res.register(self.visit(node.value_node, context))
         if res.should_return():
             return res
 
-        context.symbol_table.set(var_name, value)
+        context.symbol_table.assign(node.depth, node.slot, node.var_name_tok.symbol, value)
         return res.success(value)
 
     def visit_BinOpNode(self, node, context):
@@ -219,49 +231,21 @@ class Interpreter:
         if res.should_return():
             return res
 
-        if node.op_tok.type == token.T_PLUS:
-            result, error = left.addition(right)
-        elif node.op_tok.type == token.T_MINUS:
-            result, error = left.subtraction(right)
-        elif node.op_tok.type == token.T_MUL:
-            result, error = left.multiplication(right)
-        elif node.op_tok.type == token.T_DIV:
-            result, error = left.division(right)
-        elif node.op_tok.type == token.T_MOD:
-            result, error = left.modulus(right)
-        elif node.op_tok.type == token.T_POW:
-            result, error = left.exponential(right)
-        elif node.op_tok.type == token.T_ISEQ:
-            result, error = left.get_comparison_eq(right)
-        elif node.op_tok.type == token.T_ISNEQ:
-            result, error = left.get_comparison_ne(right)
-        elif node.op_tok.type == token.T_ISL:
-            result, error = left.get_comparison_lt(right)
-        elif node.op_tok.type == token.T_ISG:
-            result, error = left.get_comparison_gt(right)
-        elif node.op_tok.type == token.T_BIT_AND:
-            result, error = left.get_comparison_bitand(right)
-        elif node.op_tok.type == token.T_BIT_OR:
-            result, error = left.get_comparison_bitor(right)
-        elif node.op_tok.type == token.T_ISLEQ:
-            result, error = left.get_comparison_lte(right)
-        elif node.op_tok.type == token.T_ISGEQ:
-            result, error = left.get_comparison_gte(right)
-        elif node.op_tok.type == token.T_RSHIFT:
-            result, error = left.get_shift_right(right)
-        elif node.op_tok.type == token.T_LSHIFT:
-            result, error = left.get_shift_left(right)
-        elif node.op_tok.type == token.T_XOR:
-            result, error = left.get_xor(right)
-        elif node.op_tok.matches(token.T_KEYWORD, 'च'):
-            result, error = left.anded_by(right)
-        elif node.op_tok.matches(token.T_KEYWORD, 'वा'):
-            result, error = left.ored_by(right)
-
+        result, error = self.binary_operation(node.op_tok, left, right)
         if error:
+            # Done again on copies placed where the operands were used, for the error's positions
+            left = left.at(node.left_node.pos_start, node.left_node.pos_end, context)
+            right = right.at(node.right_node.pos_start, node.right_node.pos_end, context)
+            result, error = self.binary_operation(node.op_tok, left, right)
             return res.failure(error)
+        return res.success(result)
+
+    def binary_operation(self, op_tok, left, right):
+        if op_tok.type == token.T_KEYWORD:
+            operation = operators.LOGICAL_OPERATIONS[op_tok.value]
         else:
-            return res.success(result.set_pos(node.pos_start, node.pos_end))
+            operation = operators.BINARY_OPERATIONS[op_tok.type]
+        return operators.binary(left, operation, right)
 
     def visit_UnaryOpNode(self, Node, context):
 
@@ -270,20 +254,25 @@ class Interpreter:
         if res.should_return():
             return res
 
+        result, error = self.unary_operation(Node.op_tok, number)
+        if error:
+            number = number.at(Node.node.pos_start, Node.node.pos_end, context)
+            result, error = self.unary_operation(Node.op_tok, number)
+            return res.failure(error)
+        return res.success(result)
+
+    def unary_operation(self, op_tok, number):
         error = None
 
-        if Node.op_tok.type == token.T_MINUS:
+        if op_tok.type == token.T_MINUS:
             number, error = num.Number(0).subtraction(number)
-        elif Node.op_tok.matches(token.T_KEYWORD, 'न') or Node.op_tok.type == token.T_NOT:
+        elif op_tok.matches(token.T_KEYWORD, 'न') or op_tok.type == token.T_NOT:
             number, error = number.notted()
 
-        elif Node.op_tok.type == token.T_BIT_NOT:
+        elif op_tok.type == token.T_BIT_NOT:
 
             number, error = number.bitnotted()
-        if error:
-            return res.failure(error)
-        else:
-            return res.success(number.set_pos(Node.pos_start, Node.pos_end))
+        return number, error
 
     def visit_FactorialNode(self, Node, context):
         res = rtr.RunTimeResult()
@@ -298,7 +287,7 @@ class Interpreter:
         if error:
             return res.failure(error)
         else:
-            return res.success(factorial.set_pos(Node.pos_start, Node.pos_end))
+            return res.success(factorial)
 
     def visit_WhileNode(self, node, context):
         res = rtr.RunTimeResult()
@@ -322,8 +311,11 @@ class Interpreter:
             if res.loop_should_break:
                 break
 
-            elements.append(value)
+            if node.collects:
+                elements.append(value)
 
+        if not node.collects:
+            return res.success(num.null)
         return res.success(
             list.List(elements).set_context(context).set_pos(node.pos_start, node.pos_end)
         )
@@ -336,16 +328,38 @@ class Interpreter:
         body_node = node.body_node
         arg_names = [arg_name.value for arg_name in node.arg_name_tokens]
 
-        func_value = func.Function(func_name, body_node, arg_names, node.should_auto_return).set_context(
+        func_value = func.Function(func_name, body_node, arg_names, node.should_auto_return, node.layout).set_context(
             context).set_pos(
             node.pos_start, node.pos_end)
 
+        if node.layout:
+            context.symbol_table.root.shadow(node.layout)
+
         if node.var_name_tok:
-            context.symbol_table.set(func_name, func_value)
+            context.symbol_table.assign(node.depth, node.slot, node.var_name_tok.symbol, func_value)
 
         return res.success(func_value)
 
     def visit_CallNode(self, node, context):
+        res = rtr.RunTimeResult()
+        call = res.register(self.call_arguments(node, context))
+        if res.should_return():
+            return res
+
+        value_to_call, args = call
+        if value_to_call.__class__ is func.BuiltInFunction:
+            return_value, error = value_to_call.apply(args, context, node.pos_start, node.pos_end)
+            if error: return res.failure(error)
+            return res.success(return_value)
+
+        return_value = res.register(value_to_call.execute(args))
+        if res.should_return():
+            return res
+
+        return res.success(return_value)
+
+    def call_arguments(self, node, context):
+        # The function a CallNode calls and its arguments
         res = rtr.RunTimeResult()
         args = []
 
@@ -353,7 +367,10 @@ class Interpreter:
         if res.should_return():
             return res
 
-        value_to_call = value_to_call.copy().set_pos(node.pos_start, node.pos_end)
+        # The one copy a call makes, the new frame's parent and entry position are those of the call.
+        # A built-in makes no frame and is called as it is.
+        if value_to_call.__class__ is not func.BuiltInFunction:
+            value_to_call = value_to_call.copy().set_pos(node.pos_start, node.pos_end).set_context(context)
 
         for arg_node in node.arg_nodes:
             args.append(res.register(self.visit(arg_node, context)))
@@ -361,12 +378,7 @@ class Interpreter:
             if res.should_return():
                 return res
 
-        return_value = res.register(value_to_call.execute(args))
-        if res.should_return():
-            return res
-
-        return_value = return_value.copy().set_pos(node.pos_start, node.pos_end).set_context(context)
-        return res.success(return_value)
+        return res.success((value_to_call, args))
 
     def visit_IfNode(self, node, context):
         res = rtr.RunTimeResult()
@@ -390,6 +402,19 @@ class Interpreter:
     def visit_ReturnNode(self, node, context):
         res = rtr.RunTimeResult()
 
+        if node.tail_call:
+            # Function.execute makes the call once the frame has returned
+            call = res.register(self.call_arguments(node.node_to_return, context))
+            if res.should_return(): return res
+            value_to_call, args = call
+            if value_to_call.__class__ is func.BuiltInFunction:
+                # A built-in leaves no frame behind, it is called right away
+                call_node = node.node_to_return
+                value, error = value_to_call.apply(args, context, call_node.pos_start, call_node.pos_end)
+                if error: return res.failure(error)
+                return res.success_return(value)
+            return res.success_return(signals.TailCallSignal(value_to_call, args))
+
         if node.node_to_return:
             value = res.register(self.visit(node.node_to_return, context))
             if res.should_return(): return res
@@ -403,3 +428,7 @@ class Interpreter:
 
     def visit_BreakNode(self, node, context):
         return rtr.RunTimeResult().success_break()
+
+
+# Visits keep nothing between them, every call of a function shares this one
+interpreter = Interpreter()
@@ -0,0 +1,313 @@
+import Sansam.Interpreter.RunTimeResult as rtr
+import Sansam.Interpreter.SymbolTable as st
+import Sansam.Interpreter.Signals as signals
+import Sansam.Error.Errors as errors
+import Sansam.Lexer.Token as token
+import Sansam.Values.Number as num
+import Sansam.Values.Boolean as boolean
+import Sansam.Values.String as string
+import Sansam.Values.List as list
+import Sansam.Values.Function as func
+import Sansam.Values.Dictionary as dict
+import Sansam.Values.Operators as operators
+
+
+class SignalFunction(func.Function):
+    def call(self, args):
+        function, exec_ctx = self, self.enter(args)
+        while True:
+            try:
+                value = interpreter.visit(function.body_node, exec_ctx)
+            except signals.ReturnSignal as signal:
+                value = signal.value
+            except (signals.BreakSignal, signals.ContinueSignal):
+                value = None
+            except signals.TailCallSignal as signal:
+                callee, args = signal.function, signal.args
+                if function.reenters(callee, args):
+                    function.bind_args(exec_ctx.symbol_table, args)
+                elif isinstance(callee, SignalFunction):
+                    function, exec_ctx = callee, callee.enter(args)
+                else:
+                    return call(callee, args)
+                continue
+            except RecursionError:
+                raise signals.ErrorSignal(function.stack_error())
+            st.release(exec_ctx.symbol_table)
+            return value
+
+    def enter(self, args):
+        exec_ctx, error = self.new_frame(args)
+        if error:
+            raise signals.ErrorSignal(error)
+        return exec_ctx
+
+    def execute(self, args):
+        res = rtr.RunTimeResult()
+        try:
+            return res.success(self.call(args))
+        except signals.ErrorSignal as signal:
+            return res.failure(signal.error)
+
+
+def call(function, args):
+    if isinstance(function, SignalFunction):
+        return function.call(args)
+    res = function.execute(args)
+    if res.error:
+        raise signals.ErrorSignal(res.error)
+    return res.value
+
+
+def apply(function, args, node, context):
+    # Calls a built-in at node
+    value, error = function.apply(args, context, node.pos_start, node.pos_end)
+    if error:
+        raise signals.ErrorSignal(error)
+    return value
+
+
+def execute(node, context):
+    try:
+        return interpreter.visit(node, context), None
+    except signals.ErrorSignal as signal:
+        return None, signal.error
+    except (signals.ReturnSignal, signals.BreakSignal, signals.ContinueSignal):
+        return None, None
+
+
+class SignalInterpreter:
+    # Walks the tree like Interpreter, but visits return the node's value itself. Errors,
+    # यच्छ, विघ्नः and अनुवर्तते are raised as signals, so no RunTimeResult is made per node.
+
+    # Node class to visit function, filled in the first time a class is visited
+    dispatch = {}
+
+    def visit(self, node, context):
+        try:
+            method = self.dispatch[type(node)]
+        except KeyError:
+            method = self.dispatch_method(type(node))
+        return method(self, node, context)
+
+    def dispatch_method(self, node_type):
+        method = getattr(SignalInterpreter, f'visit_{node_type.__name__}', SignalInterpreter.no_visit_method)
+        self.dispatch[node_type] = method
+        return method
+
+    def no_visit_method(self, node, context):
+        raise Exception(f"No visit_{type(node).__name__} method defined")
+
+    ###################################
+
+    def visit_NumberNode(self, node, context):
+        return num.make(node.tok.value)
+
+    def visit_StringNode(self, node, context):
+        return string.String(node.tok.value).set_context(context).set_pos(node.pos_start, node.pos_end)
+
+    def visit_BooleanNode(self, node, context):
+        return boolean.make(node.tok.value)
+
+    def visit_ConstantNode(self, node, context):
+        return node.value
+
+    def visit_ListNode(self, node, context):
+        elements = [self.visit(element_node, context) for element_node in node.element_nodes]
+        return list.List(elements).set_context(context).set_pos(node.pos_start, node.pos_end)
+
+    def visit_DictionaryNode(self, node, context):
+        elements = {}
+        for key_node, value_node in node.element_nodes.items():
+            key = self.visit(key_node, context)
+            elements[key.copy()] = self.visit(value_node, context)
+        return dict.Dictionary(elements).set_context(context).set_pos(node.pos_start, node.pos_end)
+
+    def visit_ForNode(self, node, context):
+        elements = []
+        start_value = self.visit(node.start_value_node, context) if node.start_value_node else num.make(0)
+        end_value = self.visit(node.end_value_node, context)
+        if node.step_value_node:
+            step_value = self.visit(node.step_value_node, context)
+        elif start_value.value < end_value.value:
+            step_value = num.make(1)
+        else:
+            step_value = num.make(-1)
+
+        assign = context.symbol_table.setter(node.depth, node.slot, node.var_name_tok.symbol)
+        for i in num.count(start_value.value, end_value.value, step_value.value):
+            assign(num.make(i))
+
+            try:
+                value = self.visit(node.body_node, context)
+            except signals.ContinueSignal:
+                continue
+            except signals.BreakSignal:
+                break
+            if node.collects:
+                elements.append(value)
+
+        if not node.collects:
+            return num.null
+        return list.List(elements).set_context(context).set_pos(node.pos_start, node.pos_end)
+
+    def visit_ForEachNode(self, node, context):
+        list_name = context.symbol_table.get_symbol(node.list_name.symbol)
+
+        if isinstance(list_name, list.List):
+            print(list_name.iter(), "li")
+        elif isinstance(list_name, string.String):
+            print(list_name)
+        else:
+            return None
+
+        for var_name in list_name.iter():
+            context.symbol_table.assign(node.depth, node.slot, node.var_name.symbol, var_name)
+            # Interpreter drops whatever the body signals and goes on with the next element
+            try:
+                self.visit(node.body_node, context)
+            except (signals.ErrorSignal, signals.ReturnSignal, signals.BreakSignal, signals.ContinueSignal):
+                pass
+        return list.List([]).set_context(context).set_pos(node.pos_start, node.pos_end)
+
+    def visit_VarAccessNode(self, node, context):
+        if node.cache:
+            value = node.cache.lookup(context.symbol_table)
+        else:
+            value = context.symbol_table.lookup(node.depth, node.slot, node.var_name_tok.symbol)
+        if not value:
+            raise signals.ErrorSignal(errors.RunTimeError(
+                node.pos_start, node.pos_end, f"'{node.var_name_tok.value}' is not defined", context
+            ))
+        return value
+
+    def visit_DataAccessNode(self, node, context):
+        value = context.symbol_table.lookup(node.depth, node.slot, node.var_name_tok.symbol)
+        if not value:
+            raise signals.ErrorSignal(errors.RunTimeError(
+                node.pos_start, node.pos_end, f"'{node.var_name_tok.value}' is not defined", context
+            ))
+
+        if isinstance(value, (list.List, string.String, dict.Dictionary)):
+            index = self.visit(node.index_tok, context)
+            result, error = value.division(index)
+            if error:
+                index = index.at(node.index_tok.pos_start, node.index_tok.pos_end, context)
+                raise signals.ErrorSignal(value.division(index)[1])
+            return result
+
+        raise signals.ErrorSignal(errors.RunTimeError(
+            node.pos_start, node.pos_end, "Dictionary, list and string should be present"
+        ))
+
+    def visit_VarAssignNode(self, node, context):
+        value = self.visit(node.value_node, context)
+        context.symbol_table.assign(node.depth, node.slot, node.var_name_tok.symbol, value)
+        return value
+
+    def visit_BinOpNode(self, node, context):
+        left = self.visit(node.left_node, context)
+        right = self.visit(node.right_node, context)
+
+        if node.op_tok.type == token.T_KEYWORD:
+            operation = operators.LOGICAL_OPERATIONS[node.op_tok.value]
+        else:
+            operation = operators.BINARY_OPERATIONS[node.op_tok.type]
+        result, error = operators.binary(left, operation, right)
+        if error:
+            left = left.at(node.left_node.pos_start, node.left_node.pos_end, context)
+            right = right.at(node.right_node.pos_start, node.right_node.pos_end, context)
+            raise signals.ErrorSignal(operators.binary(left, operation, right)[1])
+        return result
+
+    def visit_UnaryOpNode(self, node, context):
+        number = self.visit(node.node, context)
+        result, error = self.unary_operation(node.op_tok, number)
+        if error:
+            number = number.at(node.node.pos_start, node.node.pos_end, context)
+            raise signals.ErrorSignal(self.unary_operation(node.op_tok, number)[1])
+        return result
+
+    def unary_operation(self, op_tok, number):
+        if op_tok.type == token.T_MINUS:
+            return num.Number(0).subtraction(number)
+        if op_tok.matches(token.T_KEYWORD, 'न') or op_tok.type == token.T_NOT:
+            return number.notted()
+        if op_tok.type == token.T_BIT_NOT:
+            return number.bitnotted()
+        return number, None
+
+    def visit_FactorialNode(self, node, context):
+        number, error = self.visit(node.node, context).factorial()
+        if error:
+            raise signals.ErrorSignal(error)
+        return number
+
+    def visit_WhileNode(self, node, context):
+        elements = []
+        while self.visit(node.condition_node, context).is_true():
+            try:
+                value = self.visit(node.body_node, context)
+            except signals.ContinueSignal:
+                continue
+            except signals.BreakSignal:
+                break
+            if node.collects:
+                elements.append(value)
+        if not node.collects:
+            return num.null
+        return list.List(elements).set_context(context).set_pos(node.pos_start, node.pos_end)
+
+    def visit_FuncDefNode(self, node, context):
+        func_name = node.var_name_tok.value if node.var_name_tok else None
+        arg_names = [arg_name.value for arg_name in node.arg_name_tokens]
+
+        func_value = SignalFunction(
+            func_name, node.body_node, arg_names, node.should_auto_return, node.layout
+        ).set_context(context).set_pos(node.pos_start, node.pos_end)
+
+        if node.layout:
+            context.symbol_table.root.shadow(node.layout)
+        if node.var_name_tok:
+            context.symbol_table.assign(node.depth, node.slot, node.var_name_tok.symbol, func_value)
+        return func_value
+
+    def visit_CallNode(self, node, context):
+        value_to_call, args = self.call_arguments(node, context)
+        if value_to_call.__class__ is func.BuiltInFunction:
+            return apply(value_to_call, args, node, context)
+        return call(value_to_call, args)
+
+    def call_arguments(self, node, context):
+        # A built-in makes no frame and is called as it is, other functions are copied to the call
+        value_to_call = self.visit(node.node_to_call, context)
+        if value_to_call.__class__ is not func.BuiltInFunction:
+            value_to_call = value_to_call.copy().set_pos(node.pos_start, node.pos_end).set_context(context)
+        return value_to_call, [self.visit(arg_node, context) for arg_node in node.arg_nodes]
+
+    def visit_IfNode(self, node, context):
+        for condition, expr in node.cases:
+            if self.visit(condition, context).is_true():
+                return self.visit(expr, context)
+        if node.else_case:
+            return self.visit(node.else_case, context)
+        return None
+
+    def visit_ReturnNode(self, node, context):
+        if node.tail_call:
+            value_to_call, args = self.call_arguments(node.node_to_return, context)
+            if value_to_call.__class__ is func.BuiltInFunction:
+                # A built-in leaves no frame behind, it is called right away
+                raise signals.ReturnSignal(apply(value_to_call, args, node.node_to_return, context))
+            raise signals.TailCallSignal(value_to_call, args)
+        raise signals.ReturnSignal(self.visit(node.node_to_return, context) if node.node_to_return else num.null)
+
+    def visit_ContinueNode(self, node, context):
+        raise signals.ContinueSignal()
+
+    def visit_BreakNode(self, node, context):
+        raise signals.BreakSignal()
+
+
+# Keeps no state either, shared by every call
+interpreter = SignalInterpreter()
@@ -0,0 +1,29 @@
+# Raised instead of returned by engines that do not thread a RunTimeResult through every node
+
+
+class ErrorSignal(Exception):
+    def __init__(self, error):
+        super().__init__(error.details)
+        self.error = error
+
+
+class ReturnSignal(Exception):
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+
+
+class BreakSignal(Exception):
+    pass
+
+
+class ContinueSignal(Exception):
+    pass
+
+
+class TailCallSignal(Exception):
+    # यच्छ of a call, made by the caller's frame once it has ended, see Function.reenters
+    def __init__(self, function, args):
+        super().__init__()
+        self.function = function
+        self.args = args
@@ -1,16 +1,196 @@
+import functools
+import itertools
+import weakref
+import Sansam.Lexer.SymbolPool as symbol_pool
+
+# Depths the resolver gives variable nodes. A LOCAL variable lives in a slot of the
+# current frame, a GLOBAL one in the root table. Anything else (depth None) is looked
+# up through the parent chain, scoping being dynamic.
+LOCAL = 0
+GLOBAL = -1
+
+# Tables of calls that have returned, handed to the next calls' frames
+free_tables = []
+MAX_FREE_TABLES = 256
+
+# Versions of root tables, each change takes the next so a version is never seen in two tables
+versions = itertools.count()
+
+# Every GlobalCache made, for cache_stats
+caches = weakref.WeakSet()
+
+
 class SymbolTable:
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, pool=None, layout=None):
         self.symbols = {}
         self.parent = parent
+        if parent:
+            self.pool = parent.pool
+            self.root = parent.root
+        else:
+            self.pool = pool if pool is not None else symbol_pool.default_pool
+            self.root = self
+            # Symbols some function keeps in a slot, a frame may hide the global value of these
+            self.shadowed = set()
+            # Symbols some GlobalCache holds the value of, storing one of these changes the version
+            self.watched = set()
+            self.version = next(versions)
+
+        # Symbol to slot index, shared by every frame of the same function
+        self.layout = layout
+        self.slots = [None] * len(layout) if layout else None
 
     def get(self, name):
-        value = self.symbols.get(name, None)
-        if value is None and self.parent:
-            return self.parent.get(name)
-        return value
+        return self.get_symbol(self.pool.intern(name))
+
+    def get_symbol(self, symbol):
+        table = self
+        while table:
+            if table.layout:
+                slot = table.layout.get(symbol)
+                if slot is not None and table.slots[slot] is not None:
+                    return table.slots[slot]
+            value = table.symbols.get(symbol, None)
+            if value is not None:
+                return value
+            table = table.parent
+        return None
+
+    def lookup(self, depth, slot, symbol):
+        if depth == LOCAL:
+            value = self.slots[slot]
+            if value is None and self.parent:
+                # Not assigned yet in this frame, the caller's variables show through
+                return self.parent.get_symbol(symbol)
+            return value
+        if depth == GLOBAL and symbol not in self.root.shadowed:
+            return self.root.symbols.get(symbol, None)
+        return self.get_symbol(symbol)
 
     def set(self, name, value):
-        self.symbols[name] = value
+        self.set_symbol(self.pool.intern(name), value)
+
+    def set_symbol(self, symbol, value):
+        if self.layout:
+            slot = self.layout.get(symbol)
+            if slot is not None:
+                self.slots[slot] = value
+                return
+        if self.root is self:
+            self.store(symbol, value)
+        else:
+            self.symbols[symbol] = value
+
+    def store(self, symbol, value):
+        # Assignment to the root table, self being the root
+        self.symbols[symbol] = value
+        if symbol in self.watched:
+            self.version = next(versions)
+
+    def shadow(self, layout):
+        # A function keeping the symbols of layout in slots is defined, self being the root
+        self.shadowed.update(layout)
+        if not self.watched.isdisjoint(layout):
+            self.version = next(versions)
+
+    def assign(self, depth, slot, symbol, value):
+        if depth == LOCAL:
+            self.slots[slot] = value
+        elif depth == GLOBAL:
+            root = self.root
+            root.symbols[symbol] = value
+            if symbol in root.watched:
+                root.version = next(versions)
+        else:
+            self.set_symbol(symbol, value)
+
+    def setter(self, depth, slot, symbol):
+        # assign for one variable with the place it stores to looked up once, for loops binding
+        # their variable every iteration
+        if depth == GLOBAL:
+            return functools.partial(self.root.store, symbol)
+        if depth != LOCAL and self.layout:
+            slot = self.layout.get(symbol)
+        if slot is None:
+            if self.root is self:
+                return functools.partial(self.store, symbol)
+            return functools.partial(self.symbols.__setitem__, symbol)
+        return functools.partial(self.slots.__setitem__, slot)
 
     def remove(self, name):
-        del self.symbols[name]
\ No newline at end of file
+        symbol = self.pool.intern(name)
+        del self.symbols[symbol]
+        if self.root is self and symbol in self.watched:
+            self.version = next(versions)
+
+
+class GlobalCache:
+    # Inline cache of a name the resolver made GLOBAL where it is called. It keeps the value the
+    # name had in the root table until the table's version changes. The engines check the version
+    # themselves and come here on a miss.
+    __slots__ = ('name', 'symbol', 'version', 'value', 'hits', 'misses', '__weakref__')
+
+    def __init__(self, name, symbol=None):
+        self.name = name
+        self.symbol = symbol
+        self.version = -1
+        self.value = None
+        self.hits = 0
+        self.misses = 0
+        caches.add(self)
+
+    def __reduce__(self):
+        # Symbols and what was cached belong to this process, a pickled tree starts with an empty
+        # cache that interns its name again
+        return GlobalCache, (self.name,)
+
+    def lookup(self, table):
+        root = table.root
+        if self.version == root.version:
+            self.hits += 1
+            return self.value
+        return self.fill(table)
+
+    def fill(self, table):
+        self.misses += 1
+        root = table.root
+        symbol = self.symbol
+        if symbol is None:
+            symbol = self.symbol = root.pool.intern(self.name)
+        if symbol in root.shadowed:
+            # A frame may hold the name, it is looked up through the chain every time
+            return table.get_symbol(symbol)
+        root.watched.add(symbol)
+        self.version = root.version
+        self.value = root.symbols.get(symbol, None)
+        return self.value
+
+
+def cache_stats():
+    # Hits, misses and hit rate of the inline caches alive
+    hits = sum(cache.hits for cache in caches)
+    misses = sum(cache.misses for cache in caches)
+    return {'hits': hits, 'misses': misses, 'hit_rate': hits / (hits + misses) if hits + misses else 0.0}
+
+
+def frame(parent, layout):
+    # The table of a call's frame, a released one when there is one
+    if not free_tables:
+        return SymbolTable(parent, layout=layout)
+    table = free_tables.pop()
+    table.parent = parent
+    table.pool = parent.pool
+    table.root = parent.root
+    table.layout = layout
+    table.slots = [None] * len(layout) if layout else None
+    return table
+
+
+def release(table):
+    # Only for the table of a call that returned normally. A returned frame's variables are not
+    # looked up again, values made in it keep its context for tracebacks but not the table.
+    if len(free_tables) < MAX_FREE_TABLES:
+        table.parent = None
+        if table.symbols:
+            table.symbols.clear()
+        free_tables.append(table)
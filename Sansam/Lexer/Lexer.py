@@ -1,6 +1,7 @@
 import Sansam.Lexer.Token as token
 import Sansam.Position
 import Sansam.Error.Errors as errors
+import Sansam.Lexer.SymbolPool as symbol_pool
 
 DIGITS = '0123456789'
 LETTERS = "ंःऄअआइईउऊऋऌऍऎएऐऑऒओऔकखगघङचछजझञटठडढणतथदधनऩपफबभमयरऱलळऴवशषसहऺऻ़ऽािीुूृॄॅॆेैॉॊोौ्"
@@ -8,9 +9,10 @@ LETTERS_DIGITS = LETTERS + DIGITS
 
 
 class Lexer:
-    def __init__(self, fn, text):
+    def __init__(self, fn, text, pool=None):
         self.fn = fn
         self.text = text
+        self.pool = pool if pool is not None else symbol_pool.default_pool
         self.pos = Sansam.Position.Position(-1, 0, -1, fn, text)
         self.current_char = None
         self.advance()
@@ -121,8 +123,11 @@ class Lexer:
             id_str += self.current_char
             self.advance()
 
-        tok_type = token.T_KEYWORD if id_str in token.KEYWORDS else token.T_IDENTIFIER
-        return token.Token(tok_type, id_str, pos_start, self.pos)
+        if id_str in token.KEYWORDS:
+            return token.Token(token.T_KEYWORD, id_str, pos_start, self.pos)
+
+        symbol = self.pool.intern(id_str)
+        return token.Token(token.T_IDENTIFIER, self.pool.name(symbol), pos_start, self.pos, symbol)
 
     def make_number(self):
         num_str = ''
@@ -0,0 +1,52 @@
+import io
+import mmap
+
+
+class SourceStream:
+    def __init__(self, source, encoding='utf-8'):
+        self.source = source
+        self.encoding = encoding
+        self.text = None
+
+    def lines(self):
+        if isinstance(self.source, mmap.mmap):
+            self.source.seek(0)
+            readline = self.source.readline
+            while True:
+                line = readline()
+                if not line:
+                    break
+                yield line.decode(self.encoding)
+        elif isinstance(self.source, (io.RawIOBase, io.BufferedIOBase)):
+            for line in self.source:
+                yield line.decode(self.encoding)
+        else:
+            # Not yield from: closing this generator early must not close the caller's file
+            for line in self.source:
+                yield line
+
+    def load(self):
+        # Only error messages need the whole text, it is read back the first time one is formatted
+        if self.text is None:
+            if isinstance(self.source, mmap.mmap):
+                self.text = self.source[:].decode(self.encoding)
+            else:
+                self.source.seek(0)
+                text = self.source.read()
+                self.text = text.decode(self.encoding) if isinstance(text, bytes) else text
+        return self.text
+
+    def find(self, sub, *args):
+        return self.load().find(sub, *args)
+
+    def rfind(self, sub, *args):
+        return self.load().rfind(sub, *args)
+
+    def __getitem__(self, index):
+        return self.load()[index]
+
+    def __len__(self):
+        return len(self.load())
+
+    def __str__(self):
+        return self.load()
@@ -0,0 +1,21 @@
+class SymbolPool:
+    def __init__(self):
+        self.names = []
+        self.ids = {}
+
+    def intern(self, name):
+        symbol = self.ids.get(name)
+        if symbol is None:
+            symbol = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return symbol
+
+    def name(self, symbol):
+        return self.names[symbol]
+
+    def __len__(self):
+        return len(self.names)
+
+
+# Shared by lexers and symbol tables that are not given a pool of their own
+default_pool = SymbolPool()
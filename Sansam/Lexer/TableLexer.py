@@ -0,0 +1,200 @@
+import re
+import Sansam.Lexer.Token as token
+import Sansam.Lexer.Lexer as lexer
+import Sansam.Lexer.TokenStore as token_store
+import Sansam.Lexer.SymbolPool as symbol_pool
+import Sansam.Error.Errors as errors
+
+OPERATORS = {
+    '+': token.T_PLUS,
+    '-': token.T_MINUS,
+    '*': token.T_MUL,
+    '/': token.T_DIV,
+    '%': token.T_MOD,
+    '^': token.T_POW,
+    '^^': token.T_XOR,
+    '=': token.T_EQU,
+    '==': token.T_ISEQ,
+    '!': token.T_NOT,
+    '!=': token.T_ISNEQ,
+    '!*': token.T_FACT,
+    '!=*': token.T_FACT,
+    '>': token.T_ISG,
+    '>=': token.T_ISGEQ,
+    '>>': token.T_RSHIFT,
+    '<': token.T_ISL,
+    '<=': token.T_ISLEQ,
+    '<<': token.T_LSHIFT,
+    '(': token.T_LPAREN,
+    ')': token.T_RPAREN,
+    '[': token.T_LSQUARE,
+    ']': token.T_RSQUARE,
+    '{': token.T_LCURL,
+    '}': token.T_RCURL,
+    '&': token.T_BIT_AND,
+    '|': token.T_BIT_OR,
+    '$': token.T_BIT_NOT,
+    ',': token.T_COMMA,
+    ';': token.T_SEP,
+    '~': token.T_THEN,
+}
+
+OPERATOR_IDS = {op: token_store.TYPE_IDS[type_] for op, type_ in OPERATORS.items()}
+
+KEYWORDS = token.KEYWORDS
+
+# Character classes of the DFA, one capture group per class. The group number
+# reported by a match picks the branch of scan that stores the token.
+G_SKIP, G_NL, G_COMMENT, G_STRING, G_NUMBER, G_IDENTIFIER, G_OPERATOR, G_ILLEGAL = range(1, 9)
+
+TOKEN_REGEX = re.compile('|'.join([
+    r'([ \t\r]+)',
+    r'(\n)',
+    r'(#[^\n]*\n?)',
+    r'("[^"]*"?)',
+    r'([0-9]+(?:\.[0-9]*)?)',
+    '([' + re.escape(lexer.LETTERS) + '][' + re.escape(lexer.LETTERS_DIGITS) + '_]*)',
+    '(' + '|'.join(re.escape(op) for op in sorted(OPERATORS, key=len, reverse=True)) + ')',
+    r'(.)',
+]), re.DOTALL)
+
+
+class TableLexer:
+    def __init__(self, fn, text, pool=None):
+        self.fn = fn
+        self.text = text
+        self.pool = pool if pool is not None else symbol_pool.default_pool
+        self.error = None
+        self.line = 0
+        self.line_start = 0
+
+    def make_token_store(self):
+        store = token_store.TokenStore(self.fn, self.text, pool=self.pool)
+        self.scan(store, self.text, 0, True)
+        if self.error:
+            return None, self.error
+        return store, None
+
+    def make_tokens(self):
+        store, error = self.make_token_store()
+        if error:
+            return [], error
+        return store.to_tokens(), None
+
+    def iter_tokens(self, lines):
+        pending = ''
+        base = 0
+
+        for line_text in lines:
+            chunk = pending + line_text
+            store = token_store.TokenStore(self.fn, self.text, self.line, self.line_start, self.pool)
+            rest = self.scan(store, chunk, base, False)
+            yield from store
+            if self.error:
+                return
+
+            if rest is None:
+                pending = ''
+                base += len(chunk)
+            else:
+                # A string literal is still open at the end of the line, rescan it with the next one
+                pending = chunk[rest:]
+                base += rest
+
+        store = token_store.TokenStore(self.fn, self.text, self.line, self.line_start, self.pool)
+        self.scan(store, pending, base, True)
+        yield from store
+
+    def scan(self, store, chunk, base, final):
+        types = store.types.append
+        values = store.values.append
+        starts = store.starts.append
+        ends = store.ends.append
+        line_starts = store.line_starts.append
+        add_value = store.add_value
+        intern = store.pool.intern
+        operators = OPERATOR_IDS
+        keywords = KEYWORDS
+
+        T_INT = token_store.TYPE_IDS[token.T_INT]
+        T_FLOAT = token_store.TYPE_IDS[token.T_FLOAT]
+        T_STRING = token_store.TYPE_IDS[token.T_STRING]
+        T_IDENTIFIER = token_store.TYPE_IDS[token.T_IDENTIFIER]
+        T_KEYWORD = token_store.TYPE_IDS[token.T_KEYWORD]
+        T_NL = token_store.TYPE_IDS[token.T_NL]
+
+        eof = base + len(chunk)
+        rest = None
+
+        for match in TOKEN_REGEX.finditer(chunk):
+            group = match.lastindex
+            if group == G_SKIP:
+                continue
+
+            start = base + match.start()
+            end = base + match.end()
+
+            if group == G_NL:
+                types(T_NL)
+                values(token_store.NO_VALUE)
+                line_starts(end)
+            elif group == G_IDENTIFIER:
+                value = match.group(group)
+                if value in keywords:
+                    types(T_KEYWORD)
+                    values(add_value(T_KEYWORD, value))
+                else:
+                    types(T_IDENTIFIER)
+                    values(intern(value))
+            elif group == G_OPERATOR:
+                types(operators[match.group(group)])
+                values(token_store.NO_VALUE)
+            elif group == G_NUMBER:
+                value = match.group(group)
+                if '.' in value:
+                    types(T_FLOAT)
+                    values(add_value(T_FLOAT, float(value)))
+                else:
+                    types(T_INT)
+                    values(add_value(T_INT, int(value)))
+            elif group == G_STRING:
+                value = match.group(group)
+                if len(value) == 1 or value[-1] != '"':
+                    if not final:
+                        rest = match.start()
+                        break
+                    # Unterminated string: the closing advance steps past the end of the text
+                    body = value[1:]
+                    end = eof = end + 1
+                else:
+                    body = value[1:-1]
+                types(T_STRING)
+                values(add_value(T_STRING, body.replace('\\', '')))
+                newline = body.find('\n')
+                while newline != -1:
+                    line_starts(start + 2 + newline)
+                    newline = body.find('\n', newline + 1)
+            elif group == G_COMMENT:
+                if chunk[match.end() - 1] == '\n':
+                    line_starts(end)
+                continue
+            else:
+                self.error = errors.IllegalCharError(
+                    store.position(start), store.end_position(end), "'" + match.group(group) + "'"
+                )
+                eof = start
+                break
+
+            starts(start)
+            ends(end)
+
+        line = len(store.line_starts) - 1
+        self.line = store.first_line + line
+        self.line_start = store.line_starts[line]
+
+        if final or self.error:
+            types(token_store.TYPE_IDS[token.T_EOF])
+            values(token_store.NO_VALUE)
+            starts(eof)
+            ends(eof + 1)
+        return rest
@@ -36,14 +36,17 @@ T_COMMA = ','
 T_SEP = ';'
 T_FACT = 'T_FACT'
 
-KEYWORDS = ['च', 'वा', 'न', 'असत्यम्', 'सत्यम्', 'यावद्', 'प्रति', 'कार्य', 'यदि', 'नोचेत्', 'चेत्',
-            'अनुवर्तते', 'विघ्नः', 'यच्छ']
+KEYWORDS = frozenset(['च', 'वा', 'न', 'असत्यम्', 'सत्यम्', 'यावद्', 'प्रति', 'कार्य', 'यदि', 'नोचेत्', 'चेत्',
+                      'अनुवर्तते', 'विघ्नः', 'यच्छ'])
 
 
 class Token:
-    def __init__(self, type_, value=None, pos_start=None, pos_end=None):
+    __slots__ = ('type', 'value', 'symbol', 'pos_start', 'pos_end')
+
+    def __init__(self, type_, value=None, pos_start=None, pos_end=None, symbol=None):
         self.type = type_
         self.value = value
+        self.symbol = symbol
 
         if pos_start:
             self.pos_start = pos_start.copy()
@@ -0,0 +1,172 @@
+import array
+import bisect
+import Sansam.Lexer.Token as token
+import Sansam.Position
+import Sansam.Lexer.SymbolPool as symbol_pool
+import Sansam.Collector as collector
+
+TOKEN_TYPES = [
+    token.T_INT, token.T_FLOAT, token.T_STRING, token.T_PLUS, token.T_MINUS, token.T_MUL, token.T_DIV,
+    token.T_MOD, token.T_EOF, token.T_KEYWORD, token.T_IDENTIFIER, token.T_NL, token.T_THEN, token.T_POW,
+    token.T_LCURL, token.T_RCURL, token.T_LPAREN, token.T_RPAREN, token.T_LSQUARE, token.T_RSQUARE,
+    token.T_EQU, token.T_ISNEQ, token.T_ISEQ, token.T_BIT_AND, token.T_BIT_OR, token.T_BIT_NOT, token.T_ISG,
+    token.T_RSHIFT, token.T_ISL, token.T_LSHIFT, token.T_XOR, token.T_ISGEQ, token.T_ISLEQ, token.T_NOT,
+    token.T_COMMA, token.T_SEP, token.T_FACT,
+]
+TYPE_IDS = {type_: type_id for type_id, type_ in enumerate(TOKEN_TYPES)}
+IDENTIFIER_ID = TYPE_IDS[token.T_IDENTIFIER]
+
+NO_VALUE = -1
+
+
+class TokenStore:
+    def __init__(self, fn, text, line=0, line_start=0, pool=None):
+        self.fn = fn
+        self.text = text
+        self.pool = pool if pool is not None else symbol_pool.default_pool
+
+        # One entry per token in each column
+        self.types = array.array('B')
+        self.values = array.array('l')
+        self.starts = array.array('l')
+        self.ends = array.array('l')
+
+        # Identifiers index the symbol pool, every other value indexes value_pool
+        self.value_pool = []
+        self.value_ids = {}
+
+        # Offsets at which each line begins, the first one being line first_line
+        self.first_line = line
+        self.line_starts = array.array('l', [line_start])
+
+    def add_value(self, type_id, value):
+        key = (type_id, value)
+        value_id = self.value_ids.get(key)
+        if value_id is None:
+            value_id = self.value_ids[key] = len(self.value_pool)
+            self.value_pool.append(value)
+        return value_id
+
+    def position(self, index):
+        line = bisect.bisect_right(self.line_starts, index) - 1
+        return Sansam.Position.Position(
+            index, self.first_line + line, index - self.line_starts[line], self.fn, self.text
+        )
+
+    def end_position(self, index):
+        # A token ends one column past its last character, on that character's line
+        pos = self.position(index - 1)
+        pos.index += 1
+        pos.col += 1
+        return pos
+
+    def type_of(self, index):
+        return TOKEN_TYPES[self.types[index]]
+
+    def value_of(self, index):
+        value_id = self.values[index]
+        if value_id == NO_VALUE:
+            return None
+        if self.types[index] == IDENTIFIER_ID:
+            return self.pool.names[value_id]
+        return self.value_pool[value_id]
+
+    def symbol_of(self, index):
+        return self.values[index] if self.types[index] == IDENTIFIER_ID else None
+
+    def to_tokens(self):
+        # Tokens and positions are acyclic
+        with collector.paused():
+            return self.build_tokens()
+
+    def build_tokens(self):
+        # Tokens are stored in text order, so the lines of their positions are found by walking the
+        # line starts along with them rather than bisecting for every position
+        Token = token.Token
+        Position = Sansam.Position.Position
+        fn, text, first_line = self.fn, self.text, self.first_line
+        line_starts = self.line_starts
+        last_line = len(line_starts) - 1
+        names, value_pool = self.pool.names, self.value_pool
+
+        # Slots are filled directly, Token's constructor would copy the positions it is given
+        new = object.__new__
+        tokens = []
+        start_line = end_line = 0
+        for type_id, value_id, start, end in zip(self.types, self.values, self.starts, self.ends):
+            tok = new(Token)
+            tok.type = TOKEN_TYPES[type_id]
+            if value_id == NO_VALUE:
+                tok.value = tok.symbol = None
+            elif type_id == IDENTIFIER_ID:
+                tok.value = names[value_id]
+                tok.symbol = value_id
+            else:
+                tok.value = value_pool[value_id]
+                tok.symbol = None
+
+            while start_line < last_line and line_starts[start_line + 1] <= start:
+                start_line += 1
+            tok.pos_start = Position(start, first_line + start_line, start - line_starts[start_line], fn, text)
+
+            # See end_position, the end is placed from the token's last character
+            last = end - 1
+            while end_line < last_line and line_starts[end_line + 1] <= last:
+                end_line += 1
+            tok.pos_end = Position(end, first_line + end_line, end - line_starts[end_line], fn, text)
+
+            tokens.append(tok)
+        return tokens
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index):
+        if index < 0:
+            raise IndexError(index)
+        return StoredToken(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.types)):
+            yield StoredToken(self, index)
+
+
+class StoredToken:
+    __slots__ = ('store', 'index', 'type', 'value', 'symbol', '_pos_start', '_pos_end')
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+        type_id = store.types[index]
+        self.type = TOKEN_TYPES[type_id]
+        value_id = store.values[index]
+        if value_id == NO_VALUE:
+            self.value = self.symbol = None
+        elif type_id == IDENTIFIER_ID:
+            self.value = store.pool.names[value_id]
+            self.symbol = value_id
+        else:
+            self.value = store.value_pool[value_id]
+            self.symbol = None
+        self._pos_start = None
+        self._pos_end = None
+
+    @property
+    def pos_start(self):
+        if self._pos_start is None:
+            self._pos_start = self.store.position(self.store.starts[self.index])
+        return self._pos_start
+
+    @property
+    def pos_end(self):
+        if self._pos_end is None:
+            self._pos_end = self.store.end_position(self.store.ends[self.index])
+        return self._pos_end
+
+    def matches(self, type_, value):
+        return self.type == type_ and self.value == value
+
+    def __repr__(self):
+        if self.value:
+            return f'{self.type}->{self.value}'
+        return f'{self.type}'
@@ -0,0 +1,202 @@
+import Sansam.Lexer.Token as token
+import Sansam.Parser.Nodes as nodes
+import Sansam.Values.Number as num
+import Sansam.Values.String as string
+import Sansam.Values.Boolean as boolean
+import Sansam.Values.Operators as operators
+
+# Operators only Number implements, a successful result is always a Number
+NUMBER_OPERATORS = frozenset((
+    token.T_MOD, token.T_POW, token.T_BIT_AND, token.T_BIT_OR, token.T_RSHIFT, token.T_LSHIFT, token.T_XOR,
+))
+
+# Operators whose result is a Number whenever the left operand is one
+ARITHMETIC_OPERATORS = frozenset((token.T_PLUS, token.T_MINUS, token.T_MUL, token.T_DIV))
+
+# Folding is skipped when it could build a huge value for code that may never run
+MAX_FOLDED_SIZE = 4096
+
+
+class ConstantFolder:
+    def __init__(self):
+        self.folded = 0
+        self.simplified = 0
+
+    def visit(self, node):
+        method = getattr(self, f'visit_{type(node).__name__}', None)
+        if method is None:
+            return node
+        return method(node)
+
+    ###################################
+
+    def constant(self, node):
+        if isinstance(node, nodes.ConstantNode):
+            return node.value
+        if isinstance(node, nodes.NumberNode):
+            return num.make(node.tok.value)
+        if isinstance(node, nodes.StringNode):
+            return string.String(node.tok.value)
+        if isinstance(node, nodes.BooleanNode):
+            return boolean.make(node.tok.value)
+        return None
+
+    def is_number(self, node):
+        if isinstance(node, (nodes.NumberNode, nodes.FactorialNode)):
+            return True
+        if isinstance(node, nodes.ConstantNode):
+            return isinstance(node.value, num.Number)
+        if isinstance(node, nodes.UnaryOpNode):
+            return node.op_tok.type in (token.T_MINUS, token.T_BIT_NOT)
+        if isinstance(node, nodes.BinOpNode):
+            if node.op_tok.type in NUMBER_OPERATORS:
+                return True
+            return node.op_tok.type in ARITHMETIC_OPERATORS and self.is_number(node.left_node)
+        return False
+
+    def is_literal(self, node, value):
+        number = self.constant(node)
+        return isinstance(number, num.Number) and type(number.value) is int and number.value == value
+
+    def is_small(self, op_type, left, right):
+        if not isinstance(right, num.Number) or not isinstance(right.value, int):
+            return True
+        if op_type == token.T_POW and isinstance(left, num.Number) and isinstance(left.value, int):
+            return abs(right.value) * max(1, abs(left.value).bit_length()) <= MAX_FOLDED_SIZE
+        if op_type == token.T_LSHIFT:
+            return right.value <= MAX_FOLDED_SIZE
+        if op_type == token.T_MUL and isinstance(left, string.String):
+            return len(left.value) * right.value <= MAX_FOLDED_SIZE
+        return True
+
+    def fold(self, node, evaluate):
+        # Anything that fails is left for the interpreter, which reports it with the original positions
+        try:
+            value, error = evaluate()
+        except Exception:
+            return node
+        if error or not isinstance(value, (num.Number, string.String, boolean.Boolean)):
+            return node
+
+        self.folded += 1
+        return nodes.ConstantNode(value, node.pos_start, node.pos_end)
+
+    def simplify(self, node, operand):
+        # The operand's value takes the position the whole expression would have had
+        self.simplified += 1
+        operand.pos_start = node.pos_start
+        operand.pos_end = node.pos_end
+        return operand
+
+    ###################################
+
+    def visit_ListNode(self, node):
+        node.element_nodes = [self.visit(element_node) for element_node in node.element_nodes]
+        return node
+
+    def visit_DictionaryNode(self, node):
+        node.element_nodes = {
+            self.visit(key_node): self.visit(value_node) for key_node, value_node in node.element_nodes.items()
+        }
+        return node
+
+    def visit_ForNode(self, node):
+        if node.start_value_node:
+            node.start_value_node = self.visit(node.start_value_node)
+        node.end_value_node = self.visit(node.end_value_node)
+        if node.step_value_node:
+            node.step_value_node = self.visit(node.step_value_node)
+        node.body_node = self.visit(node.body_node)
+        return node
+
+    def visit_ForEachNode(self, node):
+        node.body_node = self.visit(node.body_node)
+        return node
+
+    def visit_DataAccessNode(self, node):
+        node.index_tok = self.visit(node.index_tok)
+        return node
+
+    def visit_VarAssignNode(self, node):
+        node.value_node = self.visit(node.value_node)
+        return node
+
+    def visit_BinOpNode(self, node):
+        node.left_node = self.visit(node.left_node)
+        node.right_node = self.visit(node.right_node)
+        op_type = node.op_tok.type
+
+        if op_type == token.T_KEYWORD:
+            operation = operators.LOGICAL_OPERATIONS.get(node.op_tok.value)
+        else:
+            operation = operators.BINARY_OPERATIONS.get(op_type)
+        if operation is None:
+            return node
+
+        left = self.constant(node.left_node)
+        right = self.constant(node.right_node)
+        if left is not None and right is not None:
+            if not self.is_small(op_type, left, right):
+                return node
+            return self.fold(node, lambda: operators.binary(left, operation, right))
+
+        # Identities hold only for numbers, for other values the interpreter must still run the operator
+        if op_type in (token.T_PLUS, token.T_MINUS) and self.is_literal(node.right_node, 0):
+            if self.is_number(node.left_node):
+                return self.simplify(node, node.left_node)
+        elif op_type in (token.T_MUL, token.T_POW) and self.is_literal(node.right_node, 1):
+            if self.is_number(node.left_node):
+                return self.simplify(node, node.left_node)
+        elif op_type == token.T_PLUS and self.is_literal(node.left_node, 0):
+            if self.is_number(node.right_node):
+                return self.simplify(node, node.right_node)
+        elif op_type == token.T_MUL and self.is_literal(node.left_node, 1):
+            if self.is_number(node.right_node):
+                return self.simplify(node, node.right_node)
+        return node
+
+    def visit_UnaryOpNode(self, node):
+        node.node = self.visit(node.node)
+        value = self.constant(node.node)
+        if value is None:
+            return node
+
+        if node.op_tok.type == token.T_MINUS:
+            return self.fold(node, lambda: num.Number(0).subtraction(value))
+        elif node.op_tok.matches(token.T_KEYWORD, 'न') or node.op_tok.type == token.T_NOT:
+            return self.fold(node, value.notted)
+        elif node.op_tok.type == token.T_BIT_NOT:
+            return self.fold(node, value.bitnotted)
+        return self.fold(node, lambda: (value, None))
+
+    def visit_FactorialNode(self, node):
+        node.node = self.visit(node.node)
+        value = self.constant(node.node)
+        if not isinstance(value, num.Number) or not isinstance(value.value, int) or value.value > MAX_FOLDED_SIZE:
+            return node
+        return self.fold(node, value.factorial)
+
+    def visit_WhileNode(self, node):
+        node.condition_node = self.visit(node.condition_node)
+        node.body_node = self.visit(node.body_node)
+        return node
+
+    def visit_FuncDefNode(self, node):
+        node.body_node = self.visit(node.body_node)
+        return node
+
+    def visit_CallNode(self, node):
+        node.node_to_call = self.visit(node.node_to_call)
+        node.arg_nodes = [self.visit(arg_node) for arg_node in node.arg_nodes]
+        return node
+
+    def visit_IfNode(self, node):
+        node.cases = [(self.visit(condition), self.visit(expr)) for condition, expr in node.cases]
+        if node.else_case:
+            node.else_case = self.visit(node.else_case)
+        return node
+
+    def visit_ReturnNode(self, node):
+        if node.node_to_return:
+            node.node_to_return = self.visit(node.node_to_return)
+        return node
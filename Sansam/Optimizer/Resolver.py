@@ -0,0 +1,169 @@
+import Sansam.Interpreter.SymbolTable as st
+import Sansam.Parser.Nodes as nodes
+
+# Statements that leave their block, a block ending in one never produces its list of values
+LEAVING_NODES = (nodes.ReturnNode, nodes.ContinueNode, nodes.BreakNode)
+
+
+class Resolver:
+    # Two walks over the tree. The first gives every function a layout of its arguments
+    # and the names it assigns. The second marks each variable node LOCAL with its slot,
+    # GLOBAL when no function of the program keeps the name in a slot, or leaves it to
+    # the dynamic lookup. Called GLOBAL names get an inline cache. Loops whose value nothing
+    # uses are marked not to collect it, and यच्छ of a call as a tail call.
+    def __init__(self):
+        self.scopes = []
+        self.function_locals = set()
+        self.annotating = False
+        self.discarded = False
+        # For-each bodies around the node in the current function, they drop what यच्छ signals
+        self.each_bodies = 0
+
+    def resolve(self, node):
+        self.scopes = []
+        self.function_locals = set()
+        self.each_bodies = 0
+
+        self.annotating = False
+        self.visit(node)
+        self.annotating = True
+        self.visit(node)
+        return node
+
+    def visit(self, node, discarded=False):
+        # discarded when the node's value is dropped, visit methods read it before visiting children
+        method = getattr(self, f'visit_{type(node).__name__}', None)
+        if method is not None:
+            self.discarded = discarded
+            method(node)
+
+    ###################################
+
+    def declare(self, node, symbol):
+        if not self.annotating:
+            if self.scopes:
+                layout = self.scopes[-1]
+                if symbol not in layout:
+                    layout[symbol] = len(layout)
+            return
+        self.reference(node, symbol)
+
+    def reference(self, node, symbol):
+        if not self.annotating:
+            return
+        if not self.scopes:
+            # Top level code always runs in the root table
+            node.depth, node.slot = st.GLOBAL, None
+        elif symbol in self.scopes[-1]:
+            node.depth, node.slot = st.LOCAL, self.scopes[-1][symbol]
+        elif symbol not in self.function_locals:
+            node.depth, node.slot = st.GLOBAL, None
+        else:
+            node.depth, node.slot = None, None
+
+    ###################################
+
+    def visit_ListNode(self, node):
+        # Statement blocks are ListNodes too, their statements are used as far as the block is. A
+        # function body or program ending in यच्छ gives the returned value instead of the block's.
+        element_nodes = node.element_nodes
+        discarded = self.discarded or bool(element_nodes) and isinstance(element_nodes[-1], LEAVING_NODES)
+        for element_node in element_nodes:
+            self.visit(element_node, discarded)
+
+    def visit_DictionaryNode(self, node):
+        for key_node, value_node in node.element_nodes.items():
+            self.visit(key_node)
+            self.visit(value_node)
+
+    def visit_VarAccessNode(self, node):
+        self.reference(node, node.var_name_tok.symbol)
+
+    def visit_DataAccessNode(self, node):
+        self.reference(node, node.var_name_tok.symbol)
+        self.visit(node.index_tok)
+
+    def visit_VarAssignNode(self, node):
+        self.visit(node.value_node)
+        self.declare(node, node.var_name_tok.symbol)
+
+    def visit_ForNode(self, node):
+        node.collects = not self.discarded
+        if node.start_value_node:
+            self.visit(node.start_value_node)
+        self.visit(node.end_value_node)
+        if node.step_value_node:
+            self.visit(node.step_value_node)
+        self.declare(node, node.var_name_tok.symbol)
+        self.visit(node.body_node, not node.collects)
+
+    def visit_ForEachNode(self, node):
+        # Its value is always an empty List, the body's values are dropped
+        self.declare(node, node.var_name.symbol)
+        self.each_bodies += 1
+        self.visit(node.body_node, True)
+        self.each_bodies -= 1
+
+    def visit_BinOpNode(self, node):
+        self.visit(node.left_node)
+        self.visit(node.right_node)
+
+    def visit_UnaryOpNode(self, node):
+        self.visit(node.node)
+
+    def visit_FactorialNode(self, node):
+        self.visit(node.node)
+
+    def visit_WhileNode(self, node):
+        node.collects = not self.discarded
+        self.visit(node.condition_node)
+        self.visit(node.body_node, not node.collects)
+
+    def visit_FuncDefNode(self, node):
+        if node.var_name_tok:
+            self.declare(node, node.var_name_tok.symbol)
+
+        if not self.annotating:
+            layout = {}
+            for arg_name_tok in node.arg_name_tokens:
+                if arg_name_tok.symbol not in layout:
+                    layout[arg_name_tok.symbol] = len(layout)
+            self.scopes.append(layout)
+            self.visit(node.body_node)
+            self.scopes.pop()
+
+            node.layout = layout
+            self.function_locals.update(layout)
+            return
+
+        each_bodies, self.each_bodies = self.each_bodies, 0
+        self.scopes.append(node.layout)
+        self.visit(node.body_node)
+        self.scopes.pop()
+        self.each_bodies = each_bodies
+
+    def visit_CallNode(self, node):
+        self.visit(node.node_to_call)
+        node_to_call = node.node_to_call
+        if self.annotating and isinstance(node_to_call, nodes.VarAccessNode) and node_to_call.depth == st.GLOBAL:
+            # Called names are mostly functions that stay bound, other variables are left uncached
+            # as their stores would keep changing the root table's version
+            tok = node_to_call.var_name_tok
+            node_to_call.cache = st.GlobalCache(tok.value, tok.symbol)
+        for arg_node in node.arg_nodes:
+            self.visit(arg_node)
+
+    def visit_IfNode(self, node):
+        discarded = self.discarded
+        for condition, expr in node.cases:
+            self.visit(condition)
+            self.visit(expr, discarded)
+        if node.else_case:
+            self.visit(node.else_case, discarded)
+
+    def visit_ReturnNode(self, node):
+        node.tail_call = (
+            bool(self.scopes) and not self.each_bodies and isinstance(node.node_to_return, nodes.CallNode)
+        )
+        if node.node_to_return:
+            self.visit(node.node_to_return)
@@ -0,0 +1,146 @@
+import collections
+import hashlib
+import io
+import os
+import pickle
+import sys
+import zlib
+import Sansam.Storage as storage
+import Sansam.Collector as collector
+import Sansam.Lexer.Token as token
+import Sansam.Lexer.TokenStore as token_store
+
+# Bump whenever the lexer, the parser or the node classes change shape
+VERSION = 8
+
+MAGIC = b'SNSMAST'
+
+# An entry is MAGIC, VERSION and the crc32 of the pickle as 4 byte little endian integers, then the pickle
+HEADER_SIZE = len(MAGIC) + 8
+
+# Entries on disk are pickles and loading one can run arbitrary code, so trees are only kept on
+# disk when a directory is named, one that nobody else can write to
+DEFAULT_DIRECTORY = os.environ.get('SANSAM_CACHE') or None
+
+
+class AstPickler(pickle.Pickler):
+    def __init__(self, file):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+
+    # Stored tokens are saved as plain tokens so the token store does not come along
+    def reducer_override(self, obj):
+        if isinstance(obj, token_store.StoredToken):
+            return object.__new__, (token.Token,), (None, {
+                'type': obj.type, 'value': obj.value, 'symbol': obj.symbol,
+                'pos_start': obj.pos_start, 'pos_end': obj.pos_end,
+            })
+        return NotImplemented
+
+
+class AstCache:
+    # Trees are kept with the pool their symbols were interned in, a program run from a cached
+    # tree uses that pool. get hands out the cached tree itself, not a copy: trees are not changed
+    # once optimized, and the inline caches of their global names check the version of the root
+    # table, so no value is carried from one program to the next.
+    def __init__(self, directory=DEFAULT_DIRECTORY, capacity=128):
+        self.directory = directory
+        self.capacity = capacity
+        self.entries = collections.OrderedDict()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def key(self, fn, text, variant=''):
+        # fn is part of the key because every position in the tree refers to it,
+        # variant tells apart trees of the same source built with different passes
+        digest = hashlib.sha256()
+        digest.update(f'{VERSION}\0{sys.implementation.cache_tag}\0{variant}\0{fn}\0'.encode('utf-8'))
+        digest.update(text.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.ast')
+
+    def get(self, fn, text, variant=''):
+        # The tree and its pool, or None
+        key = self.key(fn, text, variant)
+
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.memory_hits += 1
+            return entry
+
+        entry = self.load(key)
+        if entry is not None:
+            self.remember(key, entry)
+            self.disk_hits += 1
+            return entry
+
+        self.misses += 1
+        return None
+
+    def put(self, fn, text, node, pool, variant=''):
+        key = self.key(fn, text, variant)
+        self.remember(key, (node, pool))
+        self.store(key, (node, pool))
+
+    def remember(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def load(self, key):
+        if self.directory is None:
+            return None
+        try:
+            with open(self.path(key), 'rb') as file:
+                data = file.read()
+            if data[:len(MAGIC)] != MAGIC or int.from_bytes(data[len(MAGIC):len(MAGIC) + 4], 'little') != VERSION:
+                return None
+            payload = memoryview(data)[HEADER_SIZE:]
+            # Damaged data can unpickle into a broken tree instead of failing, so it is not unpickled
+            if zlib.crc32(payload) != int.from_bytes(data[len(MAGIC) + 4:HEADER_SIZE], 'little'):
+                return None
+            # Unpickling creates no cycles
+            with collector.paused():
+                node, pool = pickle.loads(payload)
+        except Exception:
+            # A missing, unreadable or corrupt entry is just a miss, it is overwritten on the next store.
+            # Unpickling damaged data can fail with almost any exception.
+            return None
+
+        # The pool comes back with the ids it had, so the tree's symbols and layouts still hold
+        return node, pool
+
+    def store(self, key, entry):
+        if self.directory is None:
+            return
+        buffer = io.BytesIO()
+        pickler = AstPickler(buffer)
+        try:
+            pickler.dump(entry)
+        except RecursionError:
+            return
+        payload = buffer.getvalue()
+        header = MAGIC + VERSION.to_bytes(4, 'little') + zlib.crc32(payload).to_bytes(4, 'little')
+
+        path = self.path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            storage.write_atomically(path, header + payload)
+        except OSError:
+            pass
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'entries': len(self.entries),
+        }
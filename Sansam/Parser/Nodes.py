@@ -1,4 +1,6 @@
 class NumberNode:
+    __slots__ = ('tok', 'pos_start', 'pos_end')
+
     def __init__(self, tok):
         self.tok = tok
 
@@ -10,6 +12,8 @@ class NumberNode:
 
 
 class StringNode:
+    __slots__ = ('tok', 'pos_start', 'pos_end')
+
     def __init__(self, tok):
         self.tok = tok
 
@@ -20,7 +24,22 @@ class StringNode:
         return f'{self.tok}'
 
 
+class ConstantNode:
+    __slots__ = ('value', 'pos_start', 'pos_end')
+
+    def __init__(self, value, pos_start, pos_end):
+        self.value = value
+
+        self.pos_start = pos_start
+        self.pos_end = pos_end
+
+    def __repr__(self):
+        return f'{self.value}'
+
+
 class ListNode:
+    __slots__ = ('element_nodes', 'pos_start', 'pos_end')
+
     def __init__(self, element_nodes, pos_start, pos_end):
         self.element_nodes = element_nodes
         self.pos_start = pos_start
@@ -28,6 +47,8 @@ class ListNode:
 
 
 class DictionaryNode:
+    __slots__ = ('element_nodes', 'pos_start', 'pos_end')
+
     def __init__(self, element_nodes, pos_start, pos_end):
         self.element_nodes = element_nodes
         self.pos_start = pos_start
@@ -35,6 +56,8 @@ class DictionaryNode:
 
 
 class BooleanNode:
+    __slots__ = ('tok', 'pos_start', 'pos_end')
+
     def __init__(self, tok):
         self.tok = tok
 
@@ -43,14 +66,24 @@ class BooleanNode:
 
 
 class VarAccessNode:
+    __slots__ = ('var_name_tok', 'pos_start', 'pos_end', 'depth', 'slot', 'cache')
+
     def __init__(self, var_name_tok):
         self.var_name_tok = var_name_tok
 
         self.pos_start = self.var_name_tok.pos_start
         self.pos_end = self.var_name_tok.pos_end
 
+        # Filled in by the resolver, see Interpreter/SymbolTable.py. cache is the GlobalCache of a
+        # GLOBAL name that is called.
+        self.depth = None
+        self.slot = None
+        self.cache = None
+
 
 class DataAccessNode:
+    __slots__ = ('var_name_tok', 'index_tok', 'pos_start', 'pos_end', 'depth', 'slot')
+
     def __init__(self, var_name_tok, index_tok, pos_start, pos_end):
         self.var_name_tok = var_name_tok
         self.index_tok = index_tok
@@ -58,8 +91,14 @@ class DataAccessNode:
         self.pos_start = pos_start
         self.pos_end = pos_end
 
+        # Filled in by the resolver, see Interpreter/SymbolTable.py
+        self.depth = None
+        self.slot = None
+
 
 class VarAssignNode:
+    __slots__ = ('var_name_tok', 'value_node', 'pos_start', 'pos_end', 'depth', 'slot')
+
     def __init__(self, var_name_tok, value_node):
         self.var_name_tok = var_name_tok
         self.value_node = value_node
@@ -67,8 +106,14 @@ class VarAssignNode:
         self.pos_start = self.var_name_tok.pos_start
         self.pos_end = self.value_node.pos_end
 
+        # Filled in by the resolver, see Interpreter/SymbolTable.py
+        self.depth = None
+        self.slot = None
+
 
 class BinOpNode:
+    __slots__ = ('left_node', 'op_tok', 'right_node', 'pos_start', 'pos_end')
+
     def __init__(self, left_node, op_tok, right_node):
         self.left_node = left_node
         self.op_tok = op_tok
@@ -82,6 +127,8 @@ class BinOpNode:
 
 
 class UnaryOpNode:
+    __slots__ = ('op_tok', 'node', 'pos_start', 'pos_end')
+
     def __init__(self, op_tok, node):
         self.op_tok = op_tok
         self.node = node
@@ -94,6 +141,11 @@ class UnaryOpNode:
 
 
 class ForNode:
+    __slots__ = (
+        'var_name_tok', 'start_value_node', 'end_value_node', 'step_value_node', 'body_node', 'pos_start', 'pos_end',
+        'depth', 'slot', 'collects'
+    )
+
     def __init__(self, var_name_tok, start_value_node, end_value_node, step_value_node, body_node):
         self.var_name_tok = var_name_tok
         self.start_value_node = start_value_node
@@ -103,8 +155,16 @@ class ForNode:
         self.pos_start = self.var_name_tok.pos_start
         self.pos_end = self.body_node.pos_end
 
+        # Filled in by the resolver, see Interpreter/SymbolTable.py
+        self.depth = None
+        self.slot = None
+        # The resolver clears it when nothing uses the loop's value, the loop then keeps no List of its body values
+        self.collects = True
+
 
 class ForEachNode:
+    __slots__ = ('var_name', 'list_name', 'body_node', 'pos_start', 'pos_end', 'depth', 'slot')
+
     def __init__(self, var_name_tok, list_name, body_node):
         self.var_name = var_name_tok
         self.list_name = list_name
@@ -113,8 +173,14 @@ class ForEachNode:
         self.pos_start = self.var_name.pos_start
         self.pos_end = self.body_node.pos_end
 
+        # Filled in by the resolver, see Interpreter/SymbolTable.py
+        self.depth = None
+        self.slot = None
+
 
 class FactorialNode:
+    __slots__ = ('op_tok', 'node', 'pos_start', 'pos_end')
+
     def __init__(self, node, op_tok):
         self.op_tok = op_tok
         self.node = node
@@ -124,6 +190,8 @@ class FactorialNode:
 
 
 class WhileNode:
+    __slots__ = ('condition_node', 'body_node', 'pos_start', 'pos_end', 'collects')
+
     def __init__(self, condition_node, body_node):
         self.condition_node = condition_node
         self.body_node = body_node
@@ -131,8 +199,16 @@ class WhileNode:
         self.pos_start = self.condition_node.pos_start
         self.pos_end = self.body_node.pos_end
 
+        # See ForNode
+        self.collects = True
+
 
 class FuncDefNode:
+    __slots__ = (
+        'var_name_tok', 'arg_name_tokens', 'body_node', 'should_auto_return', 'pos_start', 'pos_end',
+        'depth', 'slot', 'layout'
+    )
+
     def __init__(self, var_name_tok, arg_name_tokens, body_node, should_auto_return):
         self.var_name_tok = var_name_tok
         self.arg_name_tokens = arg_name_tokens
@@ -148,8 +224,15 @@ class FuncDefNode:
 
         self.pos_end = self.body_node.pos_end
 
+        # Filled in by the resolver, see Interpreter/SymbolTable.py
+        self.depth = None
+        self.slot = None
+        self.layout = None
+
 
 class CallNode:
+    __slots__ = ('node_to_call', 'arg_nodes', 'pos_start', 'pos_end')
+
     def __init__(self, node_to_call, arg_nodes):
         self.node_to_call = node_to_call
         self.arg_nodes = arg_nodes
@@ -163,6 +246,8 @@ class CallNode:
 
 
 class IfNode:
+    __slots__ = ('cases', 'else_case', 'pos_start', 'pos_end')
+
     def __init__(self, cases, else_case):
         self.cases = cases
         self.else_case = else_case
@@ -172,20 +257,30 @@ class IfNode:
 
 
 class ReturnNode:
+    __slots__ = ('node_to_return', 'pos_start', 'pos_end', 'tail_call')
+
     def __init__(self, node_to_return, pos_start, pos_end):
         self.node_to_return = node_to_return
 
         self.pos_start = pos_start
         self.pos_end = pos_end
 
+        # Set by the resolver when the function returns what a call returns and the call can
+        # be made after the function's frame ends
+        self.tail_call = False
+
 
 class ContinueNode:
+    __slots__ = ('pos_start', 'pos_end')
+
     def __init__(self, pos_start, pos_end):
         self.pos_start = pos_start
         self.pos_end = pos_end
 
 
 class BreakNode:
+    __slots__ = ('pos_start', 'pos_end')
+
     def __init__(self, pos_start, pos_end):
         self.pos_start = pos_start
         self.pos_end = pos_end
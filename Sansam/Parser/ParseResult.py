@@ -3,7 +3,6 @@ class ParseResult:
         self.error = None
         self.node = None
         self.advance_count = 0
-        self.to_reverse_count = 0
 
     def register_advancement(self):
         self.advance_count += 1
@@ -14,13 +13,6 @@ class ParseResult:
             self.error = res.error
         return res.node
 
-    def try_register(self, res):
-        if res.error:
-            self.to_reverse_count = res.advance_count
-            return None
-        else:
-            return self.register(res)
-
     def success(self, node):
         self.node = node
         return self
@@ -3,6 +3,37 @@ import Sansam.Parser.Nodes as nodes
 import Sansam.Error.Errors as error
 import Sansam.Lexer.Token as token
 
+# Binding strength of the binary operators, loosest first
+LOGICAL, COMPARISON, ARITHMETIC, TERM = range(1, 5)
+
+LOGICAL_KEYWORDS = ('च', 'वा')
+
+BINARY_PRECEDENCE = {
+    token.T_ISG: COMPARISON,
+    token.T_ISEQ: COMPARISON,
+    token.T_ISNEQ: COMPARISON,
+    token.T_ISL: COMPARISON,
+    token.T_BIT_AND: COMPARISON,
+    token.T_ISLEQ: COMPARISON,
+    token.T_BIT_OR: COMPARISON,
+    token.T_ISGEQ: COMPARISON,
+    token.T_RSHIFT: COMPARISON,
+    token.T_LSHIFT: COMPARISON,
+    token.T_XOR: COMPARISON,
+    token.T_PLUS: ARITHMETIC,
+    token.T_MINUS: ARITHMETIC,
+    token.T_MUL: TERM,
+    token.T_DIV: TERM,
+    token.T_MOD: TERM,
+}
+
+# FIRST sets of the statement grammar, split into token types and keywords
+EXPR_FIRST = frozenset((
+    token.T_INT, token.T_FLOAT, token.T_STRING, token.T_IDENTIFIER, token.T_PLUS, token.T_MINUS,
+    token.T_NOT, token.T_BIT_NOT, token.T_LPAREN, token.T_LSQUARE, token.T_LCURL,
+))
+EXPR_KEYWORDS = frozenset(('न', 'सत्यम्', 'असत्यम्', 'प्रति', 'यावद्', 'कार्य', 'यदि'))
+STATEMENT_KEYWORDS = EXPR_KEYWORDS | {'यच्छ', 'विघ्नः', 'अनुवर्तते'}
 
 class Parser:
     def __init__(self, tokens):
@@ -15,14 +46,28 @@ class Parser:
         self.update_current_tok()
         return self.current_tok
 
-    def reverse(self, amount=1):
-        self.tok_index -= amount
-        self.update_current_tok()
-        return self.current_tok
+    def peek(self, amount=1):
+        return self.tokens[self.tok_index + amount]
+
+    def starts_expr(self):
+        tok = self.current_tok
+        if tok.type == token.T_KEYWORD:
+            return tok.value in EXPR_KEYWORDS
+        return tok.type in EXPR_FIRST
+
+    def starts_statement(self):
+        tok = self.current_tok
+        if tok.type == token.T_KEYWORD:
+            return tok.value in STATEMENT_KEYWORDS
+        return tok.type in EXPR_FIRST
 
     def update_current_tok(self):
-        if self.tok_index > -1 and self.tok_index < len(self.tokens):
-            self.current_tok = self.tokens[self.tok_index]
+        # Indexing instead of len() lets tokens be a list or a streaming TokenBuffer
+        if self.tok_index > -1:
+            try:
+                self.current_tok = self.tokens[self.tok_index]
+            except IndexError:
+                pass
 
     def parse(self):
         res = self.statements()
@@ -305,6 +350,12 @@ class Parser:
         res.register_advancement()
         self.advance()
 
+        if self.current_tok.type == token.T_IDENTIFIER and self.peek().type == token.T_THEN:
+            var_name = self.current_tok
+            list_name, body = self.for_each_node(self.current_tok)
+
+            return res.success(nodes.ForEachNode(var_name, list_name, body))  # calling of for each node
+
         if self.current_tok.type == token.T_IDENTIFIER:
             var_name = self.current_tok
             res.register_advancement()
@@ -319,19 +370,6 @@ class Parser:
                 if res.error:
                     return res
 
-            elif self.current_tok.type == token.T_THEN:
-                self.reverse()
-
-                var_name = self.current_tok
-                list_name, body = self.for_each_node(self.current_tok)
-                # print(self.current_tok)
-
-                return res.success(nodes.ForEachNode(var_name, list_name, body))  # calling of for each node
-
-                # res.register_advancement()
-                # self.advance()
-
-
             else:
                 return res.failure(error.InvalidSyntaxError(
                     self.current_tok.pos_start, self.current_tok.pos_end,
@@ -595,126 +633,99 @@ class Parser:
             self.current_tok.pos_end.copy()
         ))
 
-    def atom(self):
-        res = pr.ParseResult()
+    def atom(self, res):
         tok = self.current_tok
 
         if tok.type in (token.T_INT, token.T_FLOAT):
             res.register_advancement()
             self.advance()
-            return res.success(nodes.NumberNode(tok))
+            return nodes.NumberNode(tok)
         elif tok.type == token.T_STRING:
             res.register_advancement()
             self.advance()
-            return res.success(nodes.StringNode(tok))
+            return nodes.StringNode(tok)
         elif tok.type == token.T_IDENTIFIER:
             res.register_advancement()
             self.advance()
-            return res.success(nodes.VarAccessNode(tok))
-
-        elif tok.type == token.T_STRING:
-            res.register_advancement()
-            self.advance()
-            return res.success(nodes.StringNode(tok))
+            return nodes.VarAccessNode(tok)
 
         elif tok.matches(token.T_KEYWORD, 'असत्यम्') or tok.matches(token.T_KEYWORD, 'सत्यम्'):
             res.register_advancement()
             self.advance()
-            return res.success(nodes.BooleanNode(tok))
+            return nodes.BooleanNode(tok)
 
         elif tok.type == token.T_LPAREN:
             res.register_advancement()
             self.advance()
             expr = res.register(self.expr())
             if res.error:
-                return res
+                return None
             if self.current_tok.type == token.T_RPAREN:
                 res.register_advancement()
                 self.advance()
-                return res.success(expr)
+                return expr
             else:
-                return res.failure(error.InvalidSyntaxError(
+                res.failure(error.InvalidSyntaxError(
                     self.current_tok.pos_start, self.current_tok.pos_end,
                     "अपेक्षित ')'"
                 ))
+                return None
 
         elif tok.matches(token.T_KEYWORD, "प्रति"):
-            for_expr = res.register(self.for_expr())
-            if res.error: return res
-            return res.success(for_expr)
+            return res.register(self.for_expr())
 
         elif tok.matches(token.T_KEYWORD, 'यावद्'):
-            while_expr = res.register(self.while_expr())
-            if res.error:
-                return res
-            return res.success(while_expr)
+            return res.register(self.while_expr())
 
         elif tok.matches(token.T_KEYWORD, 'कार्य'):
-            func_def = res.register(self.func_def())
-            if res.error:
-                return res
-            return res.success(func_def)
+            return res.register(self.func_def())
 
         elif tok.type == token.T_LSQUARE:
-            list_expr = res.register(self.list_expr())
-            if res.error:
-                return res
-            return res.success(list_expr)
+            return res.register(self.list_expr())
 
         elif tok.type == token.T_LCURL:
-            dict_expr = res.register(self.dict_expr())
-            if res.error:
-                return res
-            return res.success(dict_expr)
+            return res.register(self.dict_expr())
 
         elif tok.matches(token.T_KEYWORD, 'यदि'):
-            if_expr = res.register(self.if_expr())
-            # print(self.current_tok)
-            if res.error: return res
-            return res.success(if_expr)
+            return res.register(self.if_expr())
 
-        return res.failure(error.InvalidSyntaxError(
+        res.failure(error.InvalidSyntaxError(
             tok.pos_start, tok.pos_end,
             "अपेक्षित अंकम्, चरः, '+', '-','[', वा  '('"
         ))
+        return None
 
-    def access(self):
-        res = pr.ParseResult()
-        pos_start = self.current_tok.pos_start.copy()
-
-        if self.current_tok.type == token.T_IDENTIFIER:
+    def access(self, res):
+        if self.current_tok.type == token.T_IDENTIFIER and self.peek().type == token.T_LSQUARE:
+            pos_start = self.current_tok.pos_start.copy()
             var_name = self.current_tok
             res.register_advancement()
             self.advance()
+            res.register_advancement()
+            self.advance()
 
-            if self.current_tok.type == token.T_LSQUARE:
+            expr = res.register(self.expr())
+            if res.error:
+                return None
+
+            if self.current_tok.type == token.T_RSQUARE:
                 res.register_advancement()
                 self.advance()
 
-                expr = res.register(self.expr())
-                if res.error:
-                    return res
-
-                if self.current_tok.type == token.T_RSQUARE:
-                    res.register_advancement()
-                    self.advance()
+                return nodes.DataAccessNode(var_name, expr, pos_start, self.current_tok.pos_end.copy())
 
-                    return res.success(nodes.DataAccessNode(var_name, expr, pos_start, self.current_tok.pos_end.copy()))
+            res.failure(error.InvalidSyntaxError(
+                self.current_tok.pos_start, self.current_tok.pos_end,
+                "अपेक्षित ']'"
+            ))
+            return None
 
-                else:
-                    return res.failure(error.InvalidSyntaxError(
-                        self.current_tok.pos_start, self.current_tok.pos_end,
-                        "अपेक्षित ']'"
-                    ))
-            else:
-                self.reverse()
-        return self.atom()
+        return self.atom(res)
 
-    def call(self):
-        res = pr.ParseResult()
-        access = res.register(self.access())
+    def call(self, res):
+        access = self.access(res)
         if res.error:
-            return res
+            return None
 
         if self.current_tok.type == token.T_LPAREN:
             res.register_advancement()
@@ -727,129 +738,126 @@ class Parser:
             else:
                 arg_nodes.append(res.register(self.expr()))
                 if res.error:
-                    return res.failure(error.InvalidSyntaxError(
-                        self.current_tok.pos_start, self.current_tok.pos_end,
-                        "अपेक्षित ')', 'VAR', 'IF', 'FOR', 'WHILE', 'FUN', int, float, identifier, '+', '-', '(', "
-                        "'[' or 'NOT' "
-                    ))
+                    return None
 
                 while self.current_tok.type == token.T_COMMA:
                     res.register_advancement()
                     self.advance()
 
                     arg_nodes.append(res.register(self.expr()))
-                    if res.error: return res
+                    if res.error:
+                        return None
 
                 if self.current_tok.type != token.T_RPAREN:
-                    return res.failure(error.InvalidSyntaxError(
+                    res.failure(error.InvalidSyntaxError(
                         self.current_tok.pos_start, self.current_tok.pos_end,
                         f"अपेक्षित ',' or ')'"
                     ))
+                    return None
 
                 res.register_advancement()
                 self.advance()
-            return res.success(nodes.CallNode(access, arg_nodes))
-        return res.success(access)
+            return nodes.CallNode(access, arg_nodes)
+        return access
 
-    def factorial(self):
-        res = pr.ParseResult()
+    def factorial(self, res):
         tok = self.current_tok
+        node = self.call(res)
+        if res.error:
+            return None
 
-        if tok.type in (token.T_INT, token.T_IDENTIFIER):
-            node = res.register(self.call())
-            if res.error:
-                return res
-            if self.current_tok.type == token.T_FACT:
-                tok = self.current_tok
-                res.register_advancement()
-                self.advance()
-                return res.success(nodes.FactorialNode(node, tok))
-            return res.success(node)
-
-        return self.call()
-
-    def power(self):
-        return self.bin_op(self.factorial, (token.T_POW,), self.factor)
+        if tok.type in (token.T_INT, token.T_IDENTIFIER) and self.current_tok.type == token.T_FACT:
+            op_tok = self.current_tok
+            res.register_advancement()
+            self.advance()
+            return nodes.FactorialNode(node, op_tok)
+        return node
 
-    def factor(self):
-        res = pr.ParseResult()
+    def factor(self, res):
         tok = self.current_tok
 
         if tok.type in (token.T_PLUS, token.T_MINUS):
             res.register_advancement()
             self.advance()
-            factor = res.register(self.factor())
+            node = self.factor(res)
             if res.error:
-                return res
-            return res.success(nodes.UnaryOpNode(tok, factor))
-
-        return self.power()
-
-    def term(self):
-        return self.bin_op(self.factor, (token.T_MUL, token.T_DIV, token.T_MOD))
-
-    def arith_expr(self):
-        return self.bin_op(self.term, (token.T_PLUS, token.T_MINUS))
+                return None
+            return nodes.UnaryOpNode(tok, node)
 
-    def comp_expr(self):
-        res = pr.ParseResult()
+        node = self.factorial(res)
+        if res.error:
+            return None
 
-        if self.current_tok.matches(token.T_KEYWORD, 'न') or self.current_tok.type == token.T_NOT:
+        # The exponent is itself a factor, which makes '^' right associative
+        while self.current_tok.type == token.T_POW:
             op_tok = self.current_tok
             res.register_advancement()
             self.advance()
-
-            node = res.register(self.comp_expr())
+            right = self.factor(res)
             if res.error:
-                return res
+                return None
+            node = nodes.BinOpNode(node, op_tok, right)
 
-            return res.success(nodes.UnaryOpNode(op_tok, node))
-        elif self.current_tok.type == token.T_BIT_NOT:
+        return node
 
-            op_tok = self.current_tok
+    def binary_expr(self, res, min_precedence):
+        start = res.advance_count
+        tok = self.current_tok
+
+        if min_precedence <= COMPARISON and (tok.matches(token.T_KEYWORD, 'न') or tok.type in (token.T_NOT, token.T_BIT_NOT)):
             res.register_advancement()
             self.advance()
+            node = self.binary_expr(res, COMPARISON)
+            if res.error:
+                return None
+            left = nodes.UnaryOpNode(tok, node)
+        else:
+            left = self.factor(res)
 
-            node = res.register(self.comp_expr())
-            if res.error: return error
-
-            return res.success(nodes.UnaryOpNode(op_tok, node))
+        while not res.error:
+            op_tok = self.current_tok
+            precedence = BINARY_PRECEDENCE.get(op_tok.type)
+            if precedence is None and op_tok.type == token.T_KEYWORD and op_tok.value in LOGICAL_KEYWORDS:
+                precedence = LOGICAL
+            if precedence is None or precedence < min_precedence:
+                break
 
-        node = res.register(
-            self.bin_op(self.arith_expr, (token.T_ISG, token.T_ISEQ, token.T_ISNEQ, token.T_ISL, token.T_BIT_AND,
-                                          token.T_ISLEQ, token.T_BIT_OR, token.T_ISGEQ, token.T_RSHIFT, token.T_LSHIFT,
-                                          token.T_XOR)))
+            res.register_advancement()
+            self.advance()
+            if precedence == TERM:
+                right = self.factor(res)
+            else:
+                right = self.binary_expr(res, precedence + 1)
+            if res.error:
+                break
+            left = nodes.BinOpNode(left, op_tok, right)
 
         if res.error:
-            return res.failure(error.InvalidSyntaxError(
-                self.current_tok.pos_start, self.current_tok.pos_end,
-                "अपेक्षित अंकम्, चरः, '+', '-','!','न','[' वा  '('"
-            ))
-
-        return res.success(node)
+            if min_precedence <= COMPARISON and res.advance_count == start:
+                res.error = error.InvalidSyntaxError(
+                    self.current_tok.pos_start, self.current_tok.pos_end,
+                    "अपेक्षित अंकम्, चरः, '+', '-','!','न','[' वा  '('"
+                )
+            return None
+        return left
 
     def expr(self):
         res = pr.ParseResult()
 
-        if self.current_tok.type == token.T_IDENTIFIER:
+        if self.current_tok.type == token.T_IDENTIFIER and self.peek().type == token.T_EQU:
             var_name = self.current_tok
             res.register_advancement()
             self.advance()
+            res.register_advancement()
+            self.advance()
 
-            if self.current_tok.type == token.T_EQU:
-                res.register_advancement()
-                self.advance()
-
-                expr = res.register(self.expr())
-                if res.error:
-                    return res
-
-                return res.success(nodes.VarAssignNode(var_name, expr))
+            expr = res.register(self.expr())
+            if res.error:
+                return res
 
-            else:
-                self.reverse()
+            return res.success(nodes.VarAssignNode(var_name, expr))
 
-        node = res.register(self.bin_op(self.comp_expr, ((token.T_KEYWORD, 'च'), (token.T_KEYWORD, 'वा'))))
+        node = self.binary_expr(res, LOGICAL)
 
         if res.error:
             res.failure(error.InvalidSyntaxError(
@@ -867,9 +875,11 @@ class Parser:
             res.register_advancement()
             self.advance()
 
-            expr = res.try_register(self.expr())
-            if not expr:
-                self.reverse(res.to_reverse_count)
+            expr = None
+            if self.starts_expr():
+                expr = res.register(self.expr())
+                if res.error:
+                    return res
             return res.success(nodes.ReturnNode(expr, pos_start, self.current_tok.pos_start.copy()))
 
         if self.current_tok.matches(token.T_KEYWORD, 'अनुवर्तते'):
@@ -904,8 +914,6 @@ class Parser:
             return res
         statements.append(statement)
 
-        more_statements = True
-
         while True:
             newline_count = 0
             while self.current_tok.type == token.T_NL:
@@ -913,42 +921,15 @@ class Parser:
                 self.advance()
                 newline_count += 1
 
-            if newline_count == 0:
-                more_statements = False
-
-            if not more_statements:
+            if newline_count == 0 or not self.starts_statement():
                 break
 
-            statement = res.try_register(self.statement())
-            if not statement:
-                self.reverse(res.to_reverse_count)
-                more_statements = False
-                continue
+            statement = res.register(self.statement())
+            if res.error:
+                return res
 
             statements.append(statement)
 
         return res.success(nodes.ListNode(
             statements, pos_start, self.current_tok.pos_end.copy()
         ))
-
-    ###############################################################
-
-    def bin_op(self, func_1, ops, func_2=None):
-        if func_2 is None:
-            func_2 = func_1
-
-        res = pr.ParseResult()
-        left = res.register(func_1())
-        if res.error:
-            return res
-
-        while self.current_tok.type in ops or (self.current_tok.type, self.current_tok.value) in ops:
-            op_tok = self.current_tok
-            res.register_advancement()
-            self.advance()
-            right = res.register(func_2())
-            if res.error:
-                return res
-            left = nodes.BinOpNode(left, op_tok, right)
-
-        return res.success(left)
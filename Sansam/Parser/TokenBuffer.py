@@ -0,0 +1,30 @@
+class TokenBuffer:
+    def __init__(self, tokens, lookahead=256):
+        self.tokens = iter(tokens)
+        self.lookahead = lookahead
+        self.window = []
+        self.base = 0
+        self.exhausted = False
+
+    def __getitem__(self, index):
+        if index < self.base:
+            raise Exception(f"Token {index} has left the lookahead buffer of {self.lookahead} tokens")
+
+        offset = index - self.base
+        window = self.window
+        while offset >= len(window):
+            if self.exhausted:
+                raise IndexError(index)
+            try:
+                window.append(next(self.tokens))
+            except StopIteration:
+                self.exhausted = True
+                raise IndexError(index)
+
+            if len(window) > 2 * self.lookahead:
+                drop = len(window) - self.lookahead
+                del window[:drop]
+                self.base += drop
+                offset -= drop
+
+        return window[offset]
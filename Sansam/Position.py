@@ -1,4 +1,6 @@
 class Position:
+    __slots__ = ('index', 'line', 'col', 'fn', 'ftext')
+
     def __init__(self, index, line, col, fn, ftext):
         self.index = index
         self.line = line
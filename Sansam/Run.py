@@ -1,31 +1,91 @@
-import Sansam.Lexer.Lexer
+import Sansam.Lexer.TableLexer
+import Sansam.Lexer.SymbolPool
+import Sansam.Lexer.SourceStream
 import Sansam.Values.Number
 import Sansam.Parser.Parser
+import Sansam.Parser.TokenBuffer
+import Sansam.Parser.AstCache
+import Sansam.Optimizer.ConstantFolder
+import Sansam.Optimizer.Resolver
 import Sansam.Interpreter.Interpreter
+import Sansam.Interpreter.SignalInterpreter
+import Sansam.Compiler.ClosureCompiler
+import Sansam.Compiler.BytecodeCompiler
+import Sansam.Compiler.VirtualMachine
+import Sansam.Compiler.Artifact
+import Sansam.Compiler.PythonTranspiler
 import Sansam.Context
 import Sansam.Interpreter.SymbolTable as st
 import Sansam.Values.Function as func
 
-global_symbol_table = st.SymbolTable()
-global_symbol_table.set("लुप्तः", Sansam.Values.Number.null)
-global_symbol_table.set("असत्यम्", Sansam.Values.Number.false)
-global_symbol_table.set("सत्यम्", Sansam.Values.Number.true)
-global_symbol_table.set("मुद्रणः", func.print_)
-global_symbol_table.set("मुद्रणः_यच्छ", func.print_ret)
-global_symbol_table.set("आगम्", func.input_)
-global_symbol_table.set("आगम्_पूर्णाङ्कः", func.input_int)
-global_symbol_table.set("किम्_पूर्णाङ्क", func.is_number_)
-global_symbol_table.set("किम्_सूत्र", func.is_string_)
-global_symbol_table.set("किम्_आवलि", func.is_list_)
-global_symbol_table.set("किम्_कार्य", func.is_function_)
-global_symbol_table.set("संकलः", func.append_)
-global_symbol_table.set("पोप", func.pop_)
-global_symbol_table.set("अतिसृ", func.extend_)
-
-def run(fn, text):
+BUILT_INS = {
+    "लुप्तः": Sansam.Values.Number.null,
+    "असत्यम्": Sansam.Values.Number.false,
+    "सत्यम्": Sansam.Values.Number.true,
+    "मुद्रणः": func.print_,
+    "मुद्रणः_यच्छ": func.print_ret,
+    "आगम्": func.input_,
+    "आगम्_पूर्णाङ्कः": func.input_int,
+    "किम्_पूर्णाङ्क": func.is_number_,
+    "किम्_सूत्र": func.is_string_,
+    "किम्_आवलि": func.is_list_,
+    "किम्_कार्य": func.is_function_,
+    "संकलः": func.append_,
+    "पोप": func.pop_,
+    "अतिसृ": func.extend_,
+}
+
+
+def new_context(pool):
+    # The context of one program, its global table interning in the program's own pool
+    global_symbol_table = st.SymbolTable(pool=pool)
+    for name, value in BUILT_INS.items():
+        global_symbol_table.set(name, value)
+
+    context = Sansam.Context.Context('<program>')
+    context.symbol_table = global_symbol_table
+    return context
+
+
+# Parsed programs keyed by source hash, kept on disk only under SANSAM_CACHE. Set to None to
+# always lex and parse
+ast_cache = Sansam.Parser.AstCache.AstCache()
+
+# Folds constant expressions before they are interpreted, set to None to run the tree as parsed.
+# folded and simplified count the nodes it replaced.
+constant_folder = Sansam.Optimizer.ConstantFolder.ConstantFolder()
+
+# The engine run and interpret use when given none. 'vm' compiles the tree into bytecode for the
+# stack machine, 'closure' into Python closures, 'python' into Python source, 'interpreter' walks
+# it and 'signals' walks it returning plain values, raising errors and control flow as exceptions.
+# Only the VM keeps its frames off the Python stack, the others fail a few hundred calls deep.
+default_engine = 'vm'
+
+# Gives variables their frame slots, the interpreter relies on it so it always runs
+resolver = Sansam.Optimizer.Resolver.Resolver()
+
+def run(fn, text, engine=None):
+    # Every program gets a pool of its own, a cached tree brings the one it was parsed with
+    variant = 'folded' if constant_folder else ''
+    entry = ast_cache.get(fn, text, variant) if ast_cache else None
+    if entry is None:
+        pool = Sansam.Lexer.SymbolPool.SymbolPool()
+        node, error = parse(fn, text, pool)
+        if error:
+            return None, error
+        node = optimize(node)
+        if ast_cache:
+            ast_cache.put(fn, text, node, pool, variant)
+    else:
+        node, pool = entry
+
+    return interpret(node, engine, pool)
+
+
+def parse(fn, text, pool):
     # Generate tokens
-    lexer = Sansam.Lexer.Lexer.Lexer(fn, text)
-    tokens, error = lexer.make_tokens()
+    lexer = Sansam.Lexer.TableLexer.TableLexer(fn, text, pool)
+    tokens, error = lexer.make_token_store()
     if error:
         return None, error
 
@@ -35,11 +95,67 @@ def run(fn, text):
     if ast.error:
         return None, ast.error
 
-    # Run program
+    return ast.node, None
+
+
+def run_stream(fn, source, lookahead=256):
+    # Tokens are lexed lazily from a file object or mmap while the parser consumes them
+    stream = Sansam.Lexer.SourceStream.SourceStream(source)
+    pool = Sansam.Lexer.SymbolPool.SymbolPool()
+    lexer = Sansam.Lexer.TableLexer.TableLexer(fn, stream, pool)
+    tokens = Sansam.Parser.TokenBuffer.TokenBuffer(lexer.iter_tokens(stream.lines()), lookahead)
+
+    # Generate AST
+    parser = Sansam.Parser.Parser.Parser(tokens)
+    ast = parser.parse()
+    if lexer.error:
+        return None, lexer.error
+    if ast.error:
+        return None, ast.error
+
+    return interpret(optimize(ast.node), pool=pool)
+
+
+def compile(fn, text, path, keep_source=True):
+    # Writes the program's bytecode to path for run_compiled, without keep_source errors show no source line
+    pool = Sansam.Lexer.SymbolPool.SymbolPool()
+    node, error = parse(fn, text, pool)
+    if error:
+        return error
+
+    code = Sansam.Compiler.BytecodeCompiler.BytecodeCompiler().compile(optimize(node))
+    Sansam.Compiler.Artifact.write(path, code, fn, text if keep_source else '', pool)
+    return None
+
+
+def run_compiled(path):
+    # Runs a program written by compile on the VM, raises ArtifactError for a file of another version
+    pool = Sansam.Lexer.SymbolPool.SymbolPool()
+    code, fn = Sansam.Compiler.Artifact.read(path, pool)
+    return Sansam.Compiler.VirtualMachine.execute_code(code, new_context(pool))
+
+
+def optimize(node):
+    if constant_folder:
+        node = constant_folder.visit(node)
+    return resolver.resolve(node)
+
+
+def interpret(node, engine=None, pool=None):
+    # Run program, node's symbols interned in pool
+    context = new_context(pool)
+
+    engine = engine or default_engine
+    if engine == 'closure':
+        return Sansam.Compiler.ClosureCompiler.execute(node, context)
+    if engine == 'vm':
+        return Sansam.Compiler.VirtualMachine.execute(node, context)
+    if engine == 'python':
+        return Sansam.Compiler.PythonTranspiler.execute(node, context)
+    if engine == 'signals':
+        return Sansam.Interpreter.SignalInterpreter.execute(node, context)
+
     interpreter = Sansam.Interpreter.Interpreter.Interpreter()
-    context = Sansam.Context.Context('<program>')
-    context.symbol_table = global_symbol_table
-    result = interpreter.visit(ast.node, context)
+    result = interpreter.visit(node, context)
 
     return result.value, result.error
-
@@ -0,0 +1,22 @@
+import os
+import tempfile
+
+
+def file_mode():
+    # The mode open() would give a new file, tempfile makes its files readable by their owner only
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def write_atomically(path, data):
+    # Written beside the target first so a reader never sees half a file
+    fd, temp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+        os.chmod(temp, file_mode())
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
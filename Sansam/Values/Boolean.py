@@ -13,18 +13,18 @@ class Boolean(val.Value):
 
     def anded_by(self, other):
         if isinstance(other, Boolean):
-            return Boolean(self.boolean and other.boolean).set_context(self.context), None
+            return make(self.boolean and other.boolean), None
         else:
             return None, val.Value.illegal_operation(self, other)
 
     def ored_by(self, other):
         if isinstance(other, Boolean):
-            return Boolean(self.boolean or other.boolean).set_context(self.context), None
+            return make(self.boolean or other.boolean), None
         else:
             return None, val.Value.illegal_operation(self, other)
 
     def notted(self):
-        return Boolean(False if self.boolean == True else True).set_context(self.context), None
+        return make(False if self.boolean == True else True), None
 
     def copy(self):
         copy = Boolean(self.boolean)
@@ -41,3 +41,15 @@ class Boolean(val.Value):
         else:
             return str("असत्यम्")
 
+
+true = Boolean(True)
+false = Boolean(False)
+
+
+def make(boolean):
+    # The shared सत्यम् or असत्यम्, for a truth value or the keyword itself
+    if boolean == 'सत्यम्':
+        return true
+    if boolean == 'असत्यम्':
+        return false
+    return true if boolean else false
@@ -1,5 +1,6 @@
 import Sansam.Values.Value as val
 import Sansam.Interpreter.RunTimeResult as rtr
+import Sansam.Interpreter.Signals as signals
 import Sansam.Interpreter.Interpreter as it
 import Sansam.Context as ct
 import Sansam.Interpreter.SymbolTable as st
@@ -7,7 +8,10 @@ import Sansam.Error.Errors as error
 import Sansam.Values.Number as nu
 import Sansam.Values.String as String
 import Sansam.Values.List as li
-import os
+
+# Calls nested deeper than this fail with a RunTimeError. The VM keeps its frames in a list, the
+# other engines recurse on the Python stack and fail with stack_error when it runs out first.
+MAX_CALL_DEPTH = 100_000
 
 
 class BaseFunction(val.Value):
@@ -15,14 +19,12 @@ class BaseFunction(val.Value):
         super().__init__()
         self.name = name or "<anonymous>"
 
-    def generate_new_context(self):
-        new_context = ct.Context(self.name, self.context, self.pos_start)
-        new_context.symbol_table = st.SymbolTable(new_context.parent.symbol_table)
-        return new_context
-
     def check_args(self, arg_names, args):
         res = rtr.RunTimeResult()
 
+        if self.context and self.context.depth >= MAX_CALL_DEPTH:
+            return res.failure(self.depth_error())
+
         if len(args) > len(arg_names):
             return res.failure(error.RunTimeError(
                 self.pos_start, self.pos_end,
@@ -39,45 +41,104 @@ class BaseFunction(val.Value):
 
         return res.success(None)
 
-    def populate_args(self, arg_names, args, exec_ctx):
-        for i in range(len(args)):
-            arg_name = arg_names[i]
-            arg_value = args[i]
-            arg_value.set_context(exec_ctx)
-            exec_ctx.symbol_table.set(arg_name, arg_value)
+    def copy(self):
+        # Each call copies the function, the copy shares what was worked out when it was defined
+        copy = object.__new__(self.__class__)
+        copy.__dict__.update(self.__dict__)
+        return copy
+
+    def depth_error(self):
+        return error.RunTimeError(
+            self.pos_start, self.pos_end, f"maximum call depth exceeded calling {self}", self.context
+        )
+
+    def stack_error(self):
+        return error.RunTimeError(
+            self.pos_start, self.pos_end,
+            f"Python stack exhausted calling {self}, the vm engine nests calls deeper", self.context
+        )
 
-    def check_and_populate_args(self, arg_names, args, exec_ctx):
-        res = rtr.RunTimeResult()
-        res.register(self.check_args(arg_names, args))
-        if res.error: return res
-        self.populate_args(arg_names, args, exec_ctx)
-        return res.success(None)
+
+def argument_slots(arg_names):
+    # The frame slot of each argument. The resolver numbers a function's arguments first and in
+    # order, a repeated name keeping its first slot. None when argument i is in slot i.
+    slots = {}
+    arg_slots = [slots.setdefault(name, len(slots)) for name in arg_names]
+    return None if len(slots) == len(arg_slots) else arg_slots
 
 
 class Function(BaseFunction):
-    def __init__(self, name, body_node, arg_names,should_auto_return):
+    def __init__(self, name, body_node, arg_names,should_auto_return, layout=None):
         super().__init__(name)
         self.body_node = body_node
         self.arg_names = arg_names
         self.should_auto_return = should_auto_return
+        self.layout = layout
+        # Worked out once here, each call only compares its number of arguments
+        self.arity = len(arg_names)
+        self.arg_slots = argument_slots(arg_names)
 
     def execute(self, args):
         res = rtr.RunTimeResult()
-        interpreter = it.Interpreter()
-        exec_ctx = self.generate_new_context()
-
-        res.register(self.check_and_populate_args(self.arg_names, args, exec_ctx))
-        if res.error: return res
+        function = self
+        exec_ctx, error = self.new_frame(args)
+        if error: return res.failure(error)
 
-        value = res.register(interpreter.visit(self.body_node, exec_ctx))
-        if res.error: return res
-        return res.success(value)
-
-    def copy(self):
-        copy = Function(self.name, self.body_node, self.arg_names,self.should_auto_return)
-        copy.set_context(self.context)
-        copy.set_pos(self.pos_start, self.pos_end)
-        return copy
+        while True:
+            try:
+                value = res.register(it.interpreter.visit(function.body_node, exec_ctx))
+            except RecursionError:
+                return res.failure(function.stack_error())
+            if res.error: return res
+            # यच्छ leaves its value in func_return_value, the body's own value is then None
+            if res.func_return_value:
+                value = res.func_return_value
+            if not isinstance(value, signals.TailCallSignal):
+                st.release(exec_ctx.symbol_table)
+                return res.success(value)
+
+            # A tail call, made here once the frame has returned
+            callee, args = value.function, value.args
+            if function.reenters(callee, args):
+                function.bind_args(exec_ctx.symbol_table, args)
+            elif callee.__class__ is Function:
+                # Run by this loop, a chain of tail calls does not grow the Python stack. The frame
+                # left is the callee's parent, so it is not released.
+                function = callee
+                exec_ctx, error = callee.new_frame(args)
+                if error: return res.failure(error)
+            else:
+                return callee.execute(args)
+
+    def new_frame(self, args):
+        # The context a call runs in with args in their slots, or the error of a call with the
+        # wrong number of arguments or nested too deep
+        context = self.context
+        if len(args) != self.arity or context.depth >= MAX_CALL_DEPTH:
+            return None, self.check_args(self.arg_names, args).error
+
+        exec_ctx = ct.Context(self.name, context, self.pos_start)
+        exec_ctx.symbol_table = st.frame(context.symbol_table, self.layout)
+        self.bind_args(exec_ctx.symbol_table, args)
+        return exec_ctx, None
+
+    def bind_args(self, symbol_table, args):
+        if self.arg_slots is None:
+            if args:
+                symbol_table.slots[:len(args)] = args
+            return
+        slots = symbol_table.slots
+        for slot, value in zip(self.arg_slots, args):
+            slots[slot] = value
+
+    def reenters(self, function, args):
+        # Whether a tail call of function can run in the caller's frame. A call of the same
+        # function finds the frame's variables where it would have looked them up through its
+        # parent, and the caller has nothing left to do with them.
+        return (
+            function.__class__ is self.__class__ and function.body_node is self.body_node and
+            len(args) == self.arity
+        )
 
     def __repr__(self):
         return f"<function {self.name}>"
@@ -86,156 +147,134 @@ class Function(BaseFunction):
 class BuiltInFunction(BaseFunction):
     def __init__(self, name):
         super().__init__(name)
+        self.arg_names, self.implementation = builtins[name]
+        self.arity = len(self.arg_names)
 
     def execute(self, args):
         res = rtr.RunTimeResult()
-        exec_ctx = self.generate_new_context()
-
-        method_name = f'execute_{self.name}'
-        method = getattr(self, method_name, self.no_visit_method)
-
-        res.register(self.check_and_populate_args(method.arg_names, args, exec_ctx))
-        if res.error: return res
-
-        return_value = res.register(method(exec_ctx))
-        if res.error: return res
-        return res.success(return_value)
+        value, error = self.apply(args, self.context, self.pos_start, self.pos_end)
+        if error: return res.failure(error)
+        return res.success(value)
 
-    def no_visit_method(self, node, context):
-        raise Exception(f'No execute_{self.name} method defined')
-
-    def copy(self):
-        copy = BuiltInFunction(self.name)
-        copy.set_context(self.context)
-        copy.set_pos(self.pos_start, self.pos_end)
-        return copy
+    def apply(self, args, context, pos_start, pos_end):
+        # The value and error of a call. The engines call the built-in itself instead of a copy
+        # placed at the call, an error is made again by a copy placed there.
+        if len(args) != self.arity:
+            return None, self.at(pos_start, pos_end, context).check_args(self.arg_names, args).error
+        value, error = self.implementation(self, *args)
+        if error:
+            return self.at(pos_start, pos_end, context).failure(error.details)
+        return value, None
+
+    def failure(self, details):
+        # The error a built-in fails with. The frame made for it here keeps the traceback the same as
+        # for a user function, a call that succeeds makes none.
+        return None, error.RunTimeError(
+            self.pos_start, self.pos_end, details, ct.Context(self.name, self.context, self.pos_start)
+        )
 
     def __repr__(self):
         return f"<built-in function {self.name}>"
 
-    #####################################
 
-    def execute_print(self, exec_ctx):
-        print(str(exec_ctx.symbol_table.get('value')))
-        return rtr.RunTimeResult().success(nu.null)
+#####################################
 
-    execute_print.arg_names = ['value']
+# Built-in functions by name, each the names of its arguments and a Python function of the
+# BuiltInFunction and the argument values returning a value and an error
+builtins = {}
 
-    def execute_print_ret(self, exec_ctx):
-        return rtr.RunTimeResult().success(String.String(str(exec_ctx.symbol_table.get('value'))))
 
-    execute_print_ret.arg_names = ['value']
+def builtin(name, *arg_names):
+    def register(implementation):
+        builtins[name] = (arg_names, implementation)
+        return implementation
+    return register
 
-    def execute_input(self, exec_ctx):
-        text = input()
-        return rtr.RunTimeResult().success(String.String(text))
 
-    execute_input.arg_names = []
+@builtin('print', 'value')
+def print_value(function, value):
+    print(str(value))
+    return nu.null, None
 
-    def execute_input_int(self, exec_ctx):
-        while True:
-            text = input()
-            try:
-                number = int(text)
-                break
-            except ValueError:
-                print(f"'{text}' must be an integer. Try again!")
-        return rtr.RunTimeResult().success(nu.Number(number))
 
-    execute_input_int.arg_names = []
+@builtin('print_ret', 'value')
+def print_ret_value(function, value):
+    return String.String(str(value)), None
 
-    def execute_is_number(self, exec_ctx):
-        is_number = isinstance(exec_ctx.symbol_table.get("value"), nu.Number)
-        return rtr.RunTimeResult().success(nu.true if is_number else nu.false)
 
-    execute_is_number.arg_names = ["value"]
+@builtin('input')
+def input_text(function):
+    return String.String(input()), None
 
-    def execute_is_string(self, exec_ctx):
-        is_number = isinstance(exec_ctx.symbol_table.get("value"), String.String)
-        return rtr.RunTimeResult().success(nu.true if is_number else nu.false)
 
-    execute_is_string.arg_names = ["value"]
+@builtin('input_int')
+def input_int_value(function):
+    while True:
+        text = input()
+        try:
+            number = int(text)
+            break
+        except ValueError:
+            print(f"'{text}' must be an integer. Try again!")
+    return nu.Number(number), None
 
-    def execute_is_list(self, exec_ctx):
-        is_number = isinstance(exec_ctx.symbol_table.get("value"), li.List)
-        return rtr.RunTimeResult().success(nu.true if is_number else nu.false)
 
-    execute_is_list.arg_names = ["value"]
+@builtin('is_number', 'value')
+def is_number(function, value):
+    return nu.true if isinstance(value, nu.Number) else nu.false, None
 
-    def execute_is_function(self, exec_ctx):
-        is_number = isinstance(exec_ctx.symbol_table.get("value"), BaseFunction)
-        return rtr.RunTimeResult().success(nu.true if is_number else nu.false)
 
-    execute_is_function.arg_names = ["value"]
+@builtin('is_string', 'value')
+def is_string(function, value):
+    return nu.true if isinstance(value, String.String) else nu.false, None
 
-    def execute_append(self, exec_ctx):
-        list_ = exec_ctx.symbol_table.get("list")
-        value = exec_ctx.symbol_table.get("value")
 
-        if not isinstance(list_, li.List):
-            return rtr.RunTimeResult().failure(error.RunTimeError(
-                self.pos_start, self.pos_end,
-                "First argument must be list",
-                exec_ctx
-            ))
+@builtin('is_list', 'value')
+def is_list(function, value):
+    return nu.true if isinstance(value, li.List) else nu.false, None
 
-        list_.elements.append(value)
-        return rtr.RunTimeResult().success(nu.null)
 
-    execute_append.arg_names = ["list", "value"]
+@builtin('is_function', 'value')
+def is_function(function, value):
+    return nu.true if isinstance(value, BaseFunction) else nu.false, None
 
-    def execute_pop(self, exec_ctx):
-        list_ = exec_ctx.symbol_table.get("list")
-        index = exec_ctx.symbol_table.get("index")
 
-        if not isinstance(list_, li.List):
-            return rtr.RunTimeResult().failure(error.RunTimeError(
-                self.pos_start, self.pos_end,
-                "First argument must be list",
-                exec_ctx
-            ))
+@builtin('append', 'list', 'value')
+def append(function, list_, value):
+    if not isinstance(list_, li.List):
+        return function.failure("First argument must be list")
 
-        if not isinstance(index, nu.Number):
-            return rtr.RunTimeResult().failure(error.RunTimeError(
-                self.pos_start, self.pos_end,
-                "Second argument must be number",
-                exec_ctx
-            ))
+    list_.elements.append(value)
+    return nu.null, None
 
-        try:
-            element = list_.elements.pop(index.value)
-        except:
-            return rtr.RunTimeResult().failure(error.RunTimeError(
-                self.pos_start, self.pos_end,
-                'Element at this index could not be removed from list because index is out of bounds',
-                exec_ctx
-            ))
-        return rtr.RunTimeResult().success(element)
 
-    execute_pop.arg_names = ["list", "index"]
+@builtin('pop', 'list', 'index')
+def pop(function, list_, index):
+    if not isinstance(list_, li.List):
+        return function.failure("First argument must be list")
 
-    def execute_extend(self, exec_ctx):
-        listA = exec_ctx.symbol_table.get("listA")
-        listB = exec_ctx.symbol_table.get("listB")
+    if not isinstance(index, nu.Number):
+        return function.failure("Second argument must be number")
 
-        if not isinstance(listA, li.List):
-            return rtr.RunTimeResult().failure(error.RunTimeError(
-                self.pos_start, self.pos_end,
-                "First argument must be list",
-                exec_ctx
-            ))
+    try:
+        element = list_.elements.pop(index.value)
+    except:
+        return function.failure(
+            'Element at this index could not be removed from list because index is out of bounds'
+        )
+    return element, None
 
-        if not isinstance(listB, li.List):
-            return rtr.RunTimeResult().failure(error.RunTimeError(
-                self.pos_start, self.pos_end,
-                "Second argument must be list",
-                exec_ctx
-            ))
 
-        listA.elements.extend(listB.elements)
-        return rtr.RunTimeResult().success(nu.null)
+@builtin('extend', 'listA', 'listB')
+def extend(function, listA, listB):
+    if not isinstance(listA, li.List):
+        return function.failure("First argument must be list")
+
+    if not isinstance(listB, li.List):
+        return function.failure("Second argument must be list")
 
-    execute_extend.arg_names = ["listA", "listB"]
+    listA.elements.extend(listB.elements)
+    return nu.null, None
 
 
 print_ = BuiltInFunction("print")
@@ -11,19 +11,19 @@ class Number(val.Value):
 
     def addition(self, other):
         if isinstance(other, Number):
-            return Number(self.value + other.value).set_context(self.context), None
+            return make(self.value + other.value), None
         else:
             return None, val.Value.illegal_operation(self, other)
 
     def subtraction(self, other):
         if isinstance(other, Number):
-            return Number(self.value - other.value).set_context(self.context), None
+            return make(self.value - other.value), None
         else:
             return None, val.Value.illegal_operation(self, other)
 
     def multiplication(self, other):
         if isinstance(other, Number):
-            return Number(self.value * other.value).set_context(self.context), None
+            return make(self.value * other.value), None
         else:
             return None, val.Value.illegal_operation(self, other)
 
@@ -34,12 +34,12 @@ class Number(val.Value):
                     other.pos_start, other.pos_end, "विभाजन सह शून्य दोष", self.context
                 )
 
-            return Number(self.value / other.value).set_context(self.context), None
+            return make(self.value / other.value), None
         else:
             return None, val.Value.illegal_operation(self, other)
 
     def factorial(self):
-        return Number(math.factorial(self.value)).set_context(self.context), None
+        return make(math.factorial(self.value)), None
 
     def modulus(self, other):
         if isinstance(other, Number):
@@ -48,96 +48,96 @@ class Number(val.Value):
                     other.pos_start, other.pos_end, "विभाजन सह शून्य दोष", self.context
                 )
 
-            return Number(self.value % other.value).set_context(self.context), None
+            return make(self.value % other.value), None
 
     def exponential(self, other):
         if isinstance(other, Number):
-            return Number(self.value ** other.value).set_context(self.context), None
+            return make(self.value ** other.value), None
         else:
             return None, val.Value.illegal_operation(self, other)
 
     def get_comparison_eq(self, other):
         if isinstance(other, Number):
-            return boolean.Boolean(self.value == other.value).set_context(self.context), None
+            return boolean.make(self.value == other.value), None
         else:
             return None, val.Value.illegal_operation(self, other)
 
     def get_comparison_ne(self, other):
         if isinstance(other, Number):
-            return boolean.Boolean(self.value != other.value).set_context(self.context), None
+            return boolean.make(self.value != other.value), None
         else:
             return None, val.Value.illegal_operation(self, other)
     def get_comparison_bitand(self,other):
         if isinstance(other, Number):
-            return Number(self.value & other.value).set_context(self.context), None
+            return make(self.value & other.value), None
         else:
             return None, val.Value.illegal_operation(self,other)
     def get_comparison_bitor(self,other):
         if isinstance(other, Number):
-            return Number(self.value | other.value).set_context(self.context), None
+            return make(self.value | other.value), None
         else:
             return None, val.Value.illegal_operation(self,other)
 
     def get_comparison_lt(self, other):
         if isinstance(other, Number):
-            return boolean.Boolean(self.value < other.value).set_context(self.context), None
+            return boolean.make(self.value < other.value), None
         else:
             return None, val.Value.illegal_operation(self, other)
 
     def get_comparison_gt(self, other):
         if isinstance(other, Number):
-            return boolean.Boolean(self.value > other.value).set_context(self.context), None
+            return boolean.make(self.value > other.value), None
         else:
             return None, val.Value.illegal_operation(self, other)
 
     def get_comparison_lte(self, other):
         if isinstance(other, Number):
-            return boolean.Boolean(self.value <= other.value).set_context(self.context), None
+            return boolean.make(self.value <= other.value), None
         else:
             return None, val.Value.illegal_operation(self, other)
 
     def get_comparison_gte(self, other):
         if isinstance(other, Number):
-            return boolean.Boolean(self.value >= other.value).set_context(self.context), None
+            return boolean.make(self.value >= other.value), None
         else:
             return None, val.Value.illegal_operation(self, other)
 
     def get_shift_right(self,other):
         if isinstance(other, Number):
-            return Number(self.value >> other.value).set_context(self.context), None
+            return make(self.value >> other.value), None
         else:
             return None, val.Value.illegal_operation(self, other)
 
     def get_shift_left(self,other):
         if isinstance(other, Number):
-            return Number(self.value << other.value).set_context(self.context), None
+            return make(self.value << other.value), None
         else:
             return None, val.Value.illegal_operation(self, other)
 
     def get_xor(self,other):
         if isinstance(other, Number):
-            return Number(self.value ^ other.value).set_context(self.context), None
+            return make(self.value ^ other.value), None
         else:
             return None, val.Value.illegal_operation(self, other)
 
 
     def anded_by(self, other):
         if isinstance(other, Number):
-            return Number(self.value and other.value).set_context(self.context), None
+            return make(self.value and other.value), None
         else:
             return None, val.Value.illegal_operation(self, other)
 
     def ored_by(self, other):
         if isinstance(other, Number):
-            return Number(self.value or other.value).set_context(self.context), None
+            return make(self.value or other.value), None
         else:
             return None, val.Value.illegal_operation(self, other)
 
     def notted(self):
-        return boolean.Boolean(1 if self.value == 0 else 0).set_context(self.context), None
+        return boolean.make(1 if self.value == 0 else 0), None
 
     def bitnotted(self):
-        return Number(~self.value).set_context(self.context),None
+        return make(~self.value), None
 
     def copy(self):
         copy = Number(self.value)
@@ -155,7 +155,34 @@ class Number(val.Value):
         return str(self.value)
 
 
-null = Number(0)
-false = Number(0)
-true = Number(1)
+# Numbers of the ints in this range are made once and shared. Values are never changed once
+# made, their positions being taken from the nodes that use them.
+SMALL_INTS = range(-5, 257)
+small_ints = [Number(value) for value in SMALL_INTS]
+
+
+def make(value):
+    # The shared Number of a small int, else a new one. Operators make their results with it.
+    if value.__class__ is int and -5 <= value <= 256:
+        return small_ints[value + 5]
+    return Number(value)
+
+
+def count(start, end, step):
+    # The values a प्रति loop gives its variable. Whole numbers count with a range, which
+    # stops where the comparisons below would.
+    if start.__class__ is int and end.__class__ is int and step.__class__ is int and step != 0:
+        return range(start, end, step)
+    return count_by_comparing(start, end, step)
+
+
+def count_by_comparing(i, end, step):
+    while (i < end) if step >= 0 else (i > end):
+        yield i
+        i += step
+
+
+null = small_ints[5]
+false = null
+true = small_ints[6]
 # math_PI = Number(math.pi)
@@ -0,0 +1,127 @@
+import operator
+import Sansam.Lexer.Token as token
+import Sansam.Values.Number as num
+import Sansam.Values.Boolean as boolean
+import Sansam.Values.String as string
+import Sansam.Values.List as list
+import Sansam.Values.Dictionary as dict
+
+# Method each operator token calls on its left operand, च and वा being keywords by value
+BINARY_OPERATIONS = {
+    token.T_PLUS: 'addition',
+    token.T_MINUS: 'subtraction',
+    token.T_MUL: 'multiplication',
+    token.T_DIV: 'division',
+    token.T_MOD: 'modulus',
+    token.T_POW: 'exponential',
+    token.T_ISEQ: 'get_comparison_eq',
+    token.T_ISNEQ: 'get_comparison_ne',
+    token.T_ISL: 'get_comparison_lt',
+    token.T_ISG: 'get_comparison_gt',
+    token.T_BIT_AND: 'get_comparison_bitand',
+    token.T_BIT_OR: 'get_comparison_bitor',
+    token.T_ISLEQ: 'get_comparison_lte',
+    token.T_ISGEQ: 'get_comparison_gte',
+    token.T_RSHIFT: 'get_shift_right',
+    token.T_LSHIFT: 'get_shift_left',
+    token.T_XOR: 'get_xor',
+}
+
+LOGICAL_OPERATIONS = {
+    'च': 'anded_by',
+    'वा': 'ored_by',
+}
+
+# Classes whose pairs are in the table, values of any other class call their method each time
+VALUE_CLASSES = (num.Number, boolean.Boolean, string.String, list.List, dict.Dictionary)
+
+# Python operator each operation applies to the values of two Numbers
+NUMBER_ARITHMETIC = {
+    'addition': operator.add,
+    'subtraction': operator.sub,
+    'multiplication': operator.mul,
+    'exponential': operator.pow,
+    'get_comparison_bitand': operator.and_,
+    'get_comparison_bitor': operator.or_,
+    'get_shift_right': operator.rshift,
+    'get_shift_left': operator.lshift,
+    'get_xor': operator.xor,
+    'anded_by': lambda left, right: left and right,
+    'ored_by': lambda left, right: left or right,
+}
+
+NUMBER_COMPARISONS = {
+    'get_comparison_eq': operator.eq,
+    'get_comparison_ne': operator.ne,
+    'get_comparison_lt': operator.lt,
+    'get_comparison_gt': operator.gt,
+    'get_comparison_lte': operator.le,
+    'get_comparison_gte': operator.ge,
+}
+
+# Operations that fail on a zero right operand
+NUMBER_DIVISIONS = {
+    'division': operator.truediv,
+    'modulus': operator.mod,
+}
+
+OPERATIONS = (*NUMBER_ARITHMETIC, *NUMBER_COMPARISONS, *NUMBER_DIVISIONS)
+
+
+def number_arithmetic(function):
+    def operation(left, right):
+        return num.make(function(left.value, right.value)), None
+    return operation
+
+
+def number_comparison(function):
+    def operation(left, right):
+        return (boolean.true if function(left.value, right.value) else boolean.false), None
+    return operation
+
+
+def number_division(function, method):
+    def operation(left, right):
+        if right.value == 0:
+            return method(left, right)
+        return num.make(function(left.value, right.value)), None
+    return operation
+
+
+def build():
+    # (left class, operation, right class) to a function of the two values returning what the
+    # left value's method would. Two Numbers get the Python operator directly, other pairs the
+    # method, which Value answers with illegal_operation where the pair is not supported. A
+    # class without the method is left out, to fail as the method lookup does.
+    table = {}
+    for left_class in VALUE_CLASSES:
+        for operation in OPERATIONS:
+            method = getattr(left_class, operation, None)
+            if method is None:
+                continue
+            for right_class in VALUE_CLASSES:
+                table[left_class, operation, right_class] = method
+
+    number = num.Number
+    for operation, function in NUMBER_ARITHMETIC.items():
+        table[number, operation, number] = number_arithmetic(function)
+    for operation, function in NUMBER_COMPARISONS.items():
+        table[number, operation, number] = number_comparison(function)
+    for operation, function in NUMBER_DIVISIONS.items():
+        table[number, operation, number] = number_division(function, getattr(number, operation))
+    return table
+
+
+BINARY = build()
+
+# The functions for two Numbers by operation, looked up without making a key
+NUMBER = {operation: BINARY[num.Number, operation, num.Number] for operation in OPERATIONS}
+
+
+def binary(left, operation, right):
+    if left.__class__ is num.Number is right.__class__:
+        return NUMBER[operation](left, right)
+    function = BINARY.get((left.__class__, operation, right.__class__))
+    if function is None:
+        return getattr(left, operation)(right)
+    return function(left, right)
@@ -16,6 +16,11 @@ class Value:
         self.context = context
         return self
 
+    def at(self, pos_start, pos_end, context):
+        # The value as seen where it is used. Reads share the stored value instead of copying
+        # it, so only an error, which shows the position and context, gets a copy of its own.
+        return self.copy().set_pos(pos_start, pos_end).set_context(context)
+
     def addition(self, other):
         return None, self.illegal_operation(other)
 